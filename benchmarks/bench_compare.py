@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import sys
+from typing import Dict, Any, List, Tuple
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(
+        baseline: Dict[str, Any],
+        current: Dict[str, Any],
+        threshold: float
+) -> Tuple[List[Tuple[str, str, str, str]], List[str]]:
+    rows = []
+    regressions = []
+
+    for case in sorted(set(baseline) | set(current)):
+        old = baseline.get(case, {}).get("median")
+        new = current.get(case, {}).get("median")
+
+        if old is None or new is None:
+            status = "missing" if case not in current or case not in baseline else "error"
+            rows.append((case, str(old), str(new), status))
+            continue
+
+        ratio = new / old if old > 0 else float("inf")
+        status = f"{ratio:.2f}x"
+        if ratio > 1.0 + threshold:
+            status += " REGRESSION"
+            regressions.append(case)
+
+        rows.append((case, f"{old:.4f}", f"{new:.4f}", status))
+
+    return rows, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline", action="store", type=str)
+    parser.add_argument("current", action="store", type=str)
+    parser.add_argument("--threshold", action="store", type=float, default=0.2,
+                        help="relative slowdown of the median reported as a regression")
+    args = parser.parse_args()
+
+    rows, regressions = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+
+    header = ("case", "baseline, s", "current, s", "ratio")
+    widths = [max(len(r[i]) for r in rows + [header]) for i in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
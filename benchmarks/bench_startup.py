@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional, Dict, Any
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MAIN_FILE = os.path.join(ROOT_DIR, "parquet-viewer.py")
+STARTUP_BENCHMARK_ENV = "PARQUET_VIEWER_STARTUP_BENCHMARK"
+FIRST_PAINT_MARKER = "first-paint"
+
+
+def measure_first_paint(parquet_file: Optional[str], offscreen: bool, timeout: float) -> float:
+    env = dict(os.environ, **{STARTUP_BENCHMARK_ENV: "1"})
+    if offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+
+    command = [sys.executable, MAIN_FILE] + ([parquet_file] if parquet_file else [])
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        for line in proc.stdout:
+            if line.startswith(FIRST_PAINT_MARKER):
+                return time.perf_counter() - start
+        raise RuntimeError(f"Application exited with code {proc.wait()} before the first paint")
+    finally:
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def run_benchmark(runs: int, parquet_file: Optional[str], offscreen: bool, timeout: float) -> Dict[str, Any]:
+    # first run warms up OS file cache and filter parser cache
+    measure_first_paint(parquet_file, offscreen, timeout)
+    timings: List[float] = [measure_first_paint(parquet_file, offscreen, timeout) for _ in range(runs)]
+
+    return {
+        "benchmark": "startup.time_to_first_paint",
+        "parquet_file": parquet_file,
+        "runs": runs,
+        "timings": timings,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure time from process start to the first paint of the main window")
+    parser.add_argument("parquet_file", action="store", nargs="?", default=None, type=str)
+    parser.add_argument("--runs", action="store", type=int, default=5)
+    parser.add_argument("--offscreen", action="store_true", help="use Qt offscreen platform (no display required)")
+    parser.add_argument("--timeout", action="store", type=float, default=30.0)
+    parser.add_argument("--output", action="store", type=str, default=None, help="JSON file for results")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.runs, args.parquet_file, args.offscreen, args.timeout)
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Any, List, Optional
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT_DIR)
+
+import pyarrow as pa  # noqa: E402
+import pyarrow.compute as pc  # noqa: E402
+
+from benchmarks.synthetic_data import (  # noqa: E402
+    SyntheticDataSpec,
+    write_synthetic_file,
+    write_synthetic_dataset,
+    spec_to_dict
+)
+from parquet_viewer.parquet.parquet_aggregate import parse_aggregations  # noqa: E402
+from parquet_viewer.parquet.parquet_conversion import (  # noqa: E402
+    convert_parquet_to_json,
+    convert_parquet_to_csv,
+    CsvDialect
+)
+from parquet_viewer.parquet.parquet_copy import CopyFormat  # noqa: E402
+from parquet_viewer.parquet.parquet_disk_cache import DiskCache  # noqa: E402
+from parquet_viewer.parquet.parquet_display import truncate_table  # noqa: E402
+from parquet_viewer.parquet.parquet_reader_options import READER_PROFILES, ReaderOptions  # noqa: E402
+from parquet_viewer.parquet.parquet_table import ParquetTable, batch_to_pylist  # noqa: E402
+
+PAGE_SIZE = 80
+
+# one filter per operator, names are used as keys in the results
+FILTERS = {
+    "equal_string": "request_id = 'req-12345'",
+    "not_equal_string": "status != 'new'",
+    "equal_int": "id = 12345",
+    "less_than": "amount < 50",
+    "less_than_or_equal": "quantity <= 100",
+    "greater_than": "quantity > 900",
+    "greater_than_or_equal": "amount >= 150",
+    "like": "message ~ '%archived%'",
+    "not_like": "message !~ '%archived%'",
+    "ilike": "message ilike '%ARCHIVED%'",
+    "regex": "message =~ 'arch[a-z]+ed'",
+    "starts_with": "request_id starts_with 'req-123'",
+    "ends_with": "request_id ends_with '99'",
+    "bool": "flag = true",
+    "is_null": "status is null",
+    "is_not_null": "amount is not null",
+    "is_null_nested": "payload is null",
+    "and": "country = 'US' and amount > 150",
+    "or": "status = 'new' or status = 'closed'",
+    "grouped": "(status = 'new' or status = 'closed') and message ~ '%lorem%'",
+    "in_list": "status in ('new', 'closed', 'archived')",
+    "in_list_large": "id in (%s)" % ", ".join(str(i) for i in range(0, 1_000_000, 200)),
+    "not_in_list": "country not in ('US', 'PL')",
+    "between": "amount between 50 and 150",
+    "timestamp_range": "ts between timestamp '2026-02-01 00:00' and timestamp '2026-02-08 00:00'",
+    "date_equal": "day = date '2026-02-01'",
+    "struct_field": "payload.user.country = 'PL'",
+    "list_any": "any(tags) = 'deleted'",
+    "list_len": "len(tags) > 6",
+    "and_selective_last": "message ~ '%archived%' and request_id = 'req-12345'",
+    "and_list_any": "any(tags) = 'deleted' and country = 'US' and amount > 150",
+    "or_cheap_last": "message ~ '%lorem%' or amount > 150",
+}
+
+SORT_KEYS = {
+    "double": [("amount", "descending")],
+    "string": [("request_id", "ascending")],
+    "multi": [("country", "ascending"), ("ts", "descending")],
+}
+
+
+def get_git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(func: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    timings = []
+    try:
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}".splitlines()[0]}
+
+    return {
+        "timings": timings,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+    }
+
+
+def open_table(parquet_file: str, reader_options: Optional[ReaderOptions] = None) -> ParquetTable:
+    parquet_table = ParquetTable(parquet_file, PAGE_SIZE, reader_options)
+    parquet_table.lazy_table  # noqa
+    return parquet_table
+
+
+def bench_open_and_paging(parquet_file: str, repeat: int) -> Dict[str, Any]:
+    results = {"open": measure(lambda: open_table(parquet_file), repeat)}
+
+    parquet_table = open_table(parquet_file)
+
+    def first_page():
+        parquet_table.batch_size = PAGE_SIZE
+        parquet_table.get_data(0)
+
+    def deep_page():
+        parquet_table.batch_size = PAGE_SIZE
+        parquet_table.get_data(parquet_table.num_batches - 1)
+
+    results["first_page"] = measure(first_page, repeat)
+    results["deep_page"] = measure(deep_page, repeat)
+    return results
+
+
+def bench_reader_profiles(parquet_file: str, repeat: int, profiles: List[str]) -> Dict[str, Any]:
+    results = {}
+    for profile in profiles:
+        reader_options = READER_PROFILES[profile]
+
+        def scan():
+            for _ in open_table(parquet_file, reader_options).iter_batches(batch_size=65536):
+                pass
+
+        results[f"open[{profile}]"] = measure(lambda: open_table(parquet_file, reader_options), repeat)
+        results[f"scan[{profile}]"] = measure(scan, repeat)
+    return results
+
+
+def bench_filters(parquet_file: str, repeat: int) -> Dict[str, Any]:
+    parquet_table = open_table(parquet_file)
+    results = {}
+
+    for name, filters in FILTERS.items():
+        def apply_filter():
+            parquet_table.filters = filters
+            parquet_table.num_filtered_rows  # noqa
+
+        results[f"filter.{name}"] = measure(apply_filter, repeat, setup=lambda: setattr(parquet_table, "filters", ""))
+
+    return results
+
+
+INDEXED_FILTERS = {
+    "equal_string": "request_id = 'req-12345'",
+    "equal_int": "id = 12345",
+    "range_int": "id >= 999000",
+    "in_int": "id in (12, 12345, 999000)",
+    "starts_with": "request_id starts_with 'req-1234'",
+    "between_int": "id between 500000 and 501000",
+}
+
+
+def bench_value_index(parquet_file: str, repeat: int) -> Dict[str, Any]:
+    parquet_table = open_table(parquet_file)
+    results = {
+        "index.build_string": measure(lambda: parquet_table.build_value_index("request_id"), repeat),
+        "index.build_int": measure(lambda: parquet_table.build_value_index("id"), repeat),
+    }
+    value_indexes = dict(parquet_table._value_indexes)
+
+    for name, filters in INDEXED_FILTERS.items():
+        def apply_filter():
+            parquet_table.filters = filters
+            parquet_table.num_filtered_rows  # noqa
+
+        def lookup():
+            # a fresh table, only row groups with matching rows are read
+            lookup_table = ParquetTable(parquet_file, PAGE_SIZE)
+            lookup_table._value_indexes = value_indexes
+            lookup_table.filters = filters
+            lookup_table.num_filtered_rows  # noqa
+
+        results[f"index.filter.{name}"] = measure(
+            apply_filter, repeat, setup=lambda: parquet_table._filtered_tables_cache.clear()
+        )
+        results[f"index.lookup.{name}"] = measure(lookup, repeat)
+
+    return results
+
+
+def bench_search(parquet_file: str, repeat: int) -> Dict[str, Any]:
+    parquet_table = open_table(parquet_file)
+
+    def first_hits(text: str, include_numbers: bool = False):
+        next(parquet_table.search(text, include_numbers=include_numbers), None)
+
+    def all_hits(text: str, include_numbers: bool = False):
+        for _ in parquet_table.search(text, include_numbers=include_numbers):
+            pass
+
+    return {
+        "search.first_hits": measure(lambda: first_hits("req-12345"), repeat),
+        "search.rare": measure(lambda: all_hits("req-12345"), repeat),
+        "search.rare_with_numbers": measure(lambda: all_hits("12345", include_numbers=True), repeat),
+    }
+
+
+def bench_find(parquet_file: str, repeat: int) -> Dict[str, Any]:
+    parquet_table = open_table(parquet_file)
+    parquet_table.lazy_table  # noqa
+    last_row = parquet_table.num_rows - 1
+
+    def find(filters: str, position: int, backward: bool = False):
+        parquet_table.find_match(filters, position, backward=backward)
+
+    reset = parquet_table._found_rows_cache.clear
+    return {
+        "find.next_near": measure(lambda: find(FILTERS["greater_than"], 0), repeat, setup=reset),
+        "find.next_far": measure(lambda: find("id >= %d" % last_row, 0), repeat, setup=reset),
+        "find.previous_far": measure(lambda: find("id = 0", last_row, backward=True), repeat, setup=reset),
+        "find.next_cached": measure(lambda: find(FILTERS["greater_than"], 0), repeat),
+    }
+
+
+def bench_profile(parquet_file: str, repeat: int) -> Dict[str, Any]:
+    parquet_table = open_table(parquet_file)
+    parquet_table.lazy_table  # noqa
+
+    def profile(columns: Optional[List[str]] = None):
+        parquet_table._column_profiles.clear()
+        parquet_table.get_column_profiles(columns)
+
+    return {
+        "profile.footer": measure(lambda: parquet_table.footer_profile, repeat),
+        "profile.low_cardinality": measure(lambda: profile(["country", "status"]), repeat),
+        "profile.high_cardinality": measure(lambda: profile(["request_id"]), repeat),
+        "profile.all_columns": measure(profile, repeat),
+    }
+
+
+def bench_aggregate(parquet_file: str, repeat: int) -> Dict[str, Any]:
+    aggregations = parse_aggregations("count, sum(amount), mean(amount), max(quantity)")
+    distinct = parse_aggregations("count_distinct(request_id)")
+
+    def streamed():
+        open_table(parquet_file).aggregate(["status", "day"], aggregations)
+
+    parquet_table = open_table(parquet_file)
+    parquet_table.lazy_table  # noqa
+    return {
+        "aggregate.streamed": measure(streamed, repeat),
+        "aggregate.in_memory": measure(lambda: parquet_table.aggregate(["status", "day"], aggregations), repeat),
+        "aggregate.count_distinct": measure(lambda: parquet_table.aggregate(["country"], distinct), repeat),
+    }
+
+
+def bench_display(parquet_file: str, repeat: int) -> Dict[str, Any]:
+    # a page of huge values, 1 MB strings and lists of 100k elements
+    page = pa.table({
+        "text": ["x" * 1024 * 1024] * PAGE_SIZE,
+        "items": pa.ListArray.from_arrays(
+            pa.array(range(0, (PAGE_SIZE + 1) * 100_000, 100_000), type=pa.int32()),
+            pa.array(range(PAGE_SIZE * 100_000), type=pa.int64())
+        ),
+    })
+
+    parquet_table = open_table(parquet_file)
+    # nested column if the file has one
+    column = "payload" if "payload" in parquet_table.column_names else "message"
+    return {
+        "display.huge_page_full": measure(lambda: [batch_to_pylist(b) for b in page.to_batches()], repeat),
+        "display.huge_page_truncated": measure(
+            lambda: [batch_to_pylist(b) for b in truncate_table(page).to_batches()], repeat
+        ),
+        "display.cell_value": measure(lambda: parquet_table.get_value(0, 0, column).as_py(), repeat),
+    }
+
+
+def bench_sort(parquet_file: str, repeat: int) -> Dict[str, Any]:
+    parquet_table = open_table(parquet_file)
+    results = {}
+
+    def reset():
+        # every run sorts again
+        parquet_table._sort_indices_cache.clear()
+        parquet_table._pages_cache.clear()
+
+    for name, sort_keys in SORT_KEYS.items():
+        def sort(page: int):
+            parquet_table.sort_keys = sort_keys
+            parquet_table.get_data(page)
+
+        results[f"sort.{name}.first_page"] = measure(lambda: sort(0), repeat, setup=reset)
+        results[f"sort.{name}.last_page"] = measure(lambda: sort(parquet_table.num_batches - 1), repeat, setup=reset)
+
+    parquet_table.sort_keys = []
+    return results
+
+
+def bench_disk_cache(parquet_file: str, repeat: int) -> Dict[str, Any]:
+    parquet_table = open_table(parquet_file)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        disk_cache = DiskCache(tmp_dir, max_bytes=1024 * 1024 * 1024)
+
+        def reopen():
+            # a new session: in-memory caches are empty, the data is already read
+            parquet_table._disk_cache = disk_cache
+            parquet_table._filtered_tables_cache.clear()
+            parquet_table._sort_indices_cache.clear()
+            parquet_table._pages_cache.clear()
+            parquet_table.filters = ""
+
+        def filter_and_sort():
+            parquet_table.filters = FILTERS["like"]
+            parquet_table.sort_keys = SORT_KEYS["double"]
+            parquet_table.get_data(parquet_table.num_batches - 1)
+
+        results["disk_cache.cold"] = measure(filter_and_sort, repeat, setup=lambda: (disk_cache.clear(), reopen()))
+        results["disk_cache.warm"] = measure(filter_and_sort, repeat, setup=reopen)
+
+    parquet_table.sort_keys = []
+    return results
+
+
+def bench_export(parquet_file: str, repeat: int, export_rows: Optional[int]) -> Dict[str, Any]:
+    table = open_table(parquet_file).lazy_table
+    if export_rows is not None:
+        table = table.slice(0, export_rows)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        kwargs = dict(table=table, batch_size=10000, progress_cb=lambda n, i: False, csv_dialect=CsvDialect.EXCEL)
+        results["export.json"] = measure(
+            lambda: convert_parquet_to_json(output_file=os.path.join(tmp_dir, "out.json"), **kwargs), repeat
+        )
+        results["export.csv"] = measure(
+            lambda: convert_parquet_to_csv(output_file=os.path.join(tmp_dir, "out.csv"), **kwargs), repeat
+        )
+        # rows are gathered in sort order, the reordered table is never materialized
+        indices = pc.sort_indices(table, SORT_KEYS["double"])
+        results["export.json.sorted"] = measure(
+            lambda: convert_parquet_to_json(output_file=os.path.join(tmp_dir, "out.json"), indices=indices, **kwargs),
+            repeat
+        )
+    return results
+
+
+def bench_dataset(dataset_dir: str, repeat: int) -> Dict[str, Any]:
+    def open_dataset():
+        parquet_table = ParquetTable(dataset_dir, PAGE_SIZE)
+        return parquet_table.num_rows, parquet_table.column_names
+
+    def pruned_filter():
+        # a fresh table, so only matching partitions are read
+        parquet_table = ParquetTable(dataset_dir, PAGE_SIZE)
+        parquet_table.filters = "country = 'US'"
+        parquet_table.num_filtered_rows  # noqa
+
+    return {
+        "dataset.open": measure(open_dataset, repeat),
+        "dataset.read_table": measure(lambda: open_table(dataset_dir), repeat),
+        "dataset.partition_filter": measure(pruned_filter, repeat),
+    }
+
+
+def bench_copy_selection(parquet_file: str, repeat: int) -> Dict[str, Any]:
+    try:
+        from PyQt5.QtCore import QCoreApplication, QItemSelection
+        from parquet_viewer.qt.qt_table_model import ParquetTableModel
+    except ImportError as e:
+        return {"copy_selection": {"error": f"PyQt5 is not available: {e}"}}
+
+    app = QCoreApplication.instance() or QCoreApplication([])  # noqa
+
+    parquet_table = open_table(parquet_file)
+    model = ParquetTableModel(parquet_table)
+    model.setPage(0)
+    selection = QItemSelection(model.index(0, 0), model.index(model.rowCount() - 1, model.columnCount() - 1))
+
+    def copy_page(copy_format: CopyFormat):
+        positions, columns = model.getSelectionRows(selection)
+        parquet_table.copy_rows(positions, columns, copy_format)
+
+    return {
+        "copy_selection": measure(lambda: copy_page(CopyFormat.TSV), repeat),
+        "copy_selection.json": measure(lambda: copy_page(CopyFormat.JSON), repeat),
+        "copy_selection.entire_column": measure(lambda: parquet_table.copy_rows(None, ["amount"]), repeat),
+        "copy_selection.entire_column_json": measure(
+            lambda: parquet_table.copy_rows(None, ["request_id"], CopyFormat.JSON), repeat
+        ),
+    }
+
+
+def run_suite(
+        spec: SyntheticDataSpec,
+        data_dir: str,
+        repeat: int,
+        export_rows: Optional[int],
+        reader_profiles: List[str],
+        partition_by: List[str]
+) -> Dict[str, Any]:
+    start = time.perf_counter()
+    parquet_file = write_synthetic_file(spec, data_dir)
+    print(f"Data file {parquet_file} ready in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    results = {}
+    results.update(bench_open_and_paging(parquet_file, repeat))
+    results.update(bench_reader_profiles(parquet_file, repeat, reader_profiles))
+    results.update(bench_filters(parquet_file, repeat))
+    results.update(bench_value_index(parquet_file, repeat))
+    results.update(bench_search(parquet_file, repeat))
+    results.update(bench_find(parquet_file, repeat))
+    results.update(bench_profile(parquet_file, repeat))
+    results.update(bench_aggregate(parquet_file, repeat))
+    results.update(bench_display(parquet_file, repeat))
+    results.update(bench_sort(parquet_file, repeat))
+    results.update(bench_disk_cache(parquet_file, repeat))
+    results.update(bench_export(parquet_file, repeat, export_rows))
+    results.update(bench_copy_selection(parquet_file, repeat))
+
+    if partition_by:
+        dataset_dir = write_synthetic_dataset(spec, data_dir, tuple(partition_by))
+        results.update(bench_dataset(dataset_dir, repeat))
+    return results
+
+
+def get_metadata(specs: List[SyntheticDataSpec], repeat: int) -> Dict[str, Any]:
+    return {
+        "commit": get_git_commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "pyarrow": pa.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "datasets": {spec.name: spec_to_dict(spec) for spec in specs},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run performance benchmarks on synthetic parquet files")
+    parser.add_argument("--rows", action="store", type=int, default=1_000_000)
+    parser.add_argument("--wide-columns", action="store", type=int, default=0)
+    parser.add_argument("--no-nested", action="store_true")
+    parser.add_argument("--row-group-sizes", action="store", type=str, default="131072",
+                        help="comma separated list of row group sizes, each one is a separate dataset")
+    parser.add_argument("--seed", action="store", type=int, default=42)
+    parser.add_argument("--repeat", action="store", type=int, default=3)
+    parser.add_argument("--export-rows", action="store", type=int, default=None,
+                        help="export only first N rows to keep the run short")
+    parser.add_argument("--reader-profiles", action="store", type=str, default=",".join(READER_PROFILES),
+                        help="comma separated list of reader profiles to compare")
+    parser.add_argument("--partition-by", action="store", type=str, default="country",
+                        help="comma separated columns of a hive partitioned copy of each dataset, empty to skip")
+    parser.add_argument("--data-dir", action="store", type=str, default=os.path.join(ROOT_DIR, "bench_data"))
+    parser.add_argument("--output", action="store", type=str, default=None, help="JSON file for results")
+    args = parser.parse_args()
+
+    specs = [
+        SyntheticDataSpec(
+            num_rows=args.rows,
+            num_wide_columns=args.wide_columns,
+            nested=not args.no_nested,
+            row_group_size=int(row_group_size),
+            seed=args.seed
+        )
+        for row_group_size in args.row_group_sizes.split(",")
+    ]
+
+    report = {"metadata": get_metadata(specs, args.repeat), "results": {}}
+    for spec in specs:
+        for case, result in run_suite(
+                spec,
+                args.data_dir,
+                args.repeat,
+                args.export_rows,
+                args.reader_profiles.split(","),
+                [c for c in args.partition_by.split(",") if c]
+        ).items():
+            report["results"][f"{spec.name}/{case}"] = result
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import shutil
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+CATEGORIES = ["new", "active", "suspended", "closed", "deleted", "pending", "archived"]
+COUNTRIES = ["US", "DE", "FR", "GB", "JP", "BR", "IN", "CN", "CA", "AU", "ES", "IT", "NL", "SE", "PL"]
+
+
+@dataclass
+class SyntheticDataSpec:
+    num_rows: int = 1_000_000
+    # number of extra numeric columns, to get a wide schema
+    num_wide_columns: int = 0
+    nested: bool = True
+    row_group_size: int = 128 * 1024
+    # fraction of null values in nullable columns
+    null_fraction: float = 0.05
+    # maximal number of list elements
+    max_list_len: int = 8
+    seed: int = 42
+
+    @property
+    def name(self) -> str:
+        return f"rows{self.num_rows}_wide{self.num_wide_columns}_nested{int(self.nested)}_rg{self.row_group_size}"
+
+
+def _with_nulls(rng: np.random.Generator, array: pa.Array, null_fraction: float) -> pa.Array:
+    if null_fraction <= 0:
+        return array
+    mask = pa.array(rng.random(len(array)) < null_fraction)
+    return pc.if_else(mask, pa.scalar(None, type=array.type), array)
+
+
+def _random_lists(rng: np.random.Generator, num_rows: int, max_list_len: int) -> pa.Array:
+    lengths = rng.integers(0, max_list_len + 1, num_rows)
+    offsets = np.zeros(num_rows + 1, dtype=np.int32)
+    np.cumsum(lengths, out=offsets[1:])
+    values = pa.array(rng.choice(np.array(CATEGORIES, dtype=object), int(offsets[-1])), type=pa.string())
+    return pa.ListArray.from_arrays(pa.array(offsets), values)
+
+
+def generate_table(spec: SyntheticDataSpec) -> pa.Table:
+    rng = np.random.default_rng(spec.seed)
+    n = spec.num_rows
+
+    ids = np.arange(n, dtype=np.int64)
+    # high cardinality, not clustered
+    request_ids = pa.array(np.char.add("req-", rng.permutation(n).astype(str)).astype(object), type=pa.string())
+    timestamps = np.datetime64("2026-01-01T00:00:00", "us") + np.sort(rng.integers(0, 365 * 24 * 3600 * 10**6, n))
+
+    columns: Dict[str, pa.Array] = {
+        "id": pa.array(ids),
+        "request_id": request_ids,
+        "status": _with_nulls(rng, pa.array(rng.choice(np.array(CATEGORIES, dtype=object), n), type=pa.string()),
+                              spec.null_fraction),
+        "country": pa.array(rng.choice(np.array(COUNTRIES, dtype=object), n), type=pa.string()),
+        "amount": _with_nulls(rng, pa.array(rng.normal(100.0, 50.0, n)), spec.null_fraction),
+        "quantity": pa.array(rng.integers(0, 1000, n).astype(np.int32)),
+        "flag": pa.array(rng.random(n) < 0.5),
+        "ts": pa.array(timestamps, type=pa.timestamp("us", tz="UTC")),
+        "day": pa.array(timestamps.astype("datetime64[D]"), type=pa.date32()),
+        "message": pa.array(
+            np.char.add(
+                np.char.add("event ", rng.choice(np.array(CATEGORIES), n)),
+                np.char.multiply(" lorem ipsum", rng.integers(1, 20, n))
+            ).astype(object),
+            type=pa.string()
+        ),
+    }
+
+    if spec.nested:
+        columns["tags"] = _random_lists(rng, n, spec.max_list_len)
+        columns["payload"] = pa.StructArray.from_arrays(
+            [
+                pa.StructArray.from_arrays(
+                    [pa.array(rng.integers(0, 10_000, n)), pa.array(rng.choice(np.array(COUNTRIES, dtype=object), n),
+                                                                      type=pa.string())],
+                    names=["id", "country"]
+                ),
+                pa.array(rng.random(n)),
+            ],
+            names=["user", "score"]
+        )
+
+    for i in range(spec.num_wide_columns):
+        columns[f"wide_{i:04d}"] = pa.array(rng.random(n))
+
+    return pa.table(columns)
+
+
+def write_synthetic_file(spec: SyntheticDataSpec, output_dir: str, overwrite: bool = False) -> str:
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.abspath(os.path.join(output_dir, f"synthetic_{spec.name}_seed{spec.seed}.parquet"))
+
+    if overwrite or not os.path.isfile(path):
+        table = generate_table(spec)
+        pq.write_table(table, path, row_group_size=spec.row_group_size)
+
+    return path
+
+
+def write_synthetic_dataset(
+        spec: SyntheticDataSpec,
+        output_dir: str,
+        partition_cols: Tuple[str, ...] = ("country",),
+        overwrite: bool = False
+) -> str:
+    """Hive partitioned directory, one part file per partition."""
+    path = os.path.abspath(os.path.join(output_dir, f"synthetic_{spec.name}_seed{spec.seed}_{'_'.join(partition_cols)}"))
+
+    if overwrite and os.path.isdir(path):
+        shutil.rmtree(path)
+    if not os.path.isdir(path):
+        table = generate_table(spec)
+        if "day" in partition_cols:
+            # dates as strings, so partition directories are readable
+            table = table.set_column(table.schema.get_field_index("day"), "day", table["day"].cast(pa.string()))
+        pq.write_to_dataset(table, path, partition_cols=list(partition_cols), row_group_size=spec.row_group_size)
+
+    return path
+
+
+def spec_to_dict(spec: SyntheticDataSpec) -> Dict[str, Any]:
+    return asdict(spec)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic parquet file")
+    parser.add_argument("--rows", action="store", type=int, default=SyntheticDataSpec.num_rows)
+    parser.add_argument("--wide-columns", action="store", type=int, default=0)
+    parser.add_argument("--no-nested", action="store_true")
+    parser.add_argument("--row-group-size", action="store", type=int, default=SyntheticDataSpec.row_group_size)
+    parser.add_argument("--seed", action="store", type=int, default=SyntheticDataSpec.seed)
+    parser.add_argument("--partition-by", action="store", type=str, default=None,
+                        help="comma separated columns, writes a hive partitioned directory instead of a file")
+    parser.add_argument("--output-dir", action="store", type=str, default="bench_data")
+    args = parser.parse_args()
+
+    spec = SyntheticDataSpec(
+        num_rows=args.rows,
+        num_wide_columns=args.wide_columns,
+        nested=not args.no_nested,
+        row_group_size=args.row_group_size,
+        seed=args.seed
+    )
+    if args.partition_by:
+        print(write_synthetic_dataset(spec, args.output_dir, tuple(args.partition_by.split(",")), overwrite=True))
+    else:
+        print(write_synthetic_file(spec, args.output_dir, overwrite=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,34 @@
 import argparse
 import multiprocessing
+import sys
 from typing import Tuple, Any, List
 
+CLI_COMMANDS = ("info", "profile", "head", "convert", "aggregate", "index")
+
 
 def parse_args() -> Tuple[Any, List]:
-    parser = argparse.ArgumentParser()
+    parser = argparse.ArgumentParser(
+        epilog=f"Headless commands: {', '.join(CLI_COMMANDS)}. Run `parquet-viewer <command> --help` for details."
+    )
     parser.add_argument('parquet_file', action='store', nargs='?', default=None, type=str)  # positional argument
+    parser.add_argument('--trace', action='store_true', help="record timings, see Performance tab")
 
     parsed_args, unparsed_args = parser.parse_known_args()
     return parsed_args, unparsed_args
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        # headless mode, Qt is never imported
+        from parquet_viewer.cli.cli_commands import run_cli
+        sys.exit(run_cli(sys.argv[1:]))
+
     from parquet_viewer.qt.qt_window import run_app
     parsed_args, unparsed_args = parse_args()
+    if parsed_args.trace:
+        from parquet_viewer._perf import PERF
+        PERF.enable()
+
     run_app(unparsed_args, parsed_args.parquet_file)
 
 
@@ -0,0 +1,55 @@
+import json
+import os.path
+from typing import Any, Dict
+
+from parquet_viewer._logger import LOGGER
+from parquet_viewer._paths import get_config_dir
+
+CONFIG_FILE_NAME = "config.json"
+
+DEFAULT_CONFIG = {
+    # 0 means unlimited
+    "memory_budget_mb": 0,
+    # size of on-disk cache of filter selections and sort permutations, 0 disables it
+    "disk_cache_mb": 1024,
+    # size of saved value indexes, 0 keeps indexes in memory only
+    "value_indexes_mb": 8192,
+    # one of built-in profiles (default, local-ssd, network, low-memory) or a custom one
+    "reader_profile": "default",
+    # custom reader profiles, e.g. {"nfs": {"pre_buffer": true, "buffer_size": 16777216}}
+    "reader_profiles": {},
+}
+
+
+def get_config_file() -> str:
+    return os.path.join(get_config_dir(), CONFIG_FILE_NAME)
+
+
+def load_config() -> Dict[str, Any]:
+    config = dict(DEFAULT_CONFIG)
+    try:
+        with open(get_config_file(), "r", encoding="utf-8") as f:
+            config.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        LOGGER.warning("Cannot read config file: %s", e)
+    return config
+
+
+def save_config(config: Dict[str, Any]) -> None:
+    path = get_config_file()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def get_config_value(key: str) -> Any:
+    return load_config().get(key, DEFAULT_CONFIG.get(key))
+
+
+def set_config_value(key: str, value: Any) -> None:
+    config = load_config()
+    config[key] = value
+    save_config(config)
@@ -0,0 +1,41 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from typing import Optional
+
+APP_DIR_NAME = "parquet-viewer"
+
+_temp_dir: Optional[str] = None
+
+
+def _get_base_dir(windows_env: str, xdg_env: str, default: str) -> str:
+    if sys.platform == "win32":
+        base_dir = os.environ.get(windows_env) or os.path.expanduser("~")
+    else:
+        base_dir = os.environ.get(xdg_env) or os.path.expanduser(default)
+    return os.path.join(base_dir, APP_DIR_NAME)
+
+
+def get_cache_dir(create: bool = True) -> str:
+    cache_dir = _get_base_dir("LOCALAPPDATA", "XDG_CACHE_HOME", "~/.cache")
+    if create:
+        os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def get_config_dir(create: bool = True) -> str:
+    config_dir = _get_base_dir("APPDATA", "XDG_CONFIG_HOME", "~/.config")
+    if create:
+        os.makedirs(config_dir, exist_ok=True)
+    return config_dir
+
+
+def get_temp_dir() -> str:
+    # files created while the app runs, e.g. results of aggregations, removed at exit
+    global _temp_dir
+    if _temp_dir is None:
+        _temp_dir = tempfile.mkdtemp(prefix=f"{APP_DIR_NAME}-")
+        atexit.register(shutil.rmtree, _temp_dir, ignore_errors=True)
+    return _temp_dir
@@ -0,0 +1,139 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Iterator, Optional, ContextManager
+
+TRACE_ENV = "PARQUET_VIEWER_TRACE"
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class PerfRecorder:
+    MAX_EVENTS = 200000
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._events: deque = deque(maxlen=self.MAX_EVENTS)
+        self._timers: Dict[str, List[float]] = {}
+        self._counters: Dict[str, int] = {}
+
+    def enable(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        # child processes (conversion workers) inherit the setting
+        if enabled:
+            os.environ[TRACE_ENV] = "1"
+        else:
+            os.environ.pop(TRACE_ENV, None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._events.clear()
+            self._timers.clear()
+            self._counters.clear()
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def span(self, name: str, **args: Any) -> ContextManager:
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, args)
+
+    @contextlib.contextmanager
+    def _span(self, name: str, args: Dict[str, Any]) -> Iterator[None]:
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, self._now_us() - start, args)
+
+    def add_span(
+            self,
+            name: str,
+            start_us: float,
+            duration_us: float,
+            args: Optional[Dict[str, Any]] = None,
+            pid: Optional[int] = None,
+            tid: Optional[int] = None
+    ) -> None:
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": start_us,
+            "dur": duration_us,
+            "pid": pid or os.getpid(),
+            "tid": tid or threading.get_ident(),
+        }
+        if args:
+            event["args"] = {k: str(v) for k, v in args.items()}
+
+        with self._lock:
+            self._events.append(event)
+            timer = self._timers.setdefault(name, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += duration_us
+            timer[2] = max(timer[2], duration_us)
+
+    def count(self, name: str, value: int = 1) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def get_counter(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    @property
+    def timers(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                name: {
+                    "count": count,
+                    "total_ms": total / 1000,
+                    "mean_ms": total / count / 1000 if count else 0.0,
+                    "max_ms": max_ / 1000
+                }
+                for name, (count, total, max_) in sorted(self._timers.items())
+            }
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def export_events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            events = list(self._events)
+
+        # shift to wall-clock based time stamps, so events of different processes can be merged
+        offset = (time.time() - time.perf_counter() + self._origin) * 1e6
+        return [dict(e, ts=e["ts"] + offset) for e in events]
+
+    def merge_events(self, events: List[Dict[str, Any]]) -> None:
+        offset = (time.time() - time.perf_counter() + self._origin) * 1e6
+        for e in events:
+            self.add_span(e["name"], e["ts"] - offset, e["dur"], e.get("args"), pid=e["pid"], tid=e["tid"])
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        events = self.export_events()
+        timestamp = time.time() * 1e6
+        events += [
+            {"name": name, "ph": "C", "ts": timestamp, "pid": os.getpid(), "tid": 0, "args": {name: value}}
+            for name, value in self.counters.items()
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+PERF = PerfRecorder(enabled=bool(os.environ.get(TRACE_ENV)))
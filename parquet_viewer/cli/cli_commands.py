@@ -0,0 +1,392 @@
+import argparse
+import dataclasses
+import itertools
+import json
+import logging
+import os
+import sys
+from typing import List, Optional, Iterator, Tuple
+
+import lark
+import pyarrow as pa
+
+from parquet_viewer._config import get_config_value
+from parquet_viewer._logger import LOGGER, log_error
+from parquet_viewer._perf import PERF
+from parquet_viewer.parquet.parquet_conversion import (
+    OutputFormat,
+    CsvDialect,
+    ConversionProcess,
+    STDOUT,
+    json_batch_writer,
+    csv_batch_writer,
+    write_batches_to_stream
+)
+from parquet_viewer.parquet.parquet_aggregate import parse_aggregations
+from parquet_viewer.parquet.parquet_cache import MEMORY_BUDGET
+from parquet_viewer.parquet.parquet_disk_cache import DISK_CACHE, VALUE_INDEXES
+from parquet_viewer.parquet.parquet_reader_options import get_configured_reader_options
+from parquet_viewer.parquet.parquet_table import ParquetTable, TableSnapshot
+
+DEFAULT_BATCH_SIZE = 10000
+MB = 1024 * 1024
+
+
+def parse_columns(columns: Optional[str]) -> Optional[List[str]]:
+    if not columns:
+        return None
+    return [c.strip() for c in columns.split(",") if c.strip()]
+
+
+def parse_sort_keys(sort: Optional[str]) -> List[Tuple[str, str]]:
+    sort_keys = []
+    for key in parse_columns(sort) or []:
+        column, _, order = key.partition(":")
+        order = {"": "ascending", "asc": "ascending", "desc": "descending"}.get(order.strip().lower(), order)
+        if order not in ("ascending", "descending"):
+            raise ValueError(f"Unknown sort order '{order}' for column '{column}', use 'asc' or 'desc'")
+        sort_keys.append((column.strip(), order))
+    return sort_keys
+
+
+def parse_dictionary_columns(columns: str) -> Optional[List[str]]:
+    if columns == "auto":
+        return None
+    if columns == "none":
+        return []
+    return parse_columns(columns) or []
+
+
+def open_parquet_table(args: argparse.Namespace) -> ParquetTable:
+    return ParquetTable(
+        args.parquet_file,
+        args.batch_size,
+        get_configured_reader_options(args.reader_profile),
+        parse_dictionary_columns(args.dictionary_columns)
+    )
+
+
+def check_columns(parquet_table: ParquetTable, columns: Optional[List[str]]) -> None:
+    if columns is None:
+        return
+
+    available_columns = parquet_table.column_names
+    unknown_columns = [c for c in columns if c not in available_columns]
+    if unknown_columns:
+        raise ValueError(
+            f"Unknown columns: {', '.join(unknown_columns)}. "
+            f"Available columns are: {', '.join(available_columns)}"
+        )
+
+
+def limit_rows(batches: Iterator[pa.RecordBatch], num_rows: int) -> Iterator[pa.RecordBatch]:
+    for batch in batches:
+        if num_rows <= 0:
+            return
+
+        batch = batch.slice(0, num_rows)
+        num_rows -= batch.num_rows
+        yield batch
+
+
+def stderr_progress_cb(num_batches: int, batch: int) -> bool:
+    LOGGER.info("Written %s of %s batches", batch, num_batches)
+    return False
+
+
+def no_progress_cb(num_batches: int, batch: int) -> bool:
+    return False
+
+
+def open_writer_for_format(output_format: OutputFormat, fieldnames: List[str], csv_dialect: CsvDialect):
+    if output_format == OutputFormat.CSV:
+        return csv_batch_writer(fieldnames, csv_dialect)
+    return json_batch_writer
+
+
+def stream_batches(
+        batches: Iterator[pa.RecordBatch],
+        output: str,
+        output_format: OutputFormat,
+        fieldnames: List[str],
+        csv_dialect: CsvDialect
+) -> bool:
+    open_writer = open_writer_for_format(output_format, fieldnames, csv_dialect)
+    if output == STDOUT:
+        return write_batches_to_stream(batches, sys.stdout, stderr_progress_cb, open_writer)
+
+    newline = "" if output_format == OutputFormat.CSV else None
+    with open(output, "w", newline=newline, encoding="utf-8") as f:
+        return write_batches_to_stream(batches, f, stderr_progress_cb, open_writer)
+
+
+def command_info(args: argparse.Namespace) -> None:
+    parquet_table = ParquetTable(args.parquet_file, DEFAULT_BATCH_SIZE, get_configured_reader_options(args.reader_profile))
+
+    for key, value in parquet_table.footer_info.items():
+        print(f"{key}: {value}")
+
+    if args.schema:
+        print()
+        print(parquet_table.schema)
+
+
+def command_profile(args: argparse.Namespace) -> None:
+    parquet_table = ParquetTable(args.parquet_file, DEFAULT_BATCH_SIZE, get_configured_reader_options(args.reader_profile))
+
+    if not args.deep:
+        for profile in parquet_table.footer_profile:
+            print(json.dumps(dataclasses.asdict(profile), default=str))
+        return
+
+    columns = parse_columns(args.columns)
+    check_columns(parquet_table, columns)
+
+    def progress_cb(num_chunks: int, chunk: int) -> bool:
+        LOGGER.info("Profiled %s of %s column chunks", chunk, num_chunks)
+        return False
+
+    for profile in parquet_table.get_column_profiles(columns, progress_cb).values():
+        print(json.dumps(dataclasses.asdict(profile), default=str))
+
+
+def command_head(args: argparse.Namespace) -> None:
+    parquet_table = open_parquet_table(args)
+    columns = parse_columns(args.columns)
+    sort_keys = parse_sort_keys(args.sort)
+    check_columns(parquet_table, columns)
+    check_columns(parquet_table, [column for column, _ in sort_keys])
+
+    if sort_keys or parquet_table.has_value_indexes(args.filter):
+        # the whole filtered table is needed, first rows are found with a partial sort;
+        # or matching rows are looked up in indexes
+        parquet_table.filters = args.filter
+        parquet_table.sort_keys = sort_keys
+        if sort_keys:
+            table = parquet_table.take_sorted(0, max(0, args.num_rows))
+        else:
+            table = parquet_table.lazy_filtered_table.slice(0, max(0, args.num_rows))
+        if columns is not None:
+            table = table.select(columns)
+        batches = iter(table.to_batches())
+    else:
+        # reading stops when enough rows are found, row groups not matching filters are skipped
+        batches = limit_rows(
+            parquet_table.iter_batches(batch_size=args.batch_size, columns=columns, filters=args.filter),
+            args.num_rows
+        )
+
+    # the schema is known only after the first batch is read
+    first_batches = list(itertools.islice(batches, 1))
+    fieldnames = first_batches[0].schema.names if first_batches else (columns or [])
+
+    write_batches_to_stream(
+        itertools.chain(first_batches, batches),
+        sys.stdout,
+        no_progress_cb,
+        open_writer_for_format(args.format, fieldnames, args.csv_dialect)
+    )
+
+
+def command_convert(args: argparse.Namespace) -> None:
+    parquet_table = open_parquet_table(args)
+    columns = parse_columns(args.columns)
+    sort_keys = parse_sort_keys(args.sort)
+    check_columns(parquet_table, columns)
+    check_columns(parquet_table, [column for column, _ in sort_keys])
+
+    if not sort_keys and not args.resume and not parquet_table.has_value_indexes(args.filter):
+        # streamed batch by batch, only the read columns of the current batch are in memory
+        success = stream_batches(
+            parquet_table.iter_batches(batch_size=args.batch_size, columns=columns, filters=args.filter),
+            args.output,
+            args.format,
+            columns or parquet_table.column_names,
+            args.csv_dialect
+        )
+        if not success:
+            raise RuntimeError("Conversion was aborted")
+        return
+
+    # sorted exports gather rows of the whole filtered table, interrupted exports are resumed by batch numbers
+    parquet_table.filters = args.filter
+    parquet_table.sort_keys = sort_keys
+    table = parquet_table.lazy_filtered_table
+    if columns is not None:
+        table = table.select(columns)
+
+    conv_func = ConversionProcess.CONV_FUNCTIONS[args.format]
+    success = conv_func(
+        table=table,
+        output_file=args.output,
+        batch_size=args.batch_size,
+        csv_dialect=args.csv_dialect,
+        progress_cb=stderr_progress_cb,
+        resume=args.resume,
+        # rows are gathered in the sort order batch by batch
+        indices=parquet_table.sort_indices,
+        source_identity=parquet_table.identity,
+        filters=args.filter,
+        sort_keys=sort_keys
+    )
+
+    if not success:
+        raise RuntimeError("Conversion was aborted")
+
+
+def command_aggregate(args: argparse.Namespace) -> None:
+    parquet_table = ParquetTable(args.parquet_file, DEFAULT_BATCH_SIZE, get_configured_reader_options(args.reader_profile))
+    group_keys = parse_columns(args.group_by) or []
+    check_columns(parquet_table, group_keys)
+
+    # the file is streamed and filtered batch by batch, only partial aggregates are kept in memory
+    snapshot = TableSnapshot(filters=args.filter.strip())
+    result = parquet_table.aggregate(group_keys, parse_aggregations(args.agg), snapshot=snapshot)
+
+    write_batches_to_stream(
+        iter(result.to_batches()),
+        sys.stdout,
+        no_progress_cb,
+        open_writer_for_format(args.format, result.schema.names, args.csv_dialect)
+    )
+
+
+def command_index(args: argparse.Namespace) -> None:
+    parquet_table = ParquetTable(args.parquet_file, DEFAULT_BATCH_SIZE, get_configured_reader_options(args.reader_profile))
+    columns = parse_columns(args.columns) or []
+    check_columns(parquet_table, columns)
+
+    if not VALUE_INDEXES.enabled:
+        LOGGER.warning("Value indexes are disabled in the config file, indexes will not be saved")
+
+    for column in columns:
+        index = parquet_table.build_value_index(column)
+        print(f"{column}: {len(index.values)} values, {index.nbytes} Bytes")
+
+
+def add_common_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("parquet_file", action="store", type=str, help="parquet file, directory or glob pattern")
+    parser.add_argument("--sort", action="store", type=str, default=None,
+                        help="comma separated sort keys, e.g. 'amount:desc,id'")
+    parser.add_argument("--filter", action="store", type=str, default="", help="filters in SQL-like syntax")
+    parser.add_argument("--columns", action="store", type=str, default=None, help="comma separated list of columns")
+    parser.add_argument("--format", action="store", type=OutputFormat, choices=list(OutputFormat),
+                        default=OutputFormat.JSON)
+    parser.add_argument("--csv-dialect", action="store", type=CsvDialect, choices=list(CsvDialect),
+                        default=CsvDialect.EXCEL)
+    parser.add_argument("--batch-size", action="store", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--dictionary-columns", action="store", type=str, default="auto",
+                        help="comma separated list of string columns to read as dictionaries, "
+                             "'auto' to detect low cardinality columns, 'none' to disable")
+
+
+def create_parser() -> argparse.ArgumentParser:
+    verbose_parser = argparse.ArgumentParser(add_help=False)
+    verbose_parser.add_argument("-v", "--verbose", action="store_true", help="log progress to stderr")
+    verbose_parser.add_argument("--trace", action="store", type=str, default=None,
+                                help="save timings to a Chrome trace JSON file")
+    verbose_parser.add_argument("--reader-profile", action="store", type=str, default=None,
+                                help="parquet reader options profile, default from config file")
+    verbose_parser.add_argument("--memory-budget", action="store", type=int, default=None,
+                                help="memory budget in MB for cached data, default from config file")
+    verbose_parser.add_argument("--disk-cache", action="store", type=int, default=None,
+                                help="size in MB of on-disk cache of filter selections and sort orders, "
+                                     "0 disables it, default from config file")
+
+    parser = argparse.ArgumentParser(prog="parquet-viewer")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    info_parser = subparsers.add_parser(
+        "info", help="show file metadata without reading the data", parents=[verbose_parser]
+    )
+    info_parser.add_argument("parquet_file", action="store", type=str, help="parquet file, directory or glob pattern")
+    info_parser.add_argument("--schema", action="store_true", help="print the schema as well")
+    info_parser.set_defaults(func=command_info)
+
+    profile_parser = subparsers.add_parser(
+        "profile", help="print column statistics from the footer, or computed from the data", parents=[verbose_parser]
+    )
+    profile_parser.add_argument("parquet_file", action="store", type=str, help="parquet file, directory or glob pattern")
+    profile_parser.add_argument("--deep", action="store_true",
+                                help="read the data and count distinct values, top values and histograms")
+    profile_parser.add_argument("--columns", action="store", type=str, default=None,
+                                help="comma separated list of columns profiled with --deep")
+    profile_parser.set_defaults(func=command_profile)
+
+    head_parser = subparsers.add_parser("head", help="print first rows to stdout", parents=[verbose_parser])
+    add_common_arguments(head_parser)
+    head_parser.add_argument("-n", "--num-rows", action="store", type=int, default=10)
+    head_parser.set_defaults(func=command_head)
+
+    convert_parser = subparsers.add_parser(
+        "convert", help="convert the file to JSON or CSV", parents=[verbose_parser]
+    )
+    add_common_arguments(convert_parser)
+    convert_parser.add_argument("-o", "--output", action="store", type=str, default=STDOUT,
+                                help=f"output file, '{STDOUT}' for stdout")
+    convert_parser.add_argument("--resume", action="store_true", help="resume an interrupted conversion")
+    convert_parser.set_defaults(func=command_convert)
+
+    aggregate_parser = subparsers.add_parser(
+        "aggregate", help="print aggregates of groups of rows to stdout", parents=[verbose_parser]
+    )
+    aggregate_parser.add_argument("parquet_file", action="store", type=str,
+                                  help="parquet file, directory or glob pattern")
+    aggregate_parser.add_argument("--group-by", action="store", type=str, required=True,
+                                  help="comma separated list of group keys")
+    aggregate_parser.add_argument("--agg", action="store", type=str, default="count",
+                                  help="comma separated aggregations, e.g. 'count,sum(amount),count_distinct(user)', "
+                                       "functions are count, sum, mean, min, max and count_distinct")
+    aggregate_parser.add_argument("--filter", action="store", type=str, default="", help="filters in SQL-like syntax")
+    aggregate_parser.add_argument("--format", action="store", type=OutputFormat, choices=list(OutputFormat),
+                                  default=OutputFormat.JSON)
+    aggregate_parser.add_argument("--csv-dialect", action="store", type=CsvDialect, choices=list(CsvDialect),
+                                  default=CsvDialect.EXCEL)
+    aggregate_parser.set_defaults(func=command_aggregate)
+
+    index_parser = subparsers.add_parser(
+        "index", help="build value indexes used by filters on the columns", parents=[verbose_parser]
+    )
+    index_parser.add_argument("parquet_file", action="store", type=str, help="parquet file, directory or glob pattern")
+    index_parser.add_argument("--columns", action="store", type=str, required=True,
+                              help="comma separated list of columns to index")
+    index_parser.set_defaults(func=command_index)
+
+    return parser
+
+
+def run_cli(argv: List[str]) -> int:
+    args = create_parser().parse_args(argv)
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    if args.trace:
+        PERF.enable()
+
+    memory_budget_mb = args.memory_budget if args.memory_budget is not None else get_config_value("memory_budget_mb")
+    MEMORY_BUDGET.set_budget(memory_budget_mb * MB)
+    disk_cache_mb = args.disk_cache if args.disk_cache is not None else get_config_value("disk_cache_mb")
+    DISK_CACHE.set_max_bytes(disk_cache_mb * MB)
+    VALUE_INDEXES.set_max_bytes(get_config_value("value_indexes_mb") * MB)
+
+    try:
+        with PERF.span(f"cli.{args.command}"):
+            args.func(args)
+    except BrokenPipeError:
+        # output consumer exited early, e.g. `parquet-viewer head f.parquet | head -1`
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    except (lark.exceptions.UnexpectedInput, lark.exceptions.VisitError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    except (FileNotFoundError, pa.lib.ArrowInvalid, ValueError, RuntimeError) as e:
+        if args.verbose:
+            log_error(e)
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.trace:
+            PERF.save_chrome_trace(args.trace)
+
+    return 0
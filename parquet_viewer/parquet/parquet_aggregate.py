@@ -0,0 +1,264 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from parquet_viewer._perf import PERF
+from parquet_viewer.parquet.parquet_conversion import ProgressCallback
+from parquet_viewer.parquet.parquet_filters import get_value_type
+
+AGGREGATE_FUNCTIONS = ("count", "sum", "mean", "min", "max", "count_distinct")
+# `count` without a column counts rows of groups, `count(column)` counts non-null values
+COUNT_ROWS = "*"
+
+# rows of an in-memory table aggregated at once, close to a row group of files written with default settings
+AGGREGATE_BATCH_ROWS = 64 * 1024
+# partial aggregates are merged when they have more rows, so memory is bounded by the number of groups
+MAX_PARTIAL_ROWS = 1024 * 1024
+
+# alias of the first group key counted in all rows
+ROWS_COLUMN = "__rows"
+
+_AGGREGATION_PATTERN = re.compile(r"^(\w+)\s*(?:\(\s*(.*?)\s*\))?$")
+
+# hash function of partial aggregates in batches and function merging partial aggregates of groups
+_PARTIAL_FUNCTIONS = {
+    "count": "sum",
+    "sum": "sum",
+    "min": "min",
+    "max": "max",
+}
+_MIN_MAX = ("min", "max")
+
+
+@dataclass(frozen=True)
+class Aggregation:
+    function: str
+    column: str = COUNT_ROWS
+
+    @property
+    def name(self) -> str:
+        # column of the result
+        return self.function if self.column == COUNT_ROWS else f"{self.column}_{self.function}"
+
+    def __str__(self) -> str:
+        return self.function if self.column == COUNT_ROWS else f"{self.function}({self.column})"
+
+
+def parse_aggregations(text: str) -> List[Aggregation]:
+    """Comma separated aggregations, e.g. `count, sum(amount), count_distinct(user_id)`."""
+    aggregations = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        match = _AGGREGATION_PATTERN.match(part)
+        if match is None:
+            raise ValueError(f"Cannot parse aggregation '{part}', expected e.g. 'sum(amount)'")
+        function, column = match.group(1).lower(), match.group(2)
+        aggregations.append(Aggregation(function, column or COUNT_ROWS))
+    return aggregations
+
+
+def _is_number_type(data_type: pa.DataType) -> bool:
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_decimal(data_type)
+
+
+def check_aggregation(schema: pa.Schema, group_keys: List[str], aggregations: List[Aggregation]) -> None:
+    if not group_keys:
+        raise ValueError("Choose at least one group key")
+    if not aggregations:
+        raise ValueError("Choose at least one aggregation")
+
+    for key in group_keys:
+        if key not in schema.names:
+            raise ValueError(f"Unknown group key '{key}'")
+        if pa.types.is_nested(get_value_type(schema.field(key).type)):
+            raise ValueError(f"Column '{key}' of type {schema.field(key).type} cannot be a group key")
+
+    for aggregation in aggregations:
+        if aggregation.function not in AGGREGATE_FUNCTIONS:
+            raise ValueError(
+                f"Unknown aggregation '{aggregation.function}', use one of: {', '.join(AGGREGATE_FUNCTIONS)}"
+            )
+        if aggregation.column == COUNT_ROWS:
+            if aggregation.function != "count":
+                raise ValueError(f"Aggregation '{aggregation.function}' needs a column")
+            continue
+        if aggregation.column not in schema.names:
+            raise ValueError(f"Unknown column '{aggregation.column}' in {aggregation}")
+
+        data_type = get_value_type(schema.field(aggregation.column).type)
+        if aggregation.function in ("sum", "mean") and not _is_number_type(data_type):
+            raise ValueError(f"Cannot apply {aggregation} to column of type {data_type}")
+        if aggregation.function != "count" and pa.types.is_nested(data_type):
+            raise ValueError(f"Cannot apply {aggregation} to column of type {data_type}")
+
+
+def get_aggregation_columns(group_keys: List[str], aggregations: List[Aggregation]) -> List[str]:
+    return list(dict.fromkeys(group_keys + [a.column for a in aggregations if a.column != COUNT_ROWS]))
+
+
+def _decode_dictionaries(table: pa.Table, columns: Optional[List[str]] = None) -> pa.Table:
+    # dictionaries of batches differ, partial aggregates are merged by values
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type) and (columns is None or field.name in columns):
+            table = table.set_column(i, field.name, pc.cast(table.column(i), field.type.value_type))
+    return table
+
+
+class PartialAggregate:
+    """
+    Aggregates of groups merged batch by batch: counts, sums, minimums and maximums of batches are combined,
+    means are sums divided by counts, distinct values are kept per group.
+    """
+
+    def __init__(self, group_keys: List[str], aggregations: List[Aggregation]) -> None:
+        self.group_keys = group_keys
+        self.aggregations = aggregations
+
+        # (column, function) aggregated in batches, shared by aggregations, e.g. sums of `sum` and `mean`
+        self._specs: List[Tuple[str, str]] = []
+        for aggregation in aggregations:
+            for spec in self._get_specs(aggregation):
+                if spec not in self._specs:
+                    self._specs.append(spec)
+        # distinct values of group keys are known from the groups
+        self._distinct_columns = list(dict.fromkeys(
+            a.column for a in aggregations if a.function == "count_distinct" and a.column not in group_keys
+        ))
+
+        self._partials: List[pa.Table] = []
+        self._distincts: Dict[str, List[pa.Table]] = {column: [] for column in self._distinct_columns}
+        self._num_partial_rows = 0
+
+    def _get_specs(self, aggregation: Aggregation) -> List[Tuple[str, str]]:
+        if aggregation.column == COUNT_ROWS:
+            return [(ROWS_COLUMN, "count")]
+        if aggregation.function == "mean":
+            return [(aggregation.column, "sum"), (aggregation.column, "count")]
+        if aggregation.function == "count_distinct":
+            return []
+        return [(aggregation.column, aggregation.function)]
+
+    @staticmethod
+    def _get_spec_name(spec: Tuple[str, str]) -> str:
+        return f"{spec[0]}_{spec[1]}"
+
+    def _merge(self, partials: List[pa.Table]) -> pa.Table:
+        merged = pa.concat_tables(partials).group_by(self.group_keys).aggregate(
+            [(self._get_spec_name(spec), _PARTIAL_FUNCTIONS[spec[1]]) for spec in self._specs]
+        )
+        return pa.table(
+            [merged[key] for key in self.group_keys] + [
+                merged[f"{self._get_spec_name(spec)}_{_PARTIAL_FUNCTIONS[spec[1]]}"] for spec in self._specs
+            ],
+            names=self.group_keys + [self._get_spec_name(spec) for spec in self._specs]
+        )
+
+    def _merge_distinct(self, column: str, partials: List[pa.Table]) -> pa.Table:
+        return pa.concat_tables(partials).group_by(self.group_keys + [column]).aggregate([])
+
+    def add(self, table: pa.Table) -> None:
+        with PERF.span("aggregate.batch", rows=table.num_rows):
+            aggregates = [
+                (column, function, pc.CountOptions("all")) if column == ROWS_COLUMN else (column, function)
+                for column, function in self._specs
+            ]
+            if any(column == ROWS_COLUMN for column, _ in self._specs):
+                table = table.append_column(ROWS_COLUMN, table[self.group_keys[0]])
+            # minimums and maximums have no kernels for dictionaries, group keys are grouped by indices
+            table = _decode_dictionaries(table, [column for column, function in self._specs if function in _MIN_MAX])
+
+            partial = _decode_dictionaries(table.group_by(self.group_keys).aggregate(aggregates))
+            self._partials.append(partial.select(
+                self.group_keys + [self._get_spec_name(spec) for spec in self._specs]
+            ))
+            self._num_partial_rows += partial.num_rows
+
+            for column in self._distinct_columns:
+                keys = self.group_keys + [column]
+                distinct = table.select(keys).group_by(keys).aggregate([])
+                self._distincts[column].append(_decode_dictionaries(distinct).select(keys))
+                self._num_partial_rows += distinct.num_rows
+
+        if self._num_partial_rows > MAX_PARTIAL_ROWS:
+            self._compact()
+
+    def _compact(self) -> None:
+        with PERF.span("aggregate.compact", rows=self._num_partial_rows):
+            self._partials = [self._merge(self._partials)]
+            self._num_partial_rows = self._partials[0].num_rows
+            for column, partials in self._distincts.items():
+                self._distincts[column] = [self._merge_distinct(column, partials)]
+                self._num_partial_rows += self._distincts[column][0].num_rows
+
+    def _count_distinct(self, merged: pa.Table, column: str) -> pa.Array:
+        # distinct counts are aligned with groups of the merged table by grouping both on group keys
+        keys = merged.select(self.group_keys)
+        if column in self.group_keys:
+            counts = pc.cast(pc.is_valid(merged[column]), pa.int64())
+            return counts.combine_chunks() if isinstance(counts, pa.ChunkedArray) else counts
+
+        distinct = self._merge_distinct(column, self._distincts[column])
+        distinct = distinct.filter(pc.is_valid(distinct[column])).select(self.group_keys)
+        # rows of groups in the merged table, and a count of one for each distinct value
+        keys = keys.append_column("__row", pa.array(np.arange(merged.num_rows)))
+        keys = keys.append_column("__count", pa.nulls(merged.num_rows, pa.int64()))
+        distinct = distinct.append_column("__row", pa.nulls(distinct.num_rows, pa.int64()))
+        distinct = distinct.append_column("__count", pa.array(np.ones(distinct.num_rows, dtype=np.int64)))
+        aligned = pa.concat_tables([keys, distinct]).group_by(self.group_keys).aggregate(
+            [("__row", "max"), ("__count", "sum")]
+        )
+
+        counts = np.zeros(merged.num_rows, dtype=np.int64)
+        counts[aligned["__row_max"].to_numpy()] = pc.fill_null(aligned["__count_sum"], 0).to_numpy()
+        return pa.array(counts)
+
+    def result(self) -> pa.Table:
+        """Group keys and aggregations in the given order, sorted by group keys."""
+        with PERF.span("aggregate.merge", rows=self._num_partial_rows):
+            merged = self._merge(self._partials)
+
+            columns = [merged[key] for key in self.group_keys]
+            for aggregation in self.aggregations:
+                if aggregation.function == "count_distinct":
+                    columns.append(self._count_distinct(merged, aggregation.column))
+                elif aggregation.function == "mean":
+                    total = pc.cast(merged[self._get_spec_name((aggregation.column, "sum"))], pa.float64())
+                    count = pc.cast(merged[self._get_spec_name((aggregation.column, "count"))], pa.float64())
+                    columns.append(pc.divide(total, count))
+                else:
+                    columns.append(merged[self._get_spec_name(self._get_specs(aggregation)[0])])
+
+            result = pa.table(columns, names=self.group_keys + [a.name for a in self.aggregations])
+            return result.sort_by([(key, "ascending") for key in self.group_keys])
+
+
+def aggregate_batches(
+        batches: Iterable[pa.RecordBatch],
+        schema: pa.Schema,
+        group_keys: List[str],
+        aggregations: List[Aggregation],
+        num_rows: int,
+        progress_cb: Optional[ProgressCallback] = None
+) -> Optional[pa.Table]:
+    """
+    Aggregates of groups of rows of `batches` with `num_rows` in total,
+    only partial aggregates are kept in memory. None if aborted by `progress_cb`.
+    """
+    partial = PartialAggregate(group_keys, aggregations)
+    # an empty table gives an empty result with the types of aggregates
+    partial.add(schema.empty_table())
+
+    num_done = 0
+    for batch in batches:
+        partial.add(pa.Table.from_batches([batch], schema=schema))
+        num_done += batch.num_rows
+        if progress_cb is not None and progress_cb(num_rows, num_done):
+            return None
+
+    return partial.result()
@@ -0,0 +1,178 @@
+import itertools
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple, List
+
+import pyarrow as pa
+
+from parquet_viewer._logger import LOGGER
+from parquet_viewer._perf import PERF
+
+# Rough ratio between the size of python objects created by `to_pylist` and the size of arrow data
+PY_OBJECTS_OVERHEAD = 6
+
+
+def estimate_py_nbytes(data: Any) -> int:
+    if isinstance(data, (pa.Table, pa.RecordBatch)):
+        return data.nbytes * PY_OBJECTS_OVERHEAD
+    return 0
+
+
+class LRUCache:
+    def __init__(self, name: str, budget: Optional["MemoryBudget"] = None) -> None:
+        self.name = name
+        self.budget = budget or MEMORY_BUDGET
+
+        self._lock = threading.RLock()
+        # key -> (last access tick, size in bytes, value)
+        self._entries: "OrderedDict[Hashable, Tuple[int, int, Any]]" = OrderedDict()
+        self._nbytes = 0
+
+        self.budget.register(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                PERF.count(f"cache.{self.name}.miss")
+                return None
+
+            PERF.count(f"cache.{self.name}.hit")
+            self._entries[key] = (self.budget.tick(), entry[1], entry[2])
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def put(self, key: Hashable, value: Any, nbytes: int) -> Any:
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (self.budget.tick(), nbytes, value)
+            self._nbytes += nbytes
+
+        # the entry being put is never evicted, even if it alone exceeds the budget
+        self.budget.enforce(keep=(self, key))
+        return value
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._nbytes -= entry[1]
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def _oldest_key(self, keep: Optional[Hashable] = None) -> Optional[Hashable]:
+        return next((key for key in self._entries if key != keep), None)
+
+    def oldest_tick(self, keep: Optional[Hashable] = None) -> Optional[int]:
+        with self._lock:
+            key = self._oldest_key(keep)
+            return None if key is None else self._entries[key][0]
+
+    def evict_oldest(self, keep: Optional[Hashable] = None) -> int:
+        with self._lock:
+            key = self._oldest_key(keep)
+            if key is None:
+                return 0
+
+            _, nbytes, _ = self._entries.pop(key)
+            self._nbytes -= nbytes
+
+        PERF.count(f"cache.{self.name}.evicted")
+        LOGGER.debug("Evicted %s from %s cache, %s bytes", key, self.name, nbytes)
+        return nbytes
+
+
+class MemoryBudget:
+    def __init__(self, budget_bytes: int = 0) -> None:
+        # 0 means unlimited
+        self.budget_bytes = budget_bytes
+
+        self._lock = threading.RLock()
+        self._ticks = itertools.count()
+        self._caches: "weakref.WeakSet[LRUCache]" = weakref.WeakSet()
+
+    def tick(self) -> int:
+        return next(self._ticks)
+
+    def register(self, cache: LRUCache) -> None:
+        self._caches.add(cache)
+
+    @property
+    def caches(self) -> List[LRUCache]:
+        return sorted(self._caches, key=lambda c: c.name)
+
+    @property
+    def arrow_allocated_bytes(self) -> int:
+        return pa.total_allocated_bytes()
+
+    @property
+    def arrow_peak_bytes(self) -> int:
+        return pa.default_memory_pool().max_memory() or 0
+
+    @property
+    def used_bytes(self) -> int:
+        # only bytes held by caches, the table read from files is not owned by any cache and cannot be evicted
+        return sum(c.nbytes for c in list(self._caches))
+
+    def set_budget(self, budget_bytes: int) -> None:
+        self.budget_bytes = max(0, budget_bytes)
+        self.enforce()
+
+    def _evict_one(self, keep: Optional[Tuple[LRUCache, Hashable]] = None) -> bool:
+        def kept_key(cache: LRUCache) -> Optional[Hashable]:
+            return keep[1] if keep is not None and keep[0] is cache else None
+
+        candidates = [(c.oldest_tick(kept_key(c)), c) for c in list(self._caches)]
+        candidates = [(tick, c) for tick, c in candidates if tick is not None]
+        if not candidates:
+            return False
+
+        _, cache = min(candidates, key=lambda tc: tc[0])
+        cache.evict_oldest(kept_key(cache))
+        return True
+
+    def enforce(self, keep: Optional[Tuple[LRUCache, Hashable]] = None) -> None:
+        """Least recently used entries of all caches are evicted until they fit, except the `keep` entry."""
+        if not self.budget_bytes:
+            return
+
+        with self._lock:
+            while self.used_bytes > self.budget_bytes:
+                if not self._evict_one(keep):
+                    LOGGER.debug("Memory budget %s bytes is exceeded by a single entry", self.budget_bytes)
+                    break
+
+    @property
+    def info(self) -> Dict[str, str]:
+        info = {
+            "Memory Budget": f"{self.budget_bytes} Bytes" if self.budget_bytes else "Unlimited",
+            "Held by Caches": f"{self.used_bytes} Bytes",
+            "Arrow Memory Pool": pa.default_memory_pool().backend_name,
+            "Arrow Allocated": f"{self.arrow_allocated_bytes} Bytes",
+            "Arrow Allocated Peak": f"{self.arrow_peak_bytes} Bytes",
+        }
+        caches: Dict[str, List[int]] = {}
+        for cache in self.caches:
+            entries, nbytes = caches.setdefault(cache.name, [0, 0])
+            caches[cache.name] = [entries + len(cache), nbytes + cache.nbytes]
+
+        for name, (entries, nbytes) in caches.items():
+            info[f"Cache '{name}'"] = f"{entries} entries, {nbytes} Bytes"
+        return info
+
+
+MEMORY_BUDGET = MemoryBudget()
@@ -1,19 +1,35 @@
 import os.path
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from multiprocessing import Process, Pipe
 import datetime
 import enum
+import hashlib
+import itertools
 import json
 import csv
+import sys
+import time
 
 import pyarrow as pa
 
-from typing import Any, Callable, Optional, Generator, Dict, Union
+from typing import (
+    Any, Callable, Optional, Generator, Dict, Union, TextIO, List, Iterable, Iterator, Sequence, Sized, Tuple
+)
 
 from parquet_viewer._logger import LOGGER
+from parquet_viewer._perf import PERF
 
 ProgressCallback = Callable[[int, int], bool]
 
+# Minimal number of seconds between two export checkpoints
+CHECKPOINT_INTERVAL = 1.0
+# Part of export job signatures, bump it when rows or text written by exports change
+# (filter or sort semantics, value formatting), so checkpoints of older jobs are not resumed
+CHECKPOINT_VERSION = 2
+
+# Output file name to write to the standard output
+STDOUT = "-"
+
 
 class ConversionStatus(str, enum.Enum):
     PENDING = "Pending"
@@ -29,6 +45,8 @@ class ProgressData:
     num_batches: int
     status: ConversionStatus
     context: Any = None
+    # trace events recorded by a conversion worker process
+    perf_events: Optional[list] = None
 
 
 class OutputFormat(str, enum.Enum):
@@ -65,80 +83,329 @@ class CSVEncoder:
         return {key: self.encode_value(value) for key, value in row.items()}
 
 
-def convert_parquet_to_json(
+@dataclass
+class ExportCheckpoint:
+    SUFFIX = ".checkpoint"
+
+    job_signature: str
+    batch: int
+    offset: int
+
+    @classmethod
+    def get_path(cls, output_file: str) -> str:
+        return os.path.abspath(output_file) + cls.SUFFIX
+
+    @classmethod
+    def exists(cls, output_file: str) -> bool:
+        return os.path.isfile(cls.get_path(output_file)) and os.path.isfile(output_file)
+
+    @classmethod
+    def load(cls, output_file: str, job_signature: str) -> Optional["ExportCheckpoint"]:
+        try:
+            with open(cls.get_path(output_file), "r", encoding="utf-8") as f:
+                checkpoint = cls(**json.load(f))
+        except (OSError, ValueError, TypeError) as e:
+            LOGGER.debug("No usable checkpoint for %s: %s", output_file, e)
+            return None
+
+        if checkpoint.job_signature != job_signature:
+            LOGGER.info("Checkpoint for %s belongs to a different export job", output_file)
+            return None
+
+        if not os.path.isfile(output_file) or os.path.getsize(output_file) < checkpoint.offset:
+            LOGGER.info("Output file %s is shorter than its checkpoint", output_file)
+            return None
+
+        return checkpoint
+
+    @classmethod
+    def remove(cls, output_file: str) -> None:
+        try:
+            os.unlink(cls.get_path(output_file))
+        except FileNotFoundError:
+            pass
+
+    def save(self, output_file: str) -> None:
+        path = self.get_path(output_file)
+        tmp_path = path + ".tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+def get_indices_digest(indices: Optional[pa.Array]) -> str:
+    if indices is None:
+        return ""
+
+    digest = hashlib.sha1()
+    for buffer in indices.buffers():
+        if buffer is not None:
+            digest.update(buffer)
+    return digest.hexdigest()
+
+
+def get_job_signature(table: pa.Table, batch_size: int, indices: Optional[pa.Array] = None, **options: Any) -> str:
+    """
+    Checkpoints of a different job are not resumed, e.g. of another file with the same schema,
+    a rewritten file or other filters: `options` include the source identity, filters and sort keys.
+    """
+    signature = {
+        "version": CHECKPOINT_VERSION,
+        "schema": table.schema.to_string(),
+        "num_rows": table.num_rows if indices is None else len(indices),
+        "batch_size": batch_size,
+        "indices": get_indices_digest(indices),
+        **{key: str(value) for key, value in options.items()}
+    }
+    return hashlib.sha1(json.dumps(signature, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class TakeBatches(Sequence):
+    """
+    Rows of a table in the order of `indices` (a permutation or a selection),
+    gathered with `take` one batch at a time, so a reordered table is never materialized.
+    """
+
+    def __init__(self, table: pa.Table, indices: pa.Array, batch_size: int) -> None:
+        self.table = table
+        self.indices = indices
+        self.batch_size = batch_size
+
+    def __len__(self) -> int:
+        return -(-len(self.indices) // self.batch_size)
+
+    def __getitem__(self, batch: int) -> pa.RecordBatch:
+        start = batch * self.batch_size
+        with PERF.span("export.take", batch=batch):
+            batches = self.table.take(self.indices[start:start + self.batch_size]).combine_chunks().to_batches()
+        return batches[0] if batches else pa.RecordBatch.from_pylist([], schema=self.table.schema)
+
+    def __iter__(self) -> Iterator[pa.RecordBatch]:
+        return (self[i] for i in range(len(self)))
+
+
+def to_indices_array(indices: Union[pa.Array, pa.ChunkedArray, List[int], None]) -> Optional[pa.Array]:
+    if indices is None:
+        return None
+    if isinstance(indices, pa.ChunkedArray):
+        indices = indices.combine_chunks()
+    if isinstance(indices, pa.Array):
+        return indices.cast(pa.uint64())
+    return pa.array(indices, type=pa.uint64())
+
+
+def get_batches(table: pa.Table, batch_size: int, indices: Optional[pa.Array] = None) -> Sequence[pa.RecordBatch]:
+    if indices is not None:
+        return TakeBatches(table, indices, batch_size)
+
+    with PERF.span("export.to_batches", batch_size=batch_size):
+        return table.to_batches(batch_size)
+
+
+def iter_batches_from(batches: Iterable[pa.RecordBatch], start: int) -> Iterator[pa.RecordBatch]:
+    # batches of a table are taken by number, streamed batches are read and skipped
+    if isinstance(batches, Sequence):
+        return (batches[i] for i in range(start, len(batches)))
+    return itertools.islice(batches, start, None)
+
+
+BatchWriter = Callable[[pa.RecordBatch], None]
+
+
+def write_batches(
         table: pa.Table,
         output_file: str,
         batch_size: int,
         progress_cb: ProgressCallback,
-        **kwargs: Any
+        open_writer: Callable[[TextIO, bool], BatchWriter],
+        job_signature: str,
+        resume: bool = False,
+        newline: Optional[str] = None,
+        indices: Optional[pa.Array] = None,
+        batches: Optional[Iterable[pa.RecordBatch]] = None,
+        num_batches: int = 0
 ) -> bool:
-    encoder = ExtendedJSONEncoder(indent=None, separators=(',', ':'))
-    batches = table.to_batches(batch_size)
-    num_batches = len(batches)
+    """
+    Rows of `table` in the order of `indices` written batch by batch, or `batches` streamed from files
+    with the schema of `table`, `num_batches` is then an estimate for progress.
+    """
+    if batches is None:
+        batches = get_batches(table, batch_size, indices)
+        num_batches = len(batches)
+
+    if output_file == STDOUT:
+        return write_batches_to_stream(batches, sys.stdout, progress_cb, open_writer, num_batches)
+
     output_file = os.path.abspath(output_file)
 
-    abort = progress_cb(num_batches, 0)
+    checkpoint = ExportCheckpoint.load(output_file, job_signature) if resume else None
+    if checkpoint is not None:
+        LOGGER.info("Resuming export to %s from batch %s, offset %s", output_file, checkpoint.batch, checkpoint.offset)
+        os.truncate(output_file, checkpoint.offset)
+        start_batch = checkpoint.batch
+        mode = "a"
+    else:
+        ExportCheckpoint.remove(output_file)
+        start_batch = 0
+        mode = "w"
 
-    LOGGER.info("Writing %s batches to JSON file %s", num_batches, output_file)
-    with open(output_file, "w", encoding="utf-8") as f:
-        for i, batch in enumerate(batches):
+    abort = progress_cb(num_batches, start_batch)
+
+    LOGGER.info("Writing %s batches to file %s", num_batches - start_batch, output_file)
+    with open(output_file, mode, newline=newline, encoding="utf-8") as f:
+        write_batch = open_writer(f, start_batch == 0)
+        last_checkpoint_time = time.monotonic()
+
+        for i, batch in enumerate(iter_batches_from(batches, start_batch), start_batch):
 
             if abort:
                 LOGGER.warning("Writing batch %s was aborted", i)
+                f.flush()
+                ExportCheckpoint(job_signature, i, f.buffer.tell()).save(output_file)
                 return False
 
             LOGGER.info("Writing batch %s", i)
+            with PERF.span("export.write_batch", batch=i):
+                write_batch(batch)
 
-            for row in batch.to_pylist():
-                line = encoder.encode(row)
-                f.write(line)
-                f.write("\n")
+            if time.monotonic() - last_checkpoint_time >= CHECKPOINT_INTERVAL:
+                with PERF.span("export.checkpoint", batch=i):
+                    f.flush()
+                    os.fsync(f.fileno())
+                    ExportCheckpoint(job_signature, i + 1, f.buffer.tell()).save(output_file)
+                last_checkpoint_time = time.monotonic()
 
             LOGGER.info("Done writing batch %s", i)
-            abort = progress_cb(num_batches, i + 1)
+            abort = progress_cb(max(num_batches, i + 1), i + 1)
 
+    ExportCheckpoint.remove(output_file)
     return True
 
 
-def convert_parquet_to_csv(
-        table: pa.Table,
-        output_file: str,
-        batch_size: int,
-        csv_dialect: CsvDialect,
-        progress_cb: ProgressCallback,
-        **kwargs: Any,
-) -> bool:
+def json_batch_writer(f: TextIO, new_file: bool) -> BatchWriter:
+    encoder = ExtendedJSONEncoder(indent=None, separators=(',', ':'))
+
+    def write_batch(batch: pa.RecordBatch) -> None:
+        for row in batch.to_pylist():
+            line = encoder.encode(row)
+            f.write(line)
+            f.write("\n")
+
+    return write_batch
+
+
+def csv_batch_writer(fieldnames: List[str], csv_dialect: CsvDialect) -> Callable[[TextIO, bool], BatchWriter]:
     encoder = CSVEncoder()
-    batches = table.to_batches(batch_size)
-    num_batches = len(batches)
-    fieldnames = table.column_names
-    output_file = os.path.abspath(output_file)
 
-    abort = progress_cb(num_batches, 0)
+    def open_writer(f: TextIO, new_file: bool) -> BatchWriter:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, dialect=str(csv_dialect.value))
+        if new_file:
+            writer.writeheader()
 
-    LOGGER.info("Writing %s batches to CSV file %s", num_batches, output_file)
+        def write_batch(batch: pa.RecordBatch) -> None:
+            for row in batch.to_pylist():
+                writer.writerow(encoder.encode(row))
 
-    with open(output_file, "w", newline="", encoding="utf-8") as csvfile:
+        return write_batch
 
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, dialect=str(csv_dialect.value))
-        writer.writeheader()
+    return open_writer
 
-        for i, batch in enumerate(batches):
 
-            if abort:
-                LOGGER.warning("Writing batch %s was aborted", i)
-                return False
+def write_batches_to_stream(
+        batches: Iterable[pa.RecordBatch],
+        stream: TextIO,
+        progress_cb: ProgressCallback,
+        open_writer: Callable[[TextIO, bool], BatchWriter],
+        num_batches: int = 0
+) -> bool:
+    if not num_batches and isinstance(batches, Sized):
+        num_batches = len(batches)
 
-            LOGGER.info("Writing batch %s", i)
+    abort = progress_cb(num_batches, 0)
+    write_batch = open_writer(stream, True)
 
-            for row in batch.to_pylist():
-                writer.writerow(encoder.encode(row))
-            LOGGER.info("Done writing batch %s", i)
-            abort = progress_cb(num_batches, i + 1)
+    for i, batch in enumerate(batches):
+        if abort:
+            LOGGER.warning("Writing batch %s was aborted", i)
+            return False
+
+        with PERF.span("export.write_batch", batch=i):
+            write_batch(batch)
+        abort = progress_cb(max(num_batches, i + 1), i + 1)
 
+    stream.flush()
     return True
 
 
+def convert_parquet_to_json(
+        table: pa.Table,
+        output_file: str,
+        batch_size: int,
+        progress_cb: ProgressCallback,
+        resume: bool = False,
+        indices: Optional[pa.Array] = None,
+        source_identity: str = "",
+        filters: str = "",
+        sort_keys: Optional[List[Tuple[str, str]]] = None,
+        batches: Optional[Iterable[pa.RecordBatch]] = None,
+        num_batches: int = 0,
+        **kwargs: Any
+) -> bool:
+    indices = to_indices_array(indices)
+    return write_batches(
+        table=table,
+        output_file=output_file,
+        batch_size=batch_size,
+        progress_cb=progress_cb,
+        open_writer=json_batch_writer,
+        job_signature=get_job_signature(
+            table, batch_size, indices, output_format=OutputFormat.JSON.value,
+            source=source_identity, filters=filters.strip(), sort_keys=sort_keys or []
+        ),
+        resume=resume,
+        indices=indices,
+        batches=batches,
+        num_batches=num_batches
+    )
+
+
+def convert_parquet_to_csv(
+        table: pa.Table,
+        output_file: str,
+        batch_size: int,
+        csv_dialect: CsvDialect,
+        progress_cb: ProgressCallback,
+        resume: bool = False,
+        indices: Optional[pa.Array] = None,
+        source_identity: str = "",
+        filters: str = "",
+        sort_keys: Optional[List[Tuple[str, str]]] = None,
+        batches: Optional[Iterable[pa.RecordBatch]] = None,
+        num_batches: int = 0,
+        **kwargs: Any,
+) -> bool:
+    indices = to_indices_array(indices)
+    return write_batches(
+        table=table,
+        output_file=output_file,
+        batch_size=batch_size,
+        progress_cb=progress_cb,
+        open_writer=csv_batch_writer(table.column_names, csv_dialect),
+        job_signature=get_job_signature(
+            table, batch_size, indices, output_format=OutputFormat.CSV.value, csv_dialect=csv_dialect.value,
+            source=source_identity, filters=filters.strip(), sort_keys=sort_keys or []
+        ),
+        resume=resume,
+        newline="",
+        indices=indices,
+        batches=batches,
+        num_batches=num_batches
+    )
+
+
 class ConversionProcess:
     CONV_FUNCTIONS = {
         OutputFormat.JSON: convert_parquet_to_json,
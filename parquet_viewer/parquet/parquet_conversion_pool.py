@@ -0,0 +1,364 @@
+import atexit
+import itertools
+import multiprocessing
+import queue
+import threading
+from collections import deque
+from multiprocessing import Process, Pipe
+from multiprocessing.connection import Connection, wait
+from typing import Any, Optional, Generator, Dict, List, Deque, Tuple
+
+from parquet_viewer._logger import LOGGER
+from parquet_viewer._perf import PERF
+from parquet_viewer.parquet.parquet_conversion import (
+    ConversionProcess,
+    ConversionStatus,
+    OutputFormat,
+    ProgressData
+)
+
+FINAL_STATUSES = (ConversionStatus.DONE, ConversionStatus.ABORTED, ConversionStatus.FAILED)
+
+
+def _estimate_num_batches(parquet_table: Any, batch_size: int) -> int:
+    # streamed batches do not span row groups of datasets, so this is an upper bound, filtered batches are fewer
+    return sum(
+        -(-footer.row_group(i).num_rows // batch_size)
+        for footer in parquet_table.footers for i in range(footer.num_row_groups)
+    )
+
+
+def _resolve_table(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rows of an export by location: unsorted rows are streamed from files, sorted and selected rows
+    are taken from the filtered table, which is read for this job only and released when it is done.
+    """
+    if "table" in kwargs:
+        return kwargs
+
+    from parquet_viewer.parquet.parquet_table import ParquetTable
+
+    parquet_table = ParquetTable(
+        kwargs.pop("parquet_file"),
+        kwargs["batch_size"],
+        kwargs.pop("reader_options", None),
+        kwargs.pop("dictionary_columns", None)
+    )
+    filters = kwargs.get("filters", "")
+    sort_keys = kwargs.get("sort_keys")
+    # checkpoints are resumed only for the same files
+    kwargs["source_identity"] = parquet_table.identity
+
+    if kwargs.get("indices") is None and not sort_keys:
+        kwargs["table"] = parquet_table.arrow_schema.empty_table()
+        kwargs["batches"] = parquet_table.iter_batches(batch_size=kwargs["batch_size"], filters=filters)
+        kwargs["num_batches"] = _estimate_num_batches(parquet_table, kwargs["batch_size"])
+        return kwargs
+
+    parquet_table.filters = filters
+    kwargs["table"] = parquet_table.lazy_filtered_table
+    # selected rows are already in the sort order
+    if kwargs.get("indices") is None:
+        parquet_table.sort_keys = sort_keys
+        kwargs["indices"] = parquet_table.sort_indices
+    return kwargs
+
+
+def _pop_perf_events() -> Optional[list]:
+    if not PERF.enabled:
+        return None
+
+    events = PERF.export_events()
+    PERF.reset()
+    return events
+
+
+def _worker_main(conn: Connection) -> None:
+    # forked worker inherits events recorded by the parent process
+    PERF.reset()
+    stopping = False
+
+    while not stopping:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+
+        if message is None:
+            break
+
+        command, job_id, *args = message
+        if command != "job":
+            # stale cancellation of a job that has already finished
+            continue
+
+        output_format, kwargs = args
+
+        def progress_cb(num_batches: int, batch: int) -> bool:
+            nonlocal stopping
+            conn.send((job_id, ProgressData(
+                batch=batch,
+                num_batches=num_batches,
+                status=ConversionStatus.RUNNING
+            )))
+
+            abort = stopping
+            while conn.poll(0.0):
+                message_ = conn.recv()
+                if message_ is None:
+                    stopping = abort = True
+                else:
+                    command_, job_id_ = message_[:2]
+                    abort = abort or (command_ == "cancel" and job_id_ == job_id)
+            return abort
+
+        try:
+            conn.send((job_id, ProgressData(batch=0, num_batches=0, status=ConversionStatus.PENDING)))
+
+            conv_func = ConversionProcess.CONV_FUNCTIONS[output_format]
+            with PERF.span("export.resolve_table"):
+                kwargs = _resolve_table(kwargs)
+            with PERF.span("export.job", job_id=job_id, output_format=output_format.value):
+                success = conv_func(progress_cb=progress_cb, **kwargs)
+
+            conn.send((job_id, ProgressData(
+                batch=0,
+                num_batches=0,
+                status=ConversionStatus.DONE if success else ConversionStatus.ABORTED,
+                perf_events=_pop_perf_events()
+            )))
+
+        except Exception as e:
+            LOGGER.exception("Unexpected exception: %s", e)
+            conn.send((job_id, ProgressData(
+                batch=0,
+                num_batches=0,
+                status=ConversionStatus.FAILED,
+                context=str(e),
+                perf_events=_pop_perf_events()
+            )))
+
+
+class ConversionJob:
+    def __init__(self, pool: "ConversionWorkerPool", job_id: int, output_format: OutputFormat, kwargs: Dict) -> None:
+        self.pool = pool
+        self.job_id = job_id
+        self.output_format = output_format
+        self.kwargs = kwargs
+
+        self.status = ConversionStatus.PENDING
+        self._progress: "queue.Queue[ProgressData]" = queue.Queue()
+        self._finished = threading.Event()
+
+    def _put_progress(self, progress_data: ProgressData) -> None:
+        if progress_data.perf_events:
+            PERF.merge_events(progress_data.perf_events)
+
+        self.status = progress_data.status
+        self._progress.put(progress_data)
+
+        if progress_data.status in FINAL_STATUSES:
+            self._finished.set()
+
+    def abort(self) -> None:
+        self.pool.cancel(self.job_id)
+
+    def is_running(self) -> bool:
+        return not self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def get_progress(self, timeout: Optional[float] = 0.0) -> Generator[ProgressData, None, None]:
+        try:
+            yield self._progress.get(timeout=timeout)
+            while True:
+                yield self._progress.get_nowait()
+        except queue.Empty:
+            return
+
+
+class _Worker:
+    def __init__(self, index: int) -> None:
+        self.conn, child_conn = Pipe()
+        self.process = Process(target=_worker_main, args=(child_conn,), name=f"parquet-conversion-{index}")
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+
+        self.job: Optional[ConversionJob] = None
+
+
+class ConversionWorkerPool:
+    POLLING_TIMEOUT = 0.1
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self.max_workers = max_workers or max(1, min(2, multiprocessing.cpu_count()))
+
+        self._lock = threading.RLock()
+        self._job_ids = itertools.count(1)
+        self._pending: Deque[ConversionJob] = deque()
+        self._workers: List[_Worker] = []
+        self._worker_ids = itertools.count(1)
+
+        self._dispatcher: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def submit(self, output_format: OutputFormat, **kwargs: Any) -> ConversionJob:
+        with self._lock:
+            if self._stopped.is_set():
+                raise RuntimeError("Conversion pool is shut down")
+
+            job = ConversionJob(self, next(self._job_ids), output_format, kwargs)
+            self._pending.append(job)
+            LOGGER.info("Queued conversion job %s", job.job_id)
+
+            self._ensure_dispatcher()
+            self._dispatch()
+            return job
+
+    def cancel(self, job_id: int) -> None:
+        with self._lock:
+            for job in self._pending:
+                if job.job_id == job_id:
+                    self._pending.remove(job)
+                    job._put_progress(ProgressData(batch=0, num_batches=0, status=ConversionStatus.ABORTED))
+                    return
+
+            for worker in self._workers:
+                if worker.job is not None and worker.job.job_id == job_id:
+                    self._send(worker, ("cancel", job_id))
+                    return
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            if self._stopped.is_set():
+                return
+            self._stopped.set()
+
+            while self._pending:
+                self._pending.popleft()._put_progress(
+                    ProgressData(batch=0, num_batches=0, status=ConversionStatus.ABORTED)
+                )
+
+            for worker in self._workers:
+                if worker.job is not None:
+                    self._send(worker, ("cancel", worker.job.job_id))
+                self._send(worker, None)
+
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout)
+
+        for worker in list(self._workers):
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                LOGGER.warning("Terminating conversion worker %s", worker.process.name)
+                worker.process.terminate()
+            worker.conn.close()
+
+        self._workers.clear()
+
+    @property
+    def num_pending(self) -> int:
+        return len(self._pending)
+
+    def _send(self, worker: _Worker, message: Optional[Tuple]) -> None:
+        try:
+            worker.conn.send(message)
+        except (OSError, ValueError) as e:
+            LOGGER.warning("Cannot send message to %s: %s", worker.process.name, e)
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="conversion-dispatcher", daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch(self) -> None:
+        for worker in self._workers:
+            if not self._pending:
+                return
+            if worker.job is None and worker.process.is_alive():
+                self._start_job(worker, self._pending.popleft())
+
+        while self._pending and len(self._workers) < self.max_workers:
+            worker = _Worker(next(self._worker_ids))
+            self._workers.append(worker)
+            self._start_job(worker, self._pending.popleft())
+
+    def _start_job(self, worker: _Worker, job: ConversionJob) -> None:
+        LOGGER.info("Starting conversion job %s on %s", job.job_id, worker.process.name)
+        worker.job = job
+        self._send(worker, ("job", job.job_id, job.output_format, job.kwargs))
+
+    def _dispatch_loop(self) -> None:
+        while not (self._stopped.is_set() and all(w.job is None for w in self._workers)):
+            with self._lock:
+                connections = {worker.conn: worker for worker in self._workers if not worker.conn.closed}
+
+            if not connections:
+                if self._stopped.wait(self.POLLING_TIMEOUT):
+                    break
+                continue
+
+            for conn in wait(list(connections), timeout=self.POLLING_TIMEOUT):
+                worker = connections[conn]
+                try:
+                    job_id, progress_data = conn.recv()
+                except (EOFError, OSError):
+                    self._worker_died(worker)
+                    continue
+
+                with self._lock:
+                    if worker.job is not None and worker.job.job_id == job_id:
+                        worker.job._put_progress(progress_data)
+                        if progress_data.status in FINAL_STATUSES:
+                            worker.job = None
+
+            with self._lock:
+                for worker in list(self._workers):
+                    if not worker.process.is_alive():
+                        self._worker_died(worker)
+
+                if not self._stopped.is_set():
+                    self._dispatch()
+
+    def _worker_died(self, worker: _Worker) -> None:
+        with self._lock:
+            if worker not in self._workers:
+                return
+
+            if not self._stopped.is_set():
+                LOGGER.error("Conversion worker %s died", worker.process.name)
+            self._workers.remove(worker)
+            worker.conn.close()
+
+            if worker.job is not None:
+                worker.job._put_progress(ProgressData(
+                    batch=0,
+                    num_batches=0,
+                    status=ConversionStatus.FAILED,
+                    context=f"Conversion worker exited with code {worker.process.exitcode}"
+                ))
+                worker.job = None
+
+
+_POOL: Optional[ConversionWorkerPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_conversion_pool() -> ConversionWorkerPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ConversionWorkerPool()
+            atexit.register(shutdown_conversion_pool)
+        return _POOL
+
+
+def shutdown_conversion_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+
+    if pool is not None:
+        pool.shutdown()
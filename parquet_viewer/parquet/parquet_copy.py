@@ -0,0 +1,219 @@
+import enum
+import json
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from parquet_viewer._perf import PERF
+from parquet_viewer.parquet.parquet_conversion import ExtendedJSONEncoder, ProgressCallback, get_batches
+from parquet_viewer.parquet.parquet_filters import is_string_type
+
+# rows gathered and formatted at once
+COPY_BATCH_ROWS = 64 * 1024
+# copied rows in arrow IPC stream format are put on the clipboard with this type along with the text
+ARROW_STREAM_MIME_TYPE = "application/vnd.apache.arrow.stream"
+
+# values of TSV cells with these characters are quoted as by `csv` with the `excel-tab` dialect
+_TSV_QUOTED_PATTERN = '[\t\r\n"]'
+# strings with other characters (non-ASCII and control characters) are escaped as \uXXXX by the json encoder,
+# which regex replacements cannot produce, so only these values are encoded in python
+_JSON_PYTHON_STRING_PATTERN = "[^\t\n\r\x20-\x7e]"
+_JSON_ESCAPES = (("\\", "\\\\"), ('"', '\\"'), ("\n", "\\n"), ("\r", "\\r"), ("\t", "\\t"))
+# absolute values of doubles that `repr` of python floats formats without an exponent
+_PLAIN_FLOAT_RANGE = (1e-4, 1e16)
+
+
+class CopyFormat(str, enum.Enum):
+    # tab separated values with a header, a single value is copied as is
+    TSV = "tsv"
+    # json object per line, same text as json exports
+    JSON = "json"
+
+
+@dataclass
+class CopyResult:
+    text: str
+    # copied rows in arrow IPC stream format
+    arrow_stream: bytes
+    num_rows: int
+    num_columns: int
+
+
+def _is_temporal_text_type(data_type: pa.DataType) -> bool:
+    return pa.types.is_date(data_type) or pa.types.is_timestamp(data_type) or pa.types.is_time(data_type)
+
+
+def format_temporal_values(array: pa.Array, sep: str = " ") -> pa.Array:
+    """Same texts as `isoformat(sep)` of python dates, times and datetimes, `str` with the default `sep`."""
+    data_type = array.type
+    if pa.types.is_date(data_type):
+        return pc.cast(array, pa.string())
+    if pa.types.is_time(data_type):
+        values = pc.cast(pc.cast(array, pa.time64("us")), pa.string())
+        # microseconds are left out when they are zero
+        return pc.replace_substring_regex(values, r"\.000000$", "")
+
+    # python datetimes have microseconds, nanoseconds are truncated
+    array = pc.cast(array, pa.timestamp("us", tz=data_type.tz), safe=False)
+    if data_type.tz is None:
+        return pc.replace_substring_regex(pc.strftime(array, format=f"%Y-%m-%d{sep}%H:%M:%S"), r"\.000000$", "")
+
+    # local time of the time zone with the offset as `+05:00`
+    values = pc.strftime(array, format=f"%Y-%m-%d{sep}%H:%M:%S%z")
+    values = pc.replace_substring_regex(values, r"\.000000([+-])", r"\1")
+    return pc.replace_substring_regex(values, r"([+-]\d\d)(\d\d)$", r"\1:\2")
+
+
+def _encode_json_values(array: pa.Array) -> pa.Array:
+    encoder = ExtendedJSONEncoder(indent=None, separators=(",", ":"))
+    with PERF.span("copy.encode_python", rows=len(array), type=str(array.type)):
+        return pa.array([encoder.encode(value) for value in array.to_pylist()], type=pa.string())
+
+
+def _encode_masked_json_values(values: pa.Array, array: pa.Array, mask: pa.Array) -> pa.Array:
+    """Values formatted by arrow with the values under `mask` encoded in python instead."""
+    mask = pc.fill_null(mask, False)
+    if not pc.any(mask).as_py():
+        return values
+    return pc.replace_with_mask(values, mask, _encode_json_values(array.filter(mask)))
+
+
+def _quote_json_strings(array: pa.Array) -> pa.Array:
+    for pattern, replacement in _JSON_ESCAPES:
+        array = pc.replace_substring(array, pattern, replacement)
+    return pc.binary_join_element_wise('"', array, '"', "")
+
+
+def _format_json_floats(array: pa.Array) -> pa.Array:
+    if not pa.types.is_float64(array.type):
+        # `repr` of float32 values converted to python floats has more digits
+        return _encode_json_values(array)
+
+    # integral values have `.0` as python floats
+    text = pc.cast(array, pa.string())
+    values = pc.replace_substring_regex(text, r"^(-?\d+)$", r"\1.0")
+    # digits of shortest representations are the same, arrow and python use exponents in different ranges
+    magnitude = pc.abs(array)
+    plain = pc.and_(
+        pc.greater_equal(magnitude, _PLAIN_FLOAT_RANGE[0]), pc.less(magnitude, _PLAIN_FLOAT_RANGE[1])
+    )
+    plain = pc.and_(plain, pc.invert(pc.match_substring(text, "e")))
+    # zeros, exponents, NaN and infinities
+    return _encode_masked_json_values(values, array, pc.and_(pc.is_valid(array), pc.invert(plain)))
+
+
+def format_json_values(array: pa.Array) -> pa.Array:
+    """Json texts of values as written by json exports, null values are `null`."""
+    data_type = array.type
+    if pa.types.is_dictionary(data_type):
+        # each distinct value is formatted once
+        return pc.fill_null(format_json_values(array.dictionary).take(array.indices), "null")
+
+    if pa.types.is_integer(data_type) or pa.types.is_boolean(data_type):
+        values = pc.cast(array, pa.string())
+    elif pa.types.is_floating(data_type):
+        values = _format_json_floats(array)
+    elif is_string_type(data_type):
+        array = array.cast(pa.string())
+        values = _encode_masked_json_values(
+            _quote_json_strings(array), array, pc.match_substring_regex(array, _JSON_PYTHON_STRING_PATTERN)
+        )
+    elif _is_temporal_text_type(data_type):
+        values = _quote_json_strings(format_temporal_values(array, sep="T"))
+    else:
+        # decimals, binaries and nested values
+        return _encode_json_values(array)
+    return pc.fill_null(values, "null")
+
+
+def format_tsv_values(array: pa.Array, quote: bool = True) -> pa.Array:
+    """Texts of TSV cells, null values are empty, nested values are json."""
+    data_type = array.type
+    if pa.types.is_dictionary(data_type):
+        return pc.fill_null(format_tsv_values(array.dictionary, quote).take(array.indices), "")
+
+    if is_string_type(data_type):
+        values = array.cast(pa.string()) if pa.types.is_large_string(data_type) else array
+    elif pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_boolean(data_type):
+        values = pc.cast(array, pa.string())
+    elif pa.types.is_decimal(data_type):
+        values = pc.cast(array, pa.string())
+    elif _is_temporal_text_type(data_type):
+        values = format_temporal_values(array)
+    else:
+        values = _encode_json_values(array)
+
+    if quote:
+        quoted = pc.binary_join_element_wise('"', pc.replace_substring(values, '"', '""'), '"', "")
+        values = pc.if_else(pc.match_substring_regex(values, _TSV_QUOTED_PATTERN), quoted, values)
+    return pc.fill_null(values, "")
+
+
+def format_tsv_lines(batch: pa.RecordBatch, quote: bool = True) -> pa.Array:
+    with PERF.span("copy.format_tsv", rows=batch.num_rows):
+        if not batch.num_columns:
+            return pa.array([""] * batch.num_rows, type=pa.string())
+        return pc.binary_join_element_wise(*[format_tsv_values(column, quote) for column in batch.columns], "\t")
+
+
+def format_json_lines(batch: pa.RecordBatch) -> pa.Array:
+    with PERF.span("copy.format_json", rows=batch.num_rows):
+        parts: list = ["{"]
+        for i, (name, column) in enumerate(zip(batch.schema.names, batch.columns)):
+            parts += ["," if i else "", json.dumps(name) + ":", format_json_values(column)]
+        if not batch.num_columns:
+            parts.append(pa.array([""] * batch.num_rows, type=pa.string()))
+        return pc.binary_join_element_wise(*parts, "}", "")
+
+
+def join_lines(lines: List[pa.Array]) -> str:
+    """Lines joined in arrow, large offsets allow copies over 2 GB."""
+    values = pa.chunked_array(lines, type=pa.string()).cast(pa.large_string()).combine_chunks()
+    if not len(values):
+        return ""
+    lists = pa.LargeListArray.from_arrays(pa.array([0, len(values)], type=pa.int64()), values)
+    return pc.binary_join(lists, pa.scalar("\n", type=pa.large_string()))[0].as_py()
+
+
+def copy_table(
+        table: pa.Table,
+        indices: Optional[pa.Array] = None,
+        copy_format: CopyFormat = CopyFormat.TSV,
+        progress_cb: Optional[ProgressCallback] = None,
+        batch_size: int = COPY_BATCH_ROWS
+) -> Optional[CopyResult]:
+    """
+    Text and arrow payload of rows of `table` in the order of `indices`, all rows if None.
+    Rows are gathered and formatted batch by batch, None if aborted by `progress_cb`.
+    """
+    num_rows = table.num_rows if indices is None else len(indices)
+    # a single value is copied without a header and quotes, so it can be pasted anywhere
+    single_value = copy_format == CopyFormat.TSV and num_rows == 1 and table.num_columns == 1
+
+    lines = []
+    if copy_format == CopyFormat.TSV and not single_value:
+        lines.append(format_tsv_lines(pa.RecordBatch.from_arrays(
+            [pa.array([name]) for name in table.schema.names], names=table.schema.names
+        )))
+
+    if progress_cb is not None and progress_cb(num_rows, 0):
+        return None
+
+    sink = pa.BufferOutputStream()
+    num_done = 0
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in get_batches(table, batch_size, indices):
+            writer.write_batch(batch)
+            if copy_format == CopyFormat.JSON:
+                lines.append(format_json_lines(batch))
+            else:
+                lines.append(format_tsv_lines(batch, quote=not single_value))
+
+            num_done += batch.num_rows
+            if progress_cb is not None and progress_cb(num_rows, num_done):
+                return None
+
+    with PERF.span("copy.join_lines", rows=num_rows):
+        return CopyResult(join_lines(lines), sink.getvalue().to_pybytes(), num_rows, table.num_columns)
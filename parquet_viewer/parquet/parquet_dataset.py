@@ -0,0 +1,179 @@
+import glob
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Sequence, Union
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pa_fs
+import pyarrow.parquet as pq
+
+from parquet_viewer._perf import PERF
+from parquet_viewer.parquet.parquet_reader_options import ReaderOptions
+
+ParquetSourceType = Union[str, Sequence[str]]
+
+# files written next to part files by Spark / Hive: _SUCCESS, _metadata, .crc files, etc.
+IGNORE_PREFIXES = (".", "_")
+# other files of a directory are read only if they end with the parquet magic, e.g. part files of Hive
+PARQUET_SUFFIXES = (".parquet", ".parq")
+
+PARQUET_MAGIC = b"PAR1"
+# footer length (4 bytes, little endian) and magic at the end of a parquet file
+PARQUET_TAIL_SIZE = 8
+
+MAX_FOOTER_READERS = 16
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+@dataclass
+class ParquetSource:
+    # file, directory, glob pattern or list of files as given by the user
+    location: ParquetSourceType
+    paths: List[str]
+    # root directory of hive partitions
+    base_dir: str
+    is_dataset: bool
+
+    @property
+    def display_name(self) -> str:
+        if isinstance(self.location, str):
+            return os.path.abspath(self.location)
+        return self.base_dir
+
+    @property
+    def output_base_path(self) -> str:
+        # exports of datasets are written next to the dataset directory
+        return self.base_dir if self.is_dataset else self.paths[0]
+
+    @property
+    def key(self) -> tuple:
+        # changes when files are added, removed or modified
+        return tuple((p, os.path.getmtime(p), os.path.getsize(p)) for p in self.paths)
+
+
+def _is_ignored(name: str) -> bool:
+    return name.startswith(IGNORE_PREFIXES)
+
+
+def _has_parquet_magic(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(PARQUET_MAGIC)) != PARQUET_MAGIC:
+                return False
+            f.seek(-len(PARQUET_MAGIC), os.SEEK_END)
+            return f.read(len(PARQUET_MAGIC)) == PARQUET_MAGIC
+    except OSError:
+        return False
+
+
+def _is_parquet_file(path: str) -> bool:
+    # csv, txt and other files next to part files would fail the whole dataset
+    return path.lower().endswith(PARQUET_SUFFIXES) or _has_parquet_magic(path)
+
+
+def _list_directory(directory: str) -> List[str]:
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not _is_ignored(d))
+        paths += [os.path.join(root, f) for f in sorted(files) if not _is_ignored(f)]
+    return [p for p in paths if _is_parquet_file(p)]
+
+
+def _get_glob_base_dir(pattern: str) -> str:
+    parts = []
+    for part in pattern.split(os.sep):
+        if _GLOB_CHARS.search(part):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or os.sep
+
+
+def resolve_parquet_source(source: ParquetSourceType) -> ParquetSource:
+    if isinstance(source, str) and os.path.isfile(source):
+        path = os.path.abspath(source)
+        return ParquetSource(location=source, paths=[path], base_dir=os.path.dirname(path), is_dataset=False)
+
+    if isinstance(source, str) and os.path.isdir(source):
+        base_dir = os.path.abspath(source)
+        paths = _list_directory(base_dir)
+    elif isinstance(source, str) and _GLOB_CHARS.search(source):
+        pattern = os.path.abspath(source)
+        base_dir = _get_glob_base_dir(pattern)
+        paths = sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p) and _is_parquet_file(p))
+    elif isinstance(source, str):
+        raise FileNotFoundError(source)
+    else:
+        paths = []
+        for path in source:
+            path = os.path.abspath(path)
+            paths += _list_directory(path) if os.path.isdir(path) else [path]
+        base_dir = os.path.commonpath([os.path.dirname(p) for p in paths]) if paths else ""
+
+    if not paths:
+        raise FileNotFoundError(f"No parquet files found in {source}")
+
+    return ParquetSource(location=source, paths=paths, base_dir=base_dir, is_dataset=True)
+
+
+def read_footers(paths: List[str], max_workers: int = MAX_FOOTER_READERS) -> List[pq.FileMetaData]:
+    # footers are small, so reading them is dominated by latency, especially on network storages
+    with PERF.span("dataset.read_footers", files=len(paths)):
+        if len(paths) == 1:
+            return [pq.read_metadata(paths[0])]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+            return list(executor.map(pq.read_metadata, paths))
+
+
+def unify_schemas(schemas: List[pa.Schema]) -> pa.Schema:
+    try:
+        # int32 + int64 -> int64, etc. for files written by different jobs
+        return pa.unify_schemas(schemas, promote_options="permissive")
+    except TypeError:
+        # pyarrow < 14
+        return pa.unify_schemas(schemas)
+
+
+def with_dictionary_columns(schema: pa.Schema, dictionary_columns: List[str]) -> pa.Schema:
+    for i, field in enumerate(schema):
+        if field.name in dictionary_columns and not pa.types.is_dictionary(field.type):
+            schema = schema.set(i, field.with_type(pa.dictionary(pa.int32(), field.type)))
+    return schema
+
+
+def open_dataset(
+        parquet_source: ParquetSource,
+        footers: List[pq.FileMetaData],
+        reader_options: ReaderOptions,
+        dictionary_columns: List[str]
+) -> ds.Dataset:
+    file_format = ds.ParquetFileFormat(
+        read_options=ds.ParquetReadOptions(dictionary_columns=dictionary_columns),
+        default_fragment_scan_options=ds.ParquetFragmentScanOptions(**reader_options.to_fragment_scan_kwargs())
+    )
+    kwargs = dict(
+        format=file_format,
+        filesystem=pa_fs.LocalFileSystem(use_mmap=reader_options.memory_map),
+        partitioning="hive",
+        partition_base_dir=parquet_source.base_dir,
+    )
+
+    # partition fields are discovered from paths, the rest of the schema is unified from all footers
+    discovered_schema = ds.dataset(parquet_source.paths, **kwargs).schema
+    file_schemas = [footer.schema.to_arrow_schema() for footer in footers]
+    file_columns = {name for schema in file_schemas for name in schema.names}
+    partition_schema = pa.schema([f for f in discovered_schema if f.name not in file_columns])
+
+    schema = unify_schemas(file_schemas + [partition_schema])
+    schema = with_dictionary_columns(schema, dictionary_columns)
+
+    return ds.dataset(parquet_source.paths, schema=schema, **kwargs)
+
+
+def get_partition_columns(dataset: ds.Dataset, footers: List[pq.FileMetaData]) -> List[str]:
+    file_columns = {name for footer in footers for name in footer.schema.to_arrow_schema().names}
+    return [name for name in dataset.schema.names if name not in file_columns]
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import shutil
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import pyarrow as pa
+
+from parquet_viewer._logger import LOGGER
+from parquet_viewer._paths import get_cache_dir
+from parquet_viewer._perf import PERF
+from parquet_viewer.parquet.parquet_dataset import MAX_FOOTER_READERS, PARQUET_MAGIC, PARQUET_TAIL_SIZE
+
+DISK_CACHE_DIR_NAME = "derived"
+VALUE_INDEXES_DIR_NAME = "indexes"
+
+ENTRY_SUFFIX = ".arrow"
+SOURCE_FILE_NAME = "source.json"
+
+# part of every entry key, bump it when the meaning of persisted data changes (semantics of filters or sorting,
+# layout of value indexes), so entries of previous versions are not found and are evicted as unused
+CACHE_VERSION = 1
+
+
+def get_footer_digest(path: str) -> str:
+    """Hash of the serialized footer, changes when a file is rewritten even if its size and mtime are kept."""
+    with open(path, "rb") as f:
+        f.seek(-PARQUET_TAIL_SIZE, os.SEEK_END)
+        tail = f.read(PARQUET_TAIL_SIZE)
+        if tail[4:] != PARQUET_MAGIC:
+            raise pa.lib.ArrowInvalid(f"Not a parquet file: {path}")
+
+        footer_size = struct.unpack("<I", tail[:4])[0]
+        f.seek(-(PARQUET_TAIL_SIZE + footer_size), os.SEEK_END)
+        return hashlib.sha1(f.read(footer_size)).hexdigest()
+
+
+def get_file_identity(path: str) -> str:
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0{get_footer_digest(path)}"
+
+
+def get_source_identity(paths: List[str]) -> str:
+    """Identity of a file or a dataset by path, size, mtime and footer of each file."""
+    if len(paths) == 1:
+        identities = [get_file_identity(paths[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(MAX_FOOTER_READERS, len(paths))) as executor:
+            identities = list(executor.map(get_file_identity, paths))
+
+    return hashlib.sha1("\0".join(identities).encode("utf-8")).hexdigest()
+
+
+def get_entry_name(key: Hashable) -> str:
+    return hashlib.sha1(repr((CACHE_VERSION, key)).encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Derived data (filter selections, sort permutations, etc.) stored as Arrow IPC files.
+
+    Layout is `<directory>/<location hash>/<identity>/<entry>.arrow`, so when a file changes
+    entries of its previous versions are found and removed at once. Entries are memory mapped on read.
+    """
+
+    def __init__(
+            self,
+            directory: Optional[str] = None,
+            max_bytes: int = 0,
+            name: str = DISK_CACHE_DIR_NAME,
+            max_entry_share: float = 0.25,
+            title: str = "Disk Cache"
+    ) -> None:
+        self._directory = directory
+        self.name = name
+        self.title = title
+        # 0 disables the cache
+        self.max_bytes = max_bytes
+        # larger entries would evict everything else
+        self.max_entry_share = max_entry_share
+        self._lock = threading.RLock()
+
+    @property
+    def directory(self) -> str:
+        if self._directory is None:
+            self._directory = os.path.join(get_cache_dir(), self.name)
+        return self._directory
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, max_bytes)
+        if self.enabled:
+            self.enforce()
+
+    def _get_location_dir(self, paths: List[str]) -> str:
+        location = "\0".join(os.path.abspath(p) for p in paths)
+        return os.path.join(self.directory, hashlib.sha1(location.encode("utf-8")).hexdigest())
+
+    def _get_entry_path(self, paths: List[str], identity: str, key: Hashable) -> str:
+        return os.path.join(self._get_location_dir(paths), identity, get_entry_name(key) + ENTRY_SUFFIX)
+
+    def get(self, paths: List[str], identity: str, key: Hashable) -> Optional[pa.Table]:
+        if not self.enabled:
+            return None
+
+        path = self._get_entry_path(paths, identity, key)
+        try:
+            with PERF.span("disk_cache.read", key=key):
+                with pa.memory_map(path) as source:
+                    table = pa.ipc.open_file(source).read_all()
+            # modification time is used as last access time for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            PERF.count(f"cache.{self.name}.miss")
+            return None
+        except (OSError, pa.lib.ArrowInvalid) as e:
+            LOGGER.warning("Removing broken disk cache entry %s: %s", path, e)
+            self._remove_file(path)
+            return None
+
+        PERF.count(f"cache.{self.name}.hit")
+        return table
+
+    def put(self, paths: List[str], identity: str, key: Hashable, table: pa.Table) -> None:
+        if not self.enabled or table.nbytes > self.max_bytes * self.max_entry_share:
+            return
+
+        path = self._get_entry_path(paths, identity, key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with self._lock:
+                self._remove_stale_identities(paths, identity)
+
+            with PERF.span("disk_cache.write", key=key):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with pa.OSFile(tmp_path, "wb") as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+                # readers see either no entry or a complete one
+                os.replace(tmp_path, path)
+        except OSError as e:
+            LOGGER.warning("Cannot write disk cache entry %s: %s", path, e)
+            self._remove_file(tmp_path)
+            return
+
+        self.enforce()
+
+    def contains(self, paths: List[str], identity: str, key: Hashable) -> bool:
+        return self.enabled and os.path.isfile(self._get_entry_path(paths, identity, key))
+
+    def get_array(self, paths: List[str], identity: str, key: Hashable) -> Optional[pa.ChunkedArray]:
+        table = self.get(paths, identity, key)
+        return None if table is None else table.column(0)
+
+    def put_array(self, paths: List[str], identity: str, key: Hashable, array: Any) -> None:
+        self.put(paths, identity, key, pa.table({"values": array}))
+
+    def _remove_stale_identities(self, paths: List[str], identity: str) -> None:
+        location_dir = self._get_location_dir(paths)
+        if os.path.isdir(location_dir):
+            for name in os.listdir(location_dir):
+                if name != identity and name != SOURCE_FILE_NAME:
+                    LOGGER.debug("Removing %s entries of a modified file %s", self.name, paths[0])
+                    shutil.rmtree(os.path.join(location_dir, name), ignore_errors=True)
+        else:
+            os.makedirs(location_dir, exist_ok=True)
+            with open(os.path.join(location_dir, SOURCE_FILE_NAME), "w", encoding="utf-8") as f:
+                json.dump({"paths": paths}, f)
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _list_entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(ENTRY_SUFFIX):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def enforce(self) -> None:
+        with self._lock:
+            entries = self._list_entries()
+            total = sum(size for _, size, _ in entries)
+            # least recently used first
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove_file(path)
+                total -= size
+                PERF.count(f"cache.{self.name}.evicted")
+                LOGGER.debug("Evicted %s from disk cache, %s bytes", path, size)
+
+    def clear(self) -> None:
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    @property
+    def info(self) -> Dict[str, str]:
+        if not self.enabled:
+            return {self.title: "Disabled"}
+
+        entries = self._list_entries()
+        return {
+            self.title: self.directory,
+            f"{self.title} Limit": f"{self.max_bytes} Bytes",
+            f"{self.title} Size": f"{len(entries)} entries, {sum(size for _, size, _ in entries)} Bytes",
+        }
+
+
+DISK_CACHE = DiskCache()
+# value indexes are built on request, so they are not limited by the size of other entries
+VALUE_INDEXES = DiskCache(name=VALUE_INDEXES_DIR_NAME, max_entry_share=1.0, title="Value Indexes")
@@ -0,0 +1,78 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from parquet_viewer.parquet.parquet_filters import is_list_type, is_string_type
+
+# characters of a value shown in a cell
+MAX_DISPLAY_LEN = 256
+# elements of a list converted for a cell, each element takes at least 3 characters (`1, `),
+# so the text of a cut list is always longer than MAX_DISPLAY_LEN and is shown as cut
+MAX_DISPLAY_ITEMS = MAX_DISPLAY_LEN // 2
+
+
+def _is_binary_type(data_type: pa.DataType) -> bool:
+    return pa.types.is_binary(data_type) or pa.types.is_large_binary(data_type)
+
+
+def _truncate_lists(array: pa.Array, max_len: int, max_items: int) -> pa.Array:
+    lengths = pc.fill_null(pc.list_value_length(array), 0).to_numpy(zero_copy_only=False)
+    kept_lengths = np.minimum(lengths, max_items + 1)
+
+    # positions of the first elements of lists in the values of the array, slices of arrays share values
+    starts = array.offsets.to_numpy()[:-1]
+    ends = np.cumsum(kept_lengths)
+    positions = np.repeat(starts - ends + kept_lengths, kept_lengths) + np.arange(ends[-1] if len(ends) else 0)
+    values = truncate_array(array.values.take(pa.array(positions, type=pa.int64())), max_len, max_items)
+
+    # null offsets mark null lists
+    offsets_type = pa.int64() if pa.types.is_large_list(array.type) else pa.int32()
+    offsets = pa.array(
+        np.append(0, ends), type=offsets_type, mask=np.append(array.is_null().to_numpy(zero_copy_only=False), False)
+    )
+    list_type = pa.LargeListArray if pa.types.is_large_list(array.type) else pa.ListArray
+    return list_type.from_arrays(offsets, values)
+
+
+def truncate_array(array: pa.Array, max_len: int = MAX_DISPLAY_LEN, max_items: int = MAX_DISPLAY_ITEMS) -> pa.Array:
+    """
+    Values cut for display before they are converted to python objects: strings and binaries to `max_len + 1`
+    characters or bytes, lists to `max_items + 1` elements, so cut values are still longer than shown.
+    """
+    data_type = array.type
+    if pa.types.is_dictionary(data_type):
+        return pa.DictionaryArray.from_arrays(array.indices, truncate_array(array.dictionary, max_len, max_items))
+
+    if is_string_type(data_type) or _is_binary_type(data_type):
+        # lengths are read from offsets, short values are not copied
+        if not len(array) or (pc.max(pc.binary_length(array)).as_py() or 0) <= max_len:
+            return array
+        if is_string_type(data_type):
+            return pc.utf8_slice_codeunits(array, 0, max_len + 1)
+        if hasattr(pc, "binary_slice"):
+            return pc.binary_slice(array, 0, max_len + 1)
+        return array
+
+    if is_list_type(data_type) and not pa.types.is_fixed_size_list(data_type):
+        return _truncate_lists(array, max_len, max_items)
+
+    if pa.types.is_struct(data_type):
+        return pa.StructArray.from_arrays(
+            [truncate_array(child, max_len, max_items) for child in array.flatten()],
+            fields=list(data_type),
+            mask=array.is_null()
+        )
+
+    return array
+
+
+def truncate_table(table: pa.Table, max_len: int = MAX_DISPLAY_LEN, max_items: int = MAX_DISPLAY_ITEMS) -> pa.Table:
+    if not table.num_rows:
+        return table
+    return pa.Table.from_batches([
+        pa.RecordBatch.from_arrays(
+            [truncate_array(column, max_len, max_items) for column in record_batch.columns],
+            names=record_batch.schema.names
+        )
+        for record_batch in table.to_batches()
+    ])
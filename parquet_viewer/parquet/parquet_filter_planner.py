@@ -0,0 +1,345 @@
+import datetime
+import decimal
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from lark import Tree
+
+from parquet_viewer.parquet.parquet_index import INDEX_OPERATORS
+
+# cost of checking one row, roughly in milliseconds per million rows
+INDEX_COST = 0.01
+NULL_CHECK_COST = 0.1
+COMPARISON_COST = 1.0
+STRING_COMPARISON_COST = 2.0
+IN_LIST_COST = 1.5
+# pattern matching reads every byte of a string
+PATTERN_COST_PER_BYTE = {
+    "LIKE": 2.5,
+    "NOT_LIKE": 2.5,
+    "ILIKE": 3.0,
+    # RE2 runs a DFA, faster than the generic LIKE matcher
+    "REGEX": 1.0,
+}
+MIN_PATTERN_COST = 5.0
+# only the beginning or the end of a string is compared
+PREFIX_COST = 20.0
+# dictionary columns are checked on distinct values, rows only take the results
+DICTIONARY_COST = 1.0
+# fields are extracted from structs first
+STRUCT_FIELD_COST = 2.0
+LIST_LENGTH_COST = 3.0
+# lists are flattened, matches of elements are mapped back to rows
+LIST_ELEMENT_COST = 20.0
+DEFAULT_LIST_LENGTH = 4.0
+
+# copying a row of a column left by previous conditions, strings are copied byte by byte
+TAKE_COST = 7.0
+TAKE_COST_PER_BYTE = 0.3
+# nested arrays are copied child by child
+NESTED_TAKE_COST_PER_BYTE = 2.5
+# finding rows left by previous conditions in a mask over all rows
+CANDIDATES_COST = 3.0
+
+DEFAULT_SELECTIVITY = {
+    "IS_NULL": 0.1,
+    "IS_NOT_NULL": 0.9,
+    "EQUAL": 0.1,
+    "NOT_EQUAL": 0.9,
+    "LESS_THAN": 1 / 3,
+    "LESS_THAN_OR_EQUAL": 1 / 3,
+    "GREATER_THAN": 1 / 3,
+    "GREATER_THAN_OR_EQUAL": 1 / 3,
+    "BETWEEN": 0.25,
+    "LIKE": 0.1,
+    "NOT_LIKE": 0.9,
+    "ILIKE": 0.1,
+    "REGEX": 0.1,
+    "STARTS_WITH": 0.1,
+    "ENDS_WITH": 0.1,
+}
+
+
+@dataclass
+class ColumnStatistics:
+    num_rows: int
+    null_count: Optional[int]
+    min: Any
+    max: Any
+    distinct_count: Optional[int]
+
+
+@dataclass
+class PlannedCondition:
+    tree: Tree
+    # per row of the table
+    cost: float
+    # share of rows matching the condition
+    selectivity: float
+    # per row copied to check the condition on a part of rows
+    take_cost: float
+
+    def get_take_share(self, candidates_cost: float = CANDIDATES_COST) -> float:
+        """
+        Largest share of rows for which copying them and checking the condition on the copy
+        is cheaper than checking all rows. `candidates_cost` is paid per row of the table to find the rows.
+        """
+        return max(0.0, (self.cost - candidates_cost) / (self.take_cost + self.cost))
+
+
+def get_literal(value: Any) -> Any:
+    while isinstance(value, Tree):
+        value = value.children[0]
+    return value.value
+
+
+def _merge_min_max(current: Any, value: Any, pick: Any) -> Any:
+    if current is None:
+        return value
+    try:
+        return pick(current, value)
+    except TypeError:
+        return current
+
+
+def get_column_statistics(footers: List[pq.FileMetaData], columns: Collection[str]) -> Dict[str, ColumnStatistics]:
+    """Statistics of leaf columns (`amount`, `payload.user.id`) merged over row groups of all files."""
+    statistics: Dict[str, ColumnStatistics] = {}
+    for footer in footers:
+        indices = {footer.schema.column(i).path: i for i in range(footer.num_columns)}
+        for column in columns:
+            if column not in indices:
+                continue
+            for r in range(footer.num_row_groups):
+                chunk = footer.row_group(r).column(indices[column])
+                chunk_statistics = chunk.statistics
+                merged = statistics.setdefault(column, ColumnStatistics(0, 0, None, None, None))
+                merged.num_rows += footer.row_group(r).num_rows
+
+                if chunk_statistics is None:
+                    merged.null_count = None
+                    continue
+                if merged.null_count is not None and chunk_statistics.has_null_count:
+                    merged.null_count += chunk_statistics.null_count
+                if chunk_statistics.has_min_max:
+                    merged.min = _merge_min_max(merged.min, chunk_statistics.min, min)
+                    merged.max = _merge_min_max(merged.max, chunk_statistics.max, max)
+                if chunk_statistics.has_distinct_count:
+                    merged.distinct_count = max(merged.distinct_count or 0, chunk_statistics.distinct_count)
+    return statistics
+
+
+def flatten_conditions(tree: Tree, op: str) -> List[Tree]:
+    """Conditions of a chain of `and` (or `or`) operators, groups of the same operator are flattened too."""
+    if tree.data in ("expression", "grouped_expression"):
+        return flatten_conditions(tree.children[0], op)
+    if tree.data == "and_or_expression" and tree.children[1].children[0].type == op:
+        return flatten_conditions(tree.children[0], op) + flatten_conditions(tree.children[2], op)
+    return [tree]
+
+
+def _to_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return float(value)
+    if isinstance(value, datetime.datetime):
+        return value.replace(tzinfo=None).timestamp()
+    if isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time()).timestamp()
+    return None
+
+
+def _get_range_share(statistics: Optional[ColumnStatistics], low: Any, high: Any) -> Optional[float]:
+    """Share of the min / max range of a column between `low` and `high`, values are assumed to be uniform."""
+    if statistics is None:
+        return None
+    min_value, max_value = _to_number(statistics.min), _to_number(statistics.max)
+    if min_value is None or max_value is None or max_value <= min_value:
+        return None
+
+    low_value = min_value if low is None else _to_number(low)
+    high_value = max_value if high is None else _to_number(high)
+    if low_value is None or high_value is None:
+        return None
+    share = (min(high_value, max_value) - max(low_value, min_value)) / (max_value - min_value)
+    return min(1.0, max(0.0, share))
+
+
+class ConditionPlanner:
+    """Estimates cost and selectivity of conditions from the data, footer statistics and value indexes."""
+
+    def __init__(
+            self,
+            table: pa.Table,
+            statistics: Optional[Dict[str, ColumnStatistics]] = None,
+            indexed_columns: Collection[str] = ()
+    ) -> None:
+        self._table = table
+        self._statistics = statistics or {}
+        self._indexed_columns = indexed_columns
+
+    @staticmethod
+    def _get_string_bytes(data: Optional[pa.ChunkedArray]) -> float:
+        if data is None or not (pa.types.is_string(data.type) or pa.types.is_large_string(data.type)):
+            return 0.0
+        return data.nbytes / max(1, len(data))
+
+    def _get_data(self, name: str, function: Optional[str]) -> Optional[pa.ChunkedArray]:
+        if function is None and name in self._table.column_names:
+            return self._table[name]
+        return None
+
+    def _get_top_level_data(self, name: str) -> Optional[pa.ChunkedArray]:
+        parts = name.split(".")
+        for i in range(len(parts), 0, -1):
+            column = ".".join(parts[:i])
+            if column in self._table.column_names:
+                return self._table[column]
+        return None
+
+    def _get_list_length(self, name: str) -> float:
+        data = self._get_top_level_data(name)
+        if data is None or not len(data) or not pa.types.is_list(data.type) and not pa.types.is_large_list(data.type):
+            return DEFAULT_LIST_LENGTH
+        return sum(len(chunk.values) for chunk in data.chunks) / len(data)
+
+    def _get_null_share(self, name: str, function: Optional[str]) -> Optional[float]:
+        data = self._get_data(name, function)
+        if data is not None:
+            return data.null_count / max(1, len(data))
+
+        statistics = self._statistics.get(name)
+        if function is None and statistics is not None and statistics.null_count is not None:
+            return statistics.null_count / max(1, statistics.num_rows)
+        return None
+
+    def _get_equal_selectivity(self, name: str, function: Optional[str]) -> float:
+        data = self._get_data(name, function)
+        if data is not None and pa.types.is_boolean(data.type):
+            return 0.5
+        if data is not None and pa.types.is_dictionary(data.type) and data.num_chunks:
+            return 1 / max(1, len(data.chunk(0).dictionary))
+
+        statistics = self._statistics.get(name)
+        if function is None and statistics is not None and statistics.distinct_count:
+            return 1 / statistics.distinct_count
+        return DEFAULT_SELECTIVITY["EQUAL"]
+
+    def estimate_cost(self, tree: Tree) -> float:
+        if tree.data in ("expression", "grouped_expression"):
+            return self.estimate_cost(tree.children[0])
+        if tree.data == "and_or_expression":
+            return self.estimate_cost(tree.children[0]) + self.estimate_cost(tree.children[2])
+
+        column_tree = tree.children[0]
+        name = column_tree.children[-1].value
+        function = column_tree.children[0].value if len(column_tree.children) > 1 else None
+        op = _get_operator(tree)
+
+        if function is None and name in self._indexed_columns and op in INDEX_OPERATORS:
+            return INDEX_COST
+        if tree.data == "unary_expression":
+            return NULL_CHECK_COST
+
+        data = self._get_data(name, function)
+        if data is not None and pa.types.is_dictionary(data.type):
+            return DICTIONARY_COST
+
+        string_bytes = self._get_string_bytes(data)
+        if op in PATTERN_COST_PER_BYTE:
+            cost = max(MIN_PATTERN_COST, PATTERN_COST_PER_BYTE[op] * string_bytes)
+        elif op in ("STARTS_WITH", "ENDS_WITH"):
+            cost = PREFIX_COST
+        elif op in ("IN", "NOT_IN"):
+            cost = IN_LIST_COST * (STRING_COMPARISON_COST if string_bytes else COMPARISON_COST)
+        else:
+            cost = STRING_COMPARISON_COST if string_bytes else COMPARISON_COST
+
+        if function == "LEN":
+            cost = LIST_LENGTH_COST
+        elif function == "ANY":
+            cost = self._get_list_length(name) * (cost + LIST_ELEMENT_COST)
+        if data is None:
+            cost += STRUCT_FIELD_COST * name.count(".")
+        return cost
+
+    def estimate_take_cost(self, tree: Tree) -> float:
+        cost = 0.0
+        for column_tree in tree.find_data("column"):
+            data = self._get_top_level_data(column_tree.children[-1].value)
+            if data is None:
+                continue
+            cost += TAKE_COST
+            if pa.types.is_nested(data.type):
+                cost += NESTED_TAKE_COST_PER_BYTE * data.nbytes / max(1, len(data))
+            else:
+                cost += TAKE_COST_PER_BYTE * self._get_string_bytes(data)
+        return cost
+
+    def estimate_selectivity(self, tree: Tree) -> float:
+        if tree.data in ("expression", "grouped_expression"):
+            return self.estimate_selectivity(tree.children[0])
+        if tree.data == "and_or_expression":
+            left, right = self.estimate_selectivity(tree.children[0]), self.estimate_selectivity(tree.children[2])
+            if tree.children[1].children[0].type == "AND":
+                return left * right
+            return 1 - (1 - left) * (1 - right)
+
+        column_tree = tree.children[0]
+        name = column_tree.children[-1].value
+        function = column_tree.children[0].value if len(column_tree.children) > 1 else None
+        op = _get_operator(tree)
+
+        null_share = self._get_null_share(name, function)
+        if op == "IS_NULL":
+            return DEFAULT_SELECTIVITY[op] if null_share is None else null_share
+        if op == "IS_NOT_NULL":
+            return DEFAULT_SELECTIVITY[op] if null_share is None else 1 - null_share
+
+        # comparisons never match nulls
+        valid_share = 1 - (null_share or 0)
+        statistics = self._statistics.get(name) if function is None else None
+
+        if op in ("EQUAL", "NOT_EQUAL", "IN", "NOT_IN"):
+            num_values = len(tree.children[2].children) if tree.data == "in_expression" else 1
+            selectivity = min(1.0, num_values * self._get_equal_selectivity(name, function))
+            if op in ("NOT_EQUAL", "NOT_IN"):
+                selectivity = 1 - selectivity
+            return selectivity * valid_share
+
+        share = None
+        if op == "BETWEEN":
+            share = _get_range_share(statistics, get_literal(tree.children[2]), get_literal(tree.children[4]))
+        elif op in ("LESS_THAN", "LESS_THAN_OR_EQUAL"):
+            share = _get_range_share(statistics, None, get_literal(tree.children[2]))
+        elif op in ("GREATER_THAN", "GREATER_THAN_OR_EQUAL"):
+            share = _get_range_share(statistics, get_literal(tree.children[2]), None)
+
+        return (DEFAULT_SELECTIVITY.get(op, 0.5) if share is None else share) * valid_share
+
+    def plan(self, tree: Tree, op: str) -> List[PlannedCondition]:
+        """
+        Conditions of a chain of `op` in the order of evaluation. For `and` cheap conditions rejecting
+        most rows go first, for `or` cheap conditions accepting most rows, so later conditions check fewer rows.
+        """
+        conditions = [
+            PlannedCondition(
+                condition,
+                cost=self.estimate_cost(condition),
+                selectivity=self.estimate_selectivity(condition),
+                take_cost=self.estimate_take_cost(condition)
+            )
+            for condition in flatten_conditions(tree, op)
+        ]
+        if op == "AND":
+            return sorted(conditions, key=lambda c: c.cost / max(1e-9, 1 - c.selectivity))
+        return sorted(conditions, key=lambda c: c.cost / max(1e-9, c.selectivity))
+
+
+def _get_operator(tree: Tree) -> str:
+    if tree.data == "between_expression":
+        return "BETWEEN"
+    return tree.children[1].children[0].type
@@ -1,32 +1,71 @@
-from typing import Any
-
+import datetime
+import decimal
+import functools
+import os.path
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
 import pyarrow as pa
 import pyarrow.compute as pc
+import pyarrow.dataset as ds
 
-from lark import Lark, Transformer
+import lark
+from lark import Lark, Token, Transformer, Tree
 from lark.exceptions import UnexpectedToken
 
+from parquet_viewer._logger import LOGGER
+from parquet_viewer._paths import get_cache_dir
+from parquet_viewer._perf import PERF
+from parquet_viewer.parquet.parquet_filter_planner import (
+    CANDIDATES_COST,
+    ColumnStatistics,
+    ConditionPlanner,
+    PlannedCondition,
+    get_literal
+)
+from parquet_viewer.parquet.parquet_index import (
+    INDEX_OPERATORS,
+    RowSelection,
+    ValueIndex,
+    get_prefix_upper_bound,
+    take_rows
+)
+
 grammar = """
 ?start: expression
-expression:  unary_expression | binary_expression | grouped_expression | and_or_expression
+expression:  unary_expression | binary_expression | in_expression | between_expression | grouped_expression
+    | and_or_expression
 
 grouped_expression: _L_PAREN expression _R_PAREN
 and_or_expression: expression and_or_op expression
 
 unary_expression: column unary_op
 binary_expression: column binary_op value
+in_expression: column in_op _L_PAREN value_list _R_PAREN
+between_expression: column BETWEEN value AND value
 
-column: COLUMN_NAME | DOUBLE_QUOTED_STRING
-value: number | SINGLE_QUOTED_STRING | BOOLEAN
+column: COLUMN_NAME | DOUBLE_QUOTED_STRING | LIST_FUNCTION (COLUMN_NAME | DOUBLE_QUOTED_STRING) _FUNCTION_R_PAREN
+value: number | SINGLE_QUOTED_STRING | BOOLEAN | TIMESTAMP_LITERAL | DATE_LITERAL | TIME_LITERAL | DECIMAL_LITERAL
 number: SIGNED_FLOAT | SIGNED_INT
+value_list: value (_COMMA value)*
 
 unary_op: IS_NULL | IS_NOT_NULL
 binary_op: EQUAL | NOT_EQUAL | LESS_THAN | GREATER_THAN | LESS_THAN_OR_EQUAL | GREATER_THAN_OR_EQUAL | LIKE | NOT_LIKE
+    | ILIKE | REGEX | STARTS_WITH | ENDS_WITH
+in_op: IN | NOT_IN
 and_or_op: OR | AND
 
 IS_NULL: _WHITESPACE+ IS _WHITESPACE+ NULL _WHITESPACE*
 IS_NOT_NULL: _WHITESPACE+ IS _WHITESPACE+ NOT _WHITESPACE+ NULL _WHITESPACE*
 
+IN: _WHITESPACE+ "in"i _WHITESPACE*
+NOT_IN: _WHITESPACE+ NOT _WHITESPACE+ "in"i _WHITESPACE*
+BETWEEN: _WHITESPACE+ "between"i _WHITESPACE+
+ILIKE: _WHITESPACE+ "ilike"i _WHITESPACE*
+STARTS_WITH: _WHITESPACE+ "starts_with"i _WHITESPACE*
+ENDS_WITH: _WHITESPACE+ "ends_with"i _WHITESPACE*
+
 NOT:   "not"i
 IS:    "is"i
 NULL:  "null"i
@@ -36,12 +75,14 @@ AND:   _WHITESPACE* ("and"i) _WHITESPACE*
 
 _L_PAREN: _WHITESPACE* "(" _WHITESPACE* 
 _R_PAREN: _WHITESPACE* ")" _WHITESPACE*
+_COMMA: _WHITESPACE* "," _WHITESPACE*
 
 LESS_THAN_OR_EQUAL: _WHITESPACE* "<=" _WHITESPACE*
 GREATER_THAN_OR_EQUAL: _WHITESPACE* ">=" _WHITESPACE*
 LESS_THAN: _WHITESPACE* "<" _WHITESPACE*
 GREATER_THAN: _WHITESPACE* ">" _WHITESPACE*
 NOT_LIKE: _WHITESPACE* "!~" _WHITESPACE*
+REGEX: (_WHITESPACE* "=~" | _WHITESPACE+ "regex"i) _WHITESPACE*
 NOT_EQUAL: _WHITESPACE* ( "!=" | "<>" ) _WHITESPACE*
 LIKE: _WHITESPACE* ( "~~" | "~" ) _WHITESPACE*
 EQUAL: _WHITESPACE* ( "==" | "=" ) _WHITESPACE*
@@ -49,6 +90,18 @@ EQUAL: _WHITESPACE* ( "==" | "=" ) _WHITESPACE*
 SINGLE_QUOTED_STRING: _SINGLE_QUOTE _STRING_ESC_INNER _SINGLE_QUOTE
 DOUBLE_QUOTED_STRING: _DOUBLE_QUOTE _STRING_ESC_INNER _DOUBLE_QUOTE
 
+// fields of struct columns are separated by dots: payload.user.id
+COLUMN_NAME: CNAME ("." CNAME)*
+// function name is matched with the opening parenthesis, so a column can still be called `any`
+LIST_FUNCTION.2: ("any"i | "len"i) _WHITESPACE* "(" _WHITESPACE*
+// whitespace after a column is a part of the following operator
+_FUNCTION_R_PAREN: _WHITESPACE* ")"
+
+TIMESTAMP_LITERAL: "timestamp"i _WHITESPACE* SINGLE_QUOTED_STRING
+DATE_LITERAL: "date"i _WHITESPACE* SINGLE_QUOTED_STRING
+TIME_LITERAL: "time"i _WHITESPACE* SINGLE_QUOTED_STRING
+DECIMAL_LITERAL: "decimal"i _WHITESPACE* SINGLE_QUOTED_STRING
+
 BOOLEAN: TRUE | FALSE
 TRUE: _WHITESPACE* "true"i _WHITESPACE*
 FALSE: _WHITESPACE* "false"i _WHITESPACE*
@@ -58,12 +111,19 @@ _DOUBLE_QUOTE: "\\""
 
 %import common.SIGNED_FLOAT
 %import common.SIGNED_INT
-%import common.CNAME -> COLUMN_NAME
+%import common.CNAME
 %import common._STRING_ESC_INNER
 %import common.WS -> _WHITESPACE
 """
 
 
+def parse_timestamp(value: str) -> datetime.datetime:
+    # fromisoformat does not accept `Z` before python 3.11
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    return datetime.datetime.fromisoformat(value)
+
+
 class TypeTransformer(Transformer):
 
     def SIGNED_INT(self, tok):
@@ -87,6 +147,30 @@ class TypeTransformer(Transformer):
     def DOUBLE_QUOTED_STRING(self, tok):
         return tok.update(value=tok.strip('"'))
 
+    def LIST_FUNCTION(self, tok):
+        return tok.update(value=tok.split("(")[0].strip().upper())
+
+    @staticmethod
+    def _parse_typed_literal(tok, parse: Callable[[str], Any]):
+        if not isinstance(tok.value, str):
+            return tok
+        try:
+            return tok.update(value=parse(tok[tok.index("'") + 1:-1]))
+        except (ValueError, decimal.InvalidOperation):
+            raise InvalidValue(tok, None)
+
+    def TIMESTAMP_LITERAL(self, tok):
+        return self._parse_typed_literal(tok, parse_timestamp)
+
+    def DATE_LITERAL(self, tok):
+        return self._parse_typed_literal(tok, datetime.date.fromisoformat)
+
+    def TIME_LITERAL(self, tok):
+        return self._parse_typed_literal(tok, datetime.time.fromisoformat)
+
+    def DECIMAL_LITERAL(self, tok):
+        return self._parse_typed_literal(tok, decimal.Decimal)
+
 
 class UnexpectedColumn(UnexpectedToken):
     def _format_expected(self, expected):
@@ -130,37 +214,347 @@ _BASE_BINARY_OPERATORS = {
     "NOT_EQUAL": pc.not_equal,
     "LESS_THAN": pc.less,
     "LESS_THAN_OR_EQUAL": pc.less_equal,
-    "GREATER": pc.greater,
+    "GREATER_THAN": pc.greater,
     "GREATER_THAN_OR_EQUAL": pc.greater_equal
 }
 
-BINARY_OPERATORS_FOR_COLUMN_TYPES = {
-    "bool": {
+
+def not_like(data: Any, pattern: str) -> Any:
+    return pc.invert(pc.match_like(data, pattern))
+
+
+def ilike(data: Any, pattern: str) -> Any:
+    return pc.match_like(data, pattern, ignore_case=True)
+
+
+def regex(data: Any, pattern: str) -> Any:
+    # RE2 syntax, matched anywhere in a string unless anchored with ^ / $
+    return pc.match_substring_regex(data, pattern)
+
+
+# patterns are matched by string kernels of arrow, on distinct values of dictionary columns
+PATTERN_OPERATORS = {
+    "LIKE": pc.match_like,
+    "NOT_LIKE": not_like,
+    "ILIKE": ilike,
+    "REGEX": regex,
+    "STARTS_WITH": pc.starts_with,
+    "ENDS_WITH": pc.ends_with,
+}
+
+
+def is_string_type(data_type: pa.DataType) -> bool:
+    return pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+
+
+def is_temporal_type(data_type: pa.DataType) -> bool:
+    return pa.types.is_timestamp(data_type) or pa.types.is_date(data_type) or pa.types.is_time(data_type)
+
+
+# operators are looked up by type family, so int8 ... uint64, float16 ... double, all decimal widths,
+# timestamps of any unit and time zone, date32 / date64 and time32 / time64 are covered
+BINARY_OPERATORS_FOR_TYPE_FAMILIES: List[Tuple[Callable[[pa.DataType], bool], Dict[str, Callable]]] = [
+    (pa.types.is_boolean, {
         "EQUAL": pc.equal,
         "NOT_EQUAL": pc.not_equal,
-    },
-    "string": {
+    }),
+    (is_string_type, {
         **_BASE_BINARY_OPERATORS,
-        "LIKE": pc.match_like
-    },
-    "double": _BASE_BINARY_OPERATORS,
-    "int64": _BASE_BINARY_OPERATORS,
-    "float": _BASE_BINARY_OPERATORS,
-    "datetime": _BASE_BINARY_OPERATORS,
-}
+        **PATTERN_OPERATORS
+    }),
+    (pa.types.is_integer, _BASE_BINARY_OPERATORS),
+    (pa.types.is_floating, _BASE_BINARY_OPERATORS),
+    (pa.types.is_decimal, _BASE_BINARY_OPERATORS),
+    (is_temporal_type, _BASE_BINARY_OPERATORS),
+]
+
+
+def get_value_type(data_type: pa.DataType) -> pa.DataType:
+    # dictionary columns are filtered as their values
+    if pa.types.is_dictionary(data_type):
+        return data_type.value_type
+    return data_type
+
+
+def get_binary_operators(data_type: pa.DataType) -> Dict[str, Callable]:
+    data_type = get_value_type(data_type)
+    for is_type_family, operators in BINARY_OPERATORS_FOR_TYPE_FAMILIES:
+        if is_type_family(data_type):
+            return operators
+    return {}
+
+
+def _parse_temporal(value: str, data_type: pa.DataType) -> Any:
+    if pa.types.is_timestamp(data_type):
+        return parse_timestamp(value)
+    if pa.types.is_date(data_type):
+        return datetime.date.fromisoformat(value)
+    return datetime.time.fromisoformat(value)
+
+
+def cast_literal(value: Any, data_type: pa.DataType) -> Any:
+    """
+    Literal as a scalar of the column type, so comparisons run on the column as it is, without casting it.
+    Values that do not fit the type (`int32_column < 2.5`) are returned as they are and compared in a common type.
+    Strings are parsed for temporal columns, naive timestamps are wall clock time in the time zone of the column.
+    Raises ValueError if the value cannot be converted.
+    """
+    data_type = get_value_type(data_type)
+    if isinstance(value, str) and is_temporal_type(data_type):
+        value = _parse_temporal(value, data_type)
+
+    if pa.types.is_timestamp(data_type) and isinstance(value, datetime.date):
+        if not isinstance(value, datetime.datetime):
+            # dates are compared as midnight
+            value = datetime.datetime.combine(value, datetime.time())
+        if value.tzinfo is None and data_type.tz is not None:
+            naive = pa.scalar(value, type=pa.timestamp(data_type.unit))
+            return pc.assume_timezone(naive, timezone=data_type.tz).cast(data_type)
+        if value.tzinfo is not None and data_type.tz is None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+    try:
+        return pa.scalar(value).cast(data_type)
+    except (pa.lib.ArrowInvalid, pa.lib.ArrowNotImplementedError):
+        return value
+
+
+def cast_value_set(values: List[Any], data_type: pa.DataType) -> pa.Array:
+    """
+    Values of an `in` list as one array of the column type. Values that do not fit the type (2.5 for an int32
+    column) cannot be equal to any value of the column and are left out. Raises ValueError if a string
+    cannot be parsed for a temporal column.
+    """
+    data_type = get_value_type(data_type)
+    if not is_temporal_type(data_type):
+        # one cast for the whole list
+        try:
+            return pa.array(values).cast(data_type)
+        except (pa.lib.ArrowInvalid, pa.lib.ArrowTypeError, pa.lib.ArrowNotImplementedError):
+            pass
+
+    scalars = [cast_literal(value, data_type) for value in values]
+    return pa.array([scalar.as_py() for scalar in scalars if isinstance(scalar, pa.Scalar)], type=data_type)
+
+
+def to_python(value: Any) -> Any:
+    return value.as_py() if isinstance(value, pa.Scalar) else value
+
+
+def evaluate_on_dictionary(func: Callable, column: pa.ChunkedArray, *args: Any) -> pa.ChunkedArray:
+    """Evaluate `func` once per distinct value of a dictionary column and map results back to rows."""
+    return pa.chunked_array(
+        [pc.take(func(chunk.dictionary, *args), chunk.indices) for chunk in column.chunks],
+        type=pa.bool_()
+    )
+
+
+def is_list_type(data_type: pa.DataType) -> bool:
+    return pa.types.is_list(data_type) or pa.types.is_large_list(data_type) or pa.types.is_fixed_size_list(data_type)
+
+
+def get_path_type(schema: pa.Schema, path: List[str]) -> Optional[pa.DataType]:
+    data_type = get_value_type(schema.field(path[0]).type)
+    for name in path[1:]:
+        if not pa.types.is_struct(data_type) or data_type.get_field_index(name) < 0:
+            return None
+        data_type = get_value_type(data_type.field(name).type)
+    return data_type
+
+
+def resolve_column_path(schema: pa.Schema, name: str) -> Optional[List[str]]:
+    """
+    Top level column and fields of nested structs: `payload.user.id` -> ["payload", "user", "id"].
+    Top level names are matched first, so columns with dots in their names are found as they are.
+    """
+    if name in schema.names:
+        return [name]
+
+    parts = name.split(".")
+    for i in range(len(parts) - 1, 0, -1):
+        column = ".".join(parts[:i])
+        if column in schema.names:
+            path = [column] + parts[i:]
+            return path if get_path_type(schema, path) is not None else None
+    return None
+
+
+def get_function_type(function: str, data_type: pa.DataType) -> Optional[pa.DataType]:
+    if not is_list_type(data_type):
+        return None
+    if function == "LEN":
+        return pa.int64() if pa.types.is_large_list(data_type) else pa.int32()
+    return get_value_type(data_type.value_type)
 
+
+def any_element(list_data: pa.ChunkedArray, selected: Any) -> pa.Array:
+    """Rows of a list column with at least one selected element, `selected` is a mask over flattened elements."""
+    parents = []
+    offset = 0
+    for chunk in list_data.chunks:
+        # indices are relative to the chunk
+        parents.append(pc.list_parent_indices(chunk).to_numpy() + offset)
+        offset += len(chunk)
+
+    mask = np.zeros(len(list_data), dtype=bool)
+    if parents:
+        mask[np.concatenate(parents)[np.asarray(pc.fill_null(selected, False))]] = True
+    return pa.array(mask)
+
+
+@dataclass
+class FilterColumn:
+    """Column of a condition: top level column, field of a struct, or `any` / `len` of a list."""
+    token: Token
+    path: List[str]
+    function: Optional[str] = None
+
+    @property
+    def value(self) -> str:
+        return self.token.value
+
+    @property
+    def is_plain(self) -> bool:
+        return len(self.path) == 1 and self.function is None
+
+
+def between(data: Any, low: Any, high: Any) -> Any:
+    return pc.and_kleene(pc.greater_equal(data, low), pc.less_equal(data, high))
+
+
+# SQL logic: `true or null` is true, same as in value indexes and dataset expressions
 AND_OR_OPERATORS = {
-    "AND": pc.and_,
-    "OR": pc.or_
+    "AND": pc.and_kleene,
+    "OR": pc.or_kleene
 }
 
 
+def _count_selected(selection: Any) -> int:
+    if isinstance(selection, RowSelection):
+        return len(selection)
+    return pc.sum(selection).as_py() or 0
+
+
+def _combine_selections(op: str, left: Any, right: Any) -> Any:
+    if isinstance(left, RowSelection) and isinstance(right, RowSelection):
+        return left.combine(op, right)
+    if isinstance(left, RowSelection):
+        left = left.to_mask()
+    if isinstance(right, RowSelection):
+        right = right.to_mask()
+    return AND_OR_OPERATORS[op](left, right)
+
+
+def apply_selection(table: pa.Table, selection: Any) -> pa.Table:
+    """Rows of the table selected by a mask or by `RowSelection`."""
+    if isinstance(selection, RowSelection):
+        return take_rows(table, selection.row_ids)
+    return table.filter(selection)
+
+
+def to_numpy_mask(selection: Any, num_rows: int) -> np.ndarray:
+    """Mask or row ids as a numpy mask, nulls are not selected."""
+    if isinstance(selection, RowSelection):
+        mask = np.zeros(num_rows, dtype=bool)
+        mask[selection.row_ids] = True
+        return mask
+    return np.asarray(pc.fill_null(selection, False))
+
+
 class PyArrowFilterBuilder(Transformer):
-    def __init__(self, table: pa.Table):
+    """
+    Builds a boolean mask of rows matching filters.
+    Comparisons on columns with a value index are looked up in the index, and the result
+    is a `RowSelection` when the whole filters are answered by indexes.
+
+    Conditions combined by the same `and` / `or` are evaluated in the order of their cost and selectivity,
+    each one only on rows not decided by previous ones.
+    """
+
+    def __init__(
+            self,
+            table: pa.Table,
+            value_indexes: Optional[Dict[str, ValueIndex]] = None,
+            statistics: Optional[Dict[str, ColumnStatistics]] = None
+    ):
         super().__init__(visit_tokens=False)
 
         self._table = table
-        self._available_columns = {col: str(table[col].type) for col in table.column_names}
+        self._available_columns = {col: get_value_type(table[col].type) for col in table.column_names}
+        self.value_indexes = value_indexes if value_indexes is not None else {}
+        # footer statistics of columns used in filters, for estimates of selectivity
+        self.statistics = statistics if statistics is not None else {}
+
+    def transform(self, tree: Tree) -> Any:
+        if tree.data in ("expression", "grouped_expression"):
+            return self.transform(tree.children[0])
+        if tree.data == "and_or_expression":
+            return self._evaluate_conditions(tree)
+        return super().transform(tree)
+
+    def _get_usable_indexes(self) -> Dict[str, ValueIndex]:
+        return {
+            column: index for column, index in self.value_indexes.items() if index.num_rows == self._table.num_rows
+        }
+
+    def _evaluate_conditions(self, tree: Tree) -> Any:
+        value_indexes = self._get_usable_indexes()
+        if value_indexes:
+            selection = select_with_indexes(tree, value_indexes)
+            if selection is not None:
+                return selection
+
+        op = tree.children[1].children[0].type
+        num_rows = self._table.num_rows
+        conditions = ConditionPlanner(self._table, self.statistics, value_indexes).plan(tree, op)
+
+        # rows matching all conditions so far for `and`, rows matching any of them for `or`
+        selected = None
+        for i, condition in enumerate(conditions):
+            if selected is None:
+                selected = self._evaluate_condition(condition)
+                continue
+
+            num_candidates = _count_selected(selected)
+            if op == "OR":
+                num_candidates = num_rows - num_candidates
+            if num_candidates == 0:
+                PERF.count("filter.conditions_skipped", len(conditions) - i)
+                break
+
+            # row ids of a selection are known, rows of a mask have to be found
+            candidates_cost = 0.0 if op == "AND" and isinstance(selected, RowSelection) else CANDIDATES_COST
+            if num_candidates > num_rows * condition.get_take_share(candidates_cost):
+                # most rows are left, checking all of them is cheaper than copying
+                selected = _combine_selections(op, selected, self._evaluate_condition(condition))
+            else:
+                selected = self._evaluate_on_candidates(op, condition, selected)
+        return selected
+
+    def _evaluate_condition(self, condition: PlannedCondition) -> Any:
+        with PERF.span("filter.condition", rows=self._table.num_rows):
+            return self.transform(condition.tree)
+
+    def _evaluate_on_candidates(self, op: str, condition: PlannedCondition, selected: Any) -> Any:
+        """Checks the condition only on rows not decided by previous conditions."""
+        num_rows = self._table.num_rows
+        if op == "AND" and isinstance(selected, RowSelection):
+            candidates = selected.row_ids
+        else:
+            mask = to_numpy_mask(selected, num_rows)
+            candidates = np.flatnonzero(mask if op == "AND" else ~mask)
+
+        with PERF.span("filter.condition", rows=len(candidates)):
+            # only columns used by the condition are copied
+            columns = get_filter_columns(condition.tree, self._table.schema)
+            subset = take_rows(self._table.select(columns), candidates)
+            builder = PyArrowFilterBuilder(subset, statistics=self.statistics)
+            matched = candidates[to_numpy_mask(builder.transform(condition.tree), len(candidates))]
+
+        if op == "AND":
+            return RowSelection(matched, num_rows)
+        mask[matched] = True
+        return pa.array(mask)
 
     def unary_op(self, tree):
         return tree[0]
@@ -171,48 +565,163 @@ class PyArrowFilterBuilder(Transformer):
     def and_or_op(self, tree):
         return tree[0]
 
+    def in_op(self, tree):
+        return tree[0]
+
     def number(self, tree):
         return tree[0]
 
     def value(self, tree):
         return tree[0]
 
+    def value_list(self, tree):
+        return tree
+
     def column(self, tree):
-        column = tree[0]
-        if column.value not in self._available_columns:
+        column = tree[-1]
+        path = resolve_column_path(self._table.schema, column.value)
+        if path is None:
             raise UnexpectedColumn(column, list(self._available_columns))
 
-        return column
+        filter_column = FilterColumn(column, path, function=tree[0].value if len(tree) > 1 else None)
+        if filter_column.function is not None and self._get_column_type(filter_column) is None:
+            raise UnexpectedColumn(column, [name for name, t in self._available_columns.items() if is_list_type(t)])
+
+        return filter_column
+
+    def _get_column_type(self, column: FilterColumn) -> Optional[pa.DataType]:
+        data_type = get_path_type(self._table.schema, column.path)
+        if column.function is not None:
+            return get_function_type(column.function, data_type)
+        return data_type
+
+    def _get_column_data(self, column: FilterColumn) -> pa.ChunkedArray:
+        data = self._table[column.path[0]]
+        for name in column.path[1:]:
+            # nulls of parent structs are propagated to fields
+            data = pc.struct_field(data, [data.type.get_field_index(name)])
+        return data
+
+    def _evaluate(self, column: FilterColumn, func: Callable, *args: Any) -> Any:
+        data = self._get_column_data(column)
+        if column.function == "LEN":
+            data = pc.list_value_length(data)
+        elif column.function == "ANY":
+            # conditions are checked on all elements at once, then mapped to rows by parent indices
+            return any_element(data, self._evaluate_on_data(pc.list_flatten(data), func, *args))
+        return self._evaluate_on_data(data, func, *args)
+
+    @staticmethod
+    def _evaluate_on_data(data: pa.ChunkedArray, func: Callable, *args: Any) -> Any:
+        if pa.types.is_dictionary(data.type):
+            return evaluate_on_dictionary(func, data, *args)
+        return func(data, *args)
 
     def unary_expression(self, tree):
         column = tree[0]
         op = tree[1]
 
         op_name = op.type
-        table_column = self._table[column.value]
+        return self._evaluate(column, UNARY_OPERATORS[op_name])
 
-        return UNARY_OPERATORS[op_name](table_column)
+    def _check_operator(self, column, op, op_name: str) -> None:
+        operators = get_binary_operators(self._get_column_type(column))
+        if op_name not in operators:
+            raise UnsupportedOperator(op, operators.keys())
+
+    def _cast_literal(self, column, value) -> Any:
+        column_type = self._get_column_type(column)
+        if not _is_value_compatible(column_type, value.value):
+            raise InvalidValue(value, None)
+        try:
+            return cast_literal(value.value, column_type)
+        except ValueError:
+            raise InvalidValue(value, None)
+
+    def _get_value_index(self, column, op_name: str, values: List[Any]) -> Optional[ValueIndex]:
+        index = self.value_indexes.get(column.value) if column.is_plain else None
+        if (
+                index is not None and index.num_rows == self._table.num_rows and op_name in INDEX_OPERATORS
+                and all(_is_value_compatible(index.value_type, value) for value in values)
+        ):
+            return index
+        return None
 
     def binary_expression(self, tree):
         column = tree[0]
         op = tree[1]
         value = tree[2]
 
-        column_type = self._available_columns[column.value]
         op_name = op.type
+        self._check_operator(column, op, op_name)
+        if op_name in PATTERN_OPERATORS:
+            # patterns are passed as they are
+            if not isinstance(value.value, str):
+                raise InvalidValue(value, None)
+            literal = value.value
+        else:
+            # other literals are cast once to the column type
+            literal = self._cast_literal(column, value)
+
+        index = self._get_value_index(column, op_name, [to_python(literal)])
+        if index is not None:
+            return index.lookup(op_name, to_python(literal))
+
+        func = get_binary_operators(self._get_column_type(column))[op_name]
+        try:
+            return self._evaluate(column, func, literal)
+        except (pa.lib.ArrowNotImplementedError, pa.lib.ArrowInvalid):
+            # ArrowInvalid for malformed regular expressions
+            raise InvalidValue(value, None)
+
+    def in_expression(self, tree):
+        column = tree[0]
+        op = tree[1]
+        values = tree[2]
+
+        # membership is checked for the same column types as equality
+        self._check_operator(column, op, "EQUAL")
+        column_type = self._get_column_type(column)
+        for value in values:
+            if not _is_value_compatible(column_type, value.value):
+                raise InvalidValue(value, None)
 
-        if column_type not in BINARY_OPERATORS_FOR_COLUMN_TYPES:
-            raise UnsupportedOperator(op, [])
-        if op_name not in BINARY_OPERATORS_FOR_COLUMN_TYPES[column_type]:
-            raise UnsupportedOperator(op, BINARY_OPERATORS_FOR_COLUMN_TYPES[column_type].keys())
+        try:
+            # values are cast to the column type once, the lookup is a single hash set check
+            value_set = cast_value_set([value.value for value in values], column_type)
+        except (ValueError, pa.lib.ArrowTypeError, pa.lib.ArrowNotImplementedError):
+            raise InvalidValue(values[0], None)
+
+        index = self._get_value_index(column, op.type, value_set.to_pylist())
+        if index is not None:
+            return index.lookup(op.type, value_set.to_pylist())
+
+        def is_in(data: Any, value_set: pa.Array) -> Any:
+            selected = pc.is_in(data, value_set=value_set)
+            if op.type == "NOT_IN":
+                # nulls are neither in nor not in the list
+                selected = pc.and_kleene(pc.invert(selected), pc.is_valid(data))
+            return selected
 
-        func = BINARY_OPERATORS_FOR_COLUMN_TYPES[column_type][op_name]
-        table_column = self._table[column.value]
+        return self._evaluate(column, is_in, value_set)
+
+    def between_expression(self, tree):
+        column = tree[0]
+        op = tree[1]
+        low = tree[2]
+        high = tree[4]
+
+        self._check_operator(column, op, "LESS_THAN_OR_EQUAL")
+        low_literal, high_literal = self._cast_literal(column, low), self._cast_literal(column, high)
+
+        index = self._get_value_index(column, "BETWEEN", [to_python(low_literal), to_python(high_literal)])
+        if index is not None:
+            return index.lookup("BETWEEN", (to_python(low_literal), to_python(high_literal)))
 
         try:
-            return func(table_column, value.value)
+            return self._evaluate(column, between, low_literal, high_literal)
         except pa.lib.ArrowNotImplementedError:
-            raise InvalidValue(value, None)
+            raise InvalidValue(low, None)
 
     def expression(self, tree):
         return tree[0]
@@ -220,20 +729,185 @@ class PyArrowFilterBuilder(Transformer):
     def grouped_expression(self, tree):
         return tree[0]
 
-    def and_or_expression(self, tree):
-        left = tree[0]
-        op = tree[1]
-        right = tree[2]
 
-        func = AND_OR_OPERATORS[op.type]
-        return func(left, right)
+@functools.lru_cache(maxsize=None)
+def get_filter_parser() -> Lark:
+    # LALR tables are serialized to the cache dir; lark rebuilds them when the grammar changes
+    try:
+        cache = os.path.join(get_cache_dir(), f"filter_parser-{lark.__version__}.lark")
+    except OSError as e:
+        LOGGER.warning("Filter parser cache is not available: %s", e)
+        cache = False
+
+    return Lark(grammar, parser='lalr', transformer=TypeTransformer(), cache=cache)
+
+
+def get_filter_columns(filters_tree: Tree, schema: Optional[pa.Schema] = None) -> List[str]:
+    """Columns used in filters, top level columns of struct fields if `schema` is given."""
+    columns = []
+    for column in filters_tree.find_data("column"):
+        name = column.children[-1].value
+        path = resolve_column_path(schema, name) if schema is not None else None
+        if path is not None:
+            name = path[0]
+        if name not in columns:
+            columns.append(name)
+    return columns
+
+
+PUSHDOWN_OPERATORS = {
+    "EQUAL": lambda field, value: field == value,
+    "NOT_EQUAL": lambda field, value: field != value,
+    "LESS_THAN": lambda field, value: field < value,
+    "LESS_THAN_OR_EQUAL": lambda field, value: field <= value,
+    "GREATER_THAN": lambda field, value: field > value,
+    "GREATER_THAN_OR_EQUAL": lambda field, value: field >= value,
+}
 
 
-filter_parser = Lark(grammar, parser='lalr', transformer=TypeTransformer())
+def _is_value_compatible(data_type: pa.DataType, value: Any) -> bool:
+    data_type = get_value_type(data_type)
+    if isinstance(value, bool):
+        return pa.types.is_boolean(data_type)
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_decimal(data_type)
+    if isinstance(value, str):
+        # strings are parsed for temporal columns
+        return is_string_type(data_type) or is_temporal_type(data_type)
+    if isinstance(value, datetime.datetime):
+        return pa.types.is_timestamp(data_type)
+    if isinstance(value, datetime.date):
+        return pa.types.is_date(data_type) or pa.types.is_timestamp(data_type)
+    if isinstance(value, datetime.time):
+        return pa.types.is_time(data_type)
+    return False
+
+
+def _cast_pushdown_literals(values: List[Any], data_type: pa.DataType) -> Optional[List[Any]]:
+    if not all(_is_value_compatible(data_type, value) for value in values):
+        return None
+    try:
+        literals = [cast_literal(value, data_type) for value in values]
+    except ValueError:
+        return None
+    # values that do not fit the column type are left to the filters, expressions are bound to its type
+    return literals if all(isinstance(literal, pa.Scalar) for literal in literals) else None
+
+
+def build_pushdown_expression(filters_tree: Tree, schema: pa.Schema) -> Optional[ds.Expression]:
+    """
+    Dataset expression for the parts of filters that can be checked by a scanner:
+    partitions and row groups that cannot match are skipped without reading them.
+    The result selects a superset of filtered rows, so the filters still have to be applied to the data.
+    """
+    if filters_tree.data in ("expression", "grouped_expression"):
+        return build_pushdown_expression(filters_tree.children[0], schema)
+
+    if filters_tree.data == "and_or_expression":
+        left = build_pushdown_expression(filters_tree.children[0], schema)
+        right = build_pushdown_expression(filters_tree.children[2], schema)
+        op = filters_tree.children[1].children[0].type
+
+        if op == "AND":
+            if left is None or right is None:
+                return left if right is None else right
+            return left & right
+        if left is None or right is None:
+            return None
+        return left | right
+
+    column_tree = filters_tree.children[0]
+    # elements of lists have no statistics of their own
+    if len(column_tree.children) > 1:
+        return None
+
+    path = resolve_column_path(schema, column_tree.children[0].value)
+    if path is None:
+        return None
+
+    # fields of structs are pruned by statistics of their leaf columns
+    field = ds.field(*path)
+    column_type = get_path_type(schema, path)
+
+    if filters_tree.data == "between_expression":
+        literals = _cast_pushdown_literals(
+            [get_literal(filters_tree.children[2]), get_literal(filters_tree.children[4])], column_type
+        )
+        if literals is not None:
+            return (field >= literals[0]) & (field <= literals[1])
+        return None
+
+    op = filters_tree.children[1].children[0].type
+
+    if filters_tree.data == "in_expression":
+        values = [get_literal(value) for value in filters_tree.children[2].children]
+        # row group statistics can only prove that none of the values is present
+        if op == "IN" and all(_is_value_compatible(column_type, value) for value in values):
+            try:
+                return field.isin(cast_value_set(values, column_type))
+            except ValueError:
+                return None
+        return None
+
+    if filters_tree.data == "unary_expression":
+        return field.is_null() if op == "IS_NULL" else field.is_valid()
+
+    if filters_tree.data == "binary_expression":
+        literals = _cast_pushdown_literals([get_literal(filters_tree.children[2])], column_type)
+        if op == "STARTS_WITH" and literals is not None and is_string_type(literals[0].type):
+            # strings with a prefix are a range, so row groups are pruned by min / max statistics
+            upper = get_prefix_upper_bound(literals[0].as_py())
+            return field >= literals[0] if upper is None else (field >= literals[0]) & (field < upper)
+        if op in PUSHDOWN_OPERATORS and literals is not None:
+            # literals of the column type, so statistics of timestamps, decimals, etc. are compared as they are
+            return PUSHDOWN_OPERATORS[op](field, literals[0])
+
+    return None
+
+
+def select_with_indexes(filters_tree: Tree, value_indexes: Dict[str, ValueIndex]) -> Optional[RowSelection]:
+    """Rows matching filters found by indexes only, None if some of the conditions cannot use an index."""
+    if filters_tree.data in ("expression", "grouped_expression"):
+        return select_with_indexes(filters_tree.children[0], value_indexes)
+
+    if filters_tree.data == "and_or_expression":
+        left = select_with_indexes(filters_tree.children[0], value_indexes)
+        right = select_with_indexes(filters_tree.children[2], value_indexes) if left is not None else None
+        if left is None or right is None:
+            return None
+        return left.combine(filters_tree.children[1].children[0].type, right)
+
+    if filters_tree.data == "between_expression":
+        op = "BETWEEN"
+        values = [get_literal(filters_tree.children[2]), get_literal(filters_tree.children[4])]
+    elif filters_tree.data == "in_expression":
+        op = filters_tree.children[1].children[0].type
+        values = [get_literal(value) for value in filters_tree.children[2].children]
+    elif filters_tree.data == "binary_expression":
+        op = filters_tree.children[1].children[0].type
+        values = [get_literal(filters_tree.children[2])]
+    else:
+        return None
+
+    column_tree = filters_tree.children[0]
+    index = value_indexes.get(column_tree.children[0].value) if len(column_tree.children) == 1 else None
+    if index is None or op not in INDEX_OPERATORS or op in PATTERN_OPERATORS and not is_string_type(index.value_type):
+        return None
+
+    literals = _cast_pushdown_literals(values, index.value_type)
+    if literals is None:
+        return None
+    values = [to_python(literal) for literal in literals]
+
+    if op == "BETWEEN":
+        return index.lookup(op, tuple(values))
+    if op == "IN":
+        return index.lookup(op, values)
+    return index.lookup(op, values[0])
 
 
 def build_pa_filter(table: pa.Table, filters: str) -> Any:
     filter_builder = PyArrowFilterBuilder(table)
 
-    filters_tree = filter_parser.parse(filters)
+    filters_tree = get_filter_parser().parse(filters)
     return filter_builder.transform(filters_tree)
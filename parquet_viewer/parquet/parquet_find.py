@@ -0,0 +1,51 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from lark import Tree
+
+from parquet_viewer._perf import PERF
+from parquet_viewer.parquet.parquet_filter_planner import ColumnStatistics
+from parquet_viewer.parquet.parquet_filters import PyArrowFilterBuilder, to_numpy_mask
+
+# rows checked at once when the shown table is filtered or sorted and its rows are not in row groups of files
+FIND_BATCH_ROWS = 64 * 1024
+
+
+def get_row_group_bounds(footers: List[pq.FileMetaData]) -> np.ndarray:
+    """First row of each row group of all files, and the number of rows at the end."""
+    sizes = [footer.row_group(i).num_rows for footer in footers for i in range(footer.num_row_groups)]
+    return np.cumsum([0] + sizes)
+
+
+def get_batch_bounds(num_rows: int, batch_size: int = FIND_BATCH_ROWS) -> np.ndarray:
+    return np.append(np.arange(0, num_rows, batch_size), num_rows)
+
+
+def get_candidate_row_groups(dataset: ds.Dataset, paths: List[str], expression: ds.Expression) -> np.ndarray:
+    """
+    Row groups of all files in order of `paths` whose statistics and partition values do not exclude matches.
+    """
+    candidates: Dict[str, np.ndarray] = {}
+    with PERF.span("find.test_row_groups", files=len(paths)):
+        for fragment in dataset.get_fragments():
+            mask = np.zeros(fragment.num_row_groups, dtype=bool)
+            # dataset schema, so partition fields are known and checked against partition values
+            for row_group_fragment in fragment.split_by_row_group(expression, schema=dataset.schema):
+                mask[[row_group.id for row_group in row_group_fragment.row_groups]] = True
+            candidates[fragment.path] = mask
+    return np.concatenate([candidates[path] for path in paths])
+
+
+def find_in_table(
+        table: pa.Table,
+        filters_tree: Tree,
+        offset: int,
+        statistics: Optional[Dict[str, ColumnStatistics]] = None
+) -> np.ndarray:
+    """Positions of rows matching filters, `offset` is the position of the first row of the table."""
+    with PERF.span("find.check_rows", rows=table.num_rows):
+        selection = PyArrowFilterBuilder(table, statistics=statistics).transform(filters_tree)
+        return np.flatnonzero(to_numpy_mask(selection, table.num_rows)) + offset
@@ -0,0 +1,204 @@
+import sys
+from typing import Any, List, Optional, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from parquet_viewer._perf import PERF
+
+# comparisons answered by a binary search in sorted values
+INDEX_OPERATORS = (
+    "EQUAL", "LESS_THAN", "LESS_THAN_OR_EQUAL", "GREATER_THAN", "GREATER_THAN_OR_EQUAL", "BETWEEN", "IN", "STARTS_WITH"
+)
+
+VALUES_COLUMN = "values"
+ROW_IDS_COLUMN = "row_ids"
+NUM_ROWS_METADATA = b"num_rows"
+
+
+def _get_index_type(data_type: pa.DataType) -> pa.DataType:
+    if pa.types.is_dictionary(data_type):
+        data_type = data_type.value_type
+    # sorted values of a large column may not fit 32 bit offsets
+    if pa.types.is_string(data_type):
+        return pa.large_string()
+    if pa.types.is_binary(data_type):
+        return pa.large_binary()
+    return data_type
+
+
+def get_prefix_upper_bound(prefix: str) -> Optional[str]:
+    """Smallest string greater than all strings starting with `prefix`, None if there is no such string."""
+    while prefix:
+        code = ord(prefix[-1]) + 1
+        if 0xD800 <= code <= 0xDFFF:
+            # surrogates cannot be encoded to utf-8
+            code = 0xE000
+        if code <= sys.maxunicode:
+            return prefix[:-1] + chr(code)
+        prefix = prefix[:-1]
+    return None
+
+
+def _combine_chunks(data: Union[pa.Array, pa.ChunkedArray]) -> pa.Array:
+    return data.combine_chunks() if isinstance(data, pa.ChunkedArray) else data
+
+
+def take_rows(table: pa.Table, row_ids: np.ndarray) -> pa.Table:
+    """
+    Same as `Table.take` for sorted row ids, but only record batches with selected rows are touched
+    (take on chunked columns concatenates all their chunks first).
+    """
+    batches = table.to_batches()
+    starts = np.cumsum([0] + [batch.num_rows for batch in batches])
+    bounds = np.searchsorted(row_ids, starts)
+
+    selected = [
+        batch.take(pa.array(row_ids[bounds[i]:bounds[i + 1]] - starts[i], type=pa.uint64()))
+        for i, batch in enumerate(batches) if bounds[i] < bounds[i + 1]
+    ]
+    return pa.Table.from_batches(selected, schema=table.schema)
+
+
+class RowSelection:
+    """Rows matching a filter as sorted row ids, instead of a mask over the whole table."""
+
+    def __init__(self, row_ids: np.ndarray, num_rows: int) -> None:
+        self.row_ids = row_ids
+        self.num_rows = num_rows
+
+    def __len__(self) -> int:
+        return len(self.row_ids)
+
+    def to_mask(self) -> pa.Array:
+        mask = np.zeros(self.num_rows, dtype=bool)
+        mask[self.row_ids] = True
+        return pa.array(mask)
+
+    def to_array(self) -> pa.Array:
+        return pa.array(self.row_ids, type=pa.uint64())
+
+    def combine(self, op: str, other: "RowSelection") -> "RowSelection":
+        if op == "AND":
+            row_ids = np.intersect1d(self.row_ids, other.row_ids, assume_unique=True)
+        else:
+            row_ids = np.union1d(self.row_ids, other.row_ids)
+        return RowSelection(row_ids, self.num_rows)
+
+
+class ValueIndex:
+    """Non-null values of a column in sorted order with ids of their rows."""
+
+    def __init__(self, column: str, values: pa.Array, row_ids: pa.Array, num_rows: int) -> None:
+        self.column = column
+        self.values = values
+        self.row_ids = row_ids
+        # rows in the indexed table
+        self.num_rows = num_rows
+
+    @classmethod
+    def build(cls, table: pa.Table, column: str) -> "ValueIndex":
+        with PERF.span("index.build", column=column, rows=table.num_rows):
+            data = table[column]
+            if pa.types.is_nested(data.type):
+                raise ValueError(f"Column '{column}' of type {data.type} cannot be indexed")
+            data = pc.cast(data, _get_index_type(data.type))
+
+            valid = pc.is_valid(data)
+            if pa.types.is_floating(data.type):
+                # NaN breaks ordering of values
+                valid = pc.and_(valid, pc.invert(pc.is_nan(data)))
+
+            row_ids = pc.indices_nonzero(valid)
+            values = data.filter(valid)
+            order = pc.sort_indices(values)
+
+            return cls(
+                column=column,
+                values=_combine_chunks(pc.take(values, order)),
+                row_ids=_combine_chunks(pc.take(row_ids, order)),
+                num_rows=table.num_rows
+            )
+
+    @classmethod
+    def from_table(cls, column: str, table: pa.Table) -> "ValueIndex":
+        return cls(
+            column=column,
+            values=table[VALUES_COLUMN].combine_chunks(),
+            row_ids=table[ROW_IDS_COLUMN].combine_chunks(),
+            num_rows=int(table.schema.metadata[NUM_ROWS_METADATA])
+        )
+
+    def to_table(self) -> pa.Table:
+        return pa.table(
+            {VALUES_COLUMN: self.values, ROW_IDS_COLUMN: self.row_ids},
+            metadata={NUM_ROWS_METADATA: str(self.num_rows)}
+        )
+
+    @property
+    def value_type(self) -> pa.DataType:
+        return self.values.type
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.row_ids.nbytes
+
+    def _bisect(self, value: Any, right: bool) -> int:
+        # O(log n) scalar reads, values may be memory mapped
+        lo, hi = 0, len(self.values)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_value = self.values[mid].as_py()
+            if mid_value < value or (right and mid_value == value):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _get_ranges(self, op: str, value: Any) -> List[Tuple[int, int]]:
+        if op == "EQUAL":
+            return [(self._bisect(value, right=False), self._bisect(value, right=True))]
+        if op == "LESS_THAN":
+            return [(0, self._bisect(value, right=False))]
+        if op == "LESS_THAN_OR_EQUAL":
+            return [(0, self._bisect(value, right=True))]
+        if op == "GREATER_THAN":
+            return [(self._bisect(value, right=True), len(self.values))]
+        if op == "GREATER_THAN_OR_EQUAL":
+            return [(self._bisect(value, right=False), len(self.values))]
+        if op == "BETWEEN":
+            low, high = value
+            return [(self._bisect(low, right=False), self._bisect(high, right=True))]
+        if op == "IN":
+            return self._get_value_ranges(value)
+        if op == "STARTS_WITH":
+            # strings are sorted by code points, so strings with a prefix are a range
+            upper = get_prefix_upper_bound(value)
+            stop = len(self.values) if upper is None else self._bisect(upper, right=False)
+            return [(self._bisect(value, right=False), stop)]
+        raise ValueError(f"Operator {op} is not supported by value index")
+
+    def _get_value_ranges(self, values: List[Any]) -> List[Tuple[int, int]]:
+        if pa.types.is_integer(self.value_type) or pa.types.is_floating(self.value_type):
+            # one vectorized search for all values of a numeric index
+            sorted_values = self.values.to_numpy()
+            search_values = np.asarray(values)
+            return list(zip(
+                np.searchsorted(sorted_values, search_values, side="left").tolist(),
+                np.searchsorted(sorted_values, search_values, side="right").tolist()
+            ))
+        return [(self._bisect(value, right=False), self._bisect(value, right=True)) for value in values]
+
+    def lookup(self, op: str, value: Any) -> RowSelection:
+        with PERF.span("index.lookup", column=self.column, op=op):
+            ranges = [(start, stop) for start, stop in self._get_ranges(op, value) if start < stop]
+            if ranges:
+                row_ids = np.concatenate([self.row_ids[start:stop].to_numpy() for start, stop in ranges])
+            else:
+                row_ids = np.array([], dtype=np.uint64)
+
+            # row ids in table order, so the selection keeps the order of rows
+            row_ids = np.unique(row_ids)
+            PERF.count("index.selected_rows", len(row_ids))
+            return RowSelection(row_ids, self.num_rows)
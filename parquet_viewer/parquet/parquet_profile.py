@@ -0,0 +1,243 @@
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from parquet_viewer._perf import PERF
+from parquet_viewer.parquet.parquet_conversion import ProgressCallback
+from parquet_viewer.parquet.parquet_filter_planner import ColumnStatistics, get_column_statistics
+from parquet_viewer.parquet.parquet_filters import is_list_type, is_string_type, is_temporal_type
+
+HISTOGRAM_BINS = 20
+TOP_VALUES = 10
+MAX_PROFILE_WORKERS = min(8, os.cpu_count() or 1)
+
+VALUES_COLUMN = "values"
+COUNTS_COLUMN = "counts"
+
+# (low, high, count) of bins in the order of values
+Histogram = List[Tuple[Any, Any, int]]
+
+
+@dataclass
+class FooterColumnProfile:
+    # leaf column, e.g. `payload.user.id`
+    column: str
+    physical_type: str
+    # e.g. STRING, TIMESTAMP, NONE for plain physical types
+    logical_type: str
+    # None if no row group of the column has statistics
+    statistics: Optional[ColumnStatistics]
+    compressed_size: int
+    uncompressed_size: int
+
+
+@dataclass
+class ColumnProfile:
+    # top level column
+    column: str
+    num_rows: int
+    null_count: int
+    # distinct non-null values, None for nested columns
+    distinct_count: Optional[int] = None
+    min: Any = None
+    max: Any = None
+    # most frequent values with their counts
+    top_values: List[Tuple[Any, int]] = field(default_factory=list)
+    # values of number and temporal columns
+    histogram: Histogram = field(default_factory=list)
+    # lengths of strings and binaries, numbers of elements of lists
+    length_histogram: Histogram = field(default_factory=list)
+
+
+def get_footer_profile(footers: List[pq.FileMetaData]) -> List[FooterColumnProfile]:
+    """Types, sizes and statistics of leaf columns of the first file, merged over row groups of all files."""
+    schema = footers[0].schema
+    columns = [schema.column(i) for i in range(len(schema))]
+    statistics = get_column_statistics(footers, [column.path for column in columns])
+
+    sizes: Dict[str, Tuple[int, int]] = {}
+    for footer in footers:
+        for r in range(footer.num_row_groups):
+            row_group = footer.row_group(r)
+            for i in range(row_group.num_columns):
+                chunk = row_group.column(i)
+                compressed, uncompressed = sizes.get(chunk.path_in_schema, (0, 0))
+                sizes[chunk.path_in_schema] = (
+                    compressed + chunk.total_compressed_size, uncompressed + chunk.total_uncompressed_size
+                )
+
+    return [
+        FooterColumnProfile(
+            column.path,
+            column.physical_type,
+            column.logical_type.type,
+            statistics.get(column.path),
+            *sizes.get(column.path, (0, 0))
+        )
+        for column in columns
+    ]
+
+
+def _get_counted_values(data: pa.Array) -> Optional[pa.Array]:
+    if is_list_type(data.type):
+        return pc.list_value_length(data)
+    if pa.types.is_nested(data.type):
+        return None
+    return data
+
+
+def count_values(data: pa.Array) -> Tuple[int, Optional[pa.Table]]:
+    """
+    Null count and counts of distinct values of a chunk of a column;
+    lists are counted by their lengths, structs and maps only by nulls.
+    """
+    values = _get_counted_values(data)
+    if values is None:
+        return data.null_count, None
+
+    with PERF.span("profile.count_values", rows=len(data)):
+        counts = pc.value_counts(values)
+        counted = counts.field(VALUES_COLUMN)
+        if pa.types.is_dictionary(counted.type):
+            # dictionaries of chunks differ, counts are merged by values
+            counted = counted.cast(counted.type.value_type)
+        return data.null_count, pa.table({VALUES_COLUMN: counted, COUNTS_COLUMN: counts.field(COUNTS_COLUMN)})
+
+
+def merge_counts(parts: List[pa.Table]) -> pa.Table:
+    """Counts of distinct non-null values summed over chunks."""
+    with PERF.span("profile.merge_counts", parts=len(parts)):
+        merged = pa.concat_tables(parts).group_by(VALUES_COLUMN).aggregate([(COUNTS_COLUMN, "sum")])
+        merged = pa.table({VALUES_COLUMN: merged[VALUES_COLUMN], COUNTS_COLUMN: merged[f"{COUNTS_COLUMN}_sum"]})
+        return merged.filter(pc.is_valid(merged[VALUES_COLUMN]))
+
+
+def _to_histogram_numbers(values: pa.Array) -> Optional[np.ndarray]:
+    data_type = values.type
+    if pa.types.is_integer(data_type) or pa.types.is_floating(data_type):
+        return values.to_numpy(zero_copy_only=False)
+    if pa.types.is_decimal(data_type):
+        return values.cast(pa.float64()).to_numpy(zero_copy_only=False)
+    if is_temporal_type(data_type):
+        # binned by the underlying integers, bounds are converted back
+        storage_type = pa.int64() if data_type.bit_width == 64 else pa.int32()
+        return values.view(storage_type).to_numpy(zero_copy_only=False)
+    return None
+
+
+def get_histogram(numbers: np.ndarray, counts: np.ndarray, bins: int = HISTOGRAM_BINS) -> Histogram:
+    finite = np.isfinite(numbers)
+    numbers, counts = numbers[finite], counts[finite]
+    if not len(numbers):
+        return []
+
+    low, high = numbers.min(), numbers.max()
+    integers = np.issubdtype(numbers.dtype, np.integer)
+    if integers:
+        # bins of integers have integer bounds, the high bound is excluded
+        low, high = int(low), int(high) + 1
+        width = max(1, math.ceil((high - low) / bins))
+        bins = math.ceil((high - low) / width)
+        high = low + width * bins
+    frequencies, edges = np.histogram(numbers, bins=bins, range=(low, high), weights=counts)
+    if integers:
+        edges = np.round(edges).astype(np.int64)
+    return list(zip(edges[:-1].tolist(), edges[1:].tolist(), frequencies.astype(np.int64).tolist()))
+
+
+def _from_histogram_numbers(histogram: Histogram, data_type: pa.DataType) -> Histogram:
+    if not histogram or not is_temporal_type(data_type):
+        return histogram
+
+    storage_type = pa.int64() if data_type.bit_width == 64 else pa.int32()
+
+    def to_values(bounds: List[float]) -> List[Any]:
+        return pa.array(np.round(bounds).astype(np.int64)).cast(storage_type).view(data_type).to_pylist()
+
+    lows, highs, frequencies = zip(*histogram)
+    return list(zip(to_values(list(lows)), to_values(list(highs)), frequencies))
+
+
+def get_column_profile(
+        column: str, data_type: pa.DataType, num_rows: int, parts: List[Tuple[int, Optional[pa.Table]]]
+) -> ColumnProfile:
+    """Profile of a top level column from null counts and value counts of its chunks."""
+    profile = ColumnProfile(column, num_rows, sum(null_count for null_count, _ in parts))
+    counted_parts = [counts for _, counts in parts if counts is not None]
+    if not counted_parts:
+        return profile
+
+    merged = merge_counts(counted_parts)
+    values, counts = merged[VALUES_COLUMN].combine_chunks(), merged[COUNTS_COLUMN].to_numpy()
+    if not len(values):
+        return profile
+
+    if is_list_type(data_type):
+        profile.length_histogram = get_histogram(values.to_numpy(zero_copy_only=False), counts)
+        return profile
+
+    with PERF.span("profile.summarize", column=column, values=len(values)):
+        profile.distinct_count = len(values)
+        min_max = pc.min_max(values)
+        profile.min, profile.max = min_max["min"].as_py(), min_max["max"].as_py()
+
+        if counts.max() > 1:
+            # no top values if all values are unique
+            top = pc.select_k_unstable(merged, TOP_VALUES, [(COUNTS_COLUMN, "descending")])
+            profile.top_values = list(zip(values.take(top).to_pylist(), counts[top.to_numpy()].tolist()))
+
+        numbers = _to_histogram_numbers(values)
+        if numbers is not None:
+            profile.histogram = _from_histogram_numbers(get_histogram(numbers, counts), values.type)
+        elif is_string_type(values.type) or pa.types.is_binary(values.type) or pa.types.is_large_binary(values.type):
+            lengths = pc.utf8_length(values) if is_string_type(values.type) else pc.binary_length(values)
+            profile.length_histogram = get_histogram(lengths.to_numpy(zero_copy_only=False), counts)
+    return profile
+
+
+def compute_column_profiles(
+        table: pa.Table,
+        columns: Collection[str],
+        progress_cb: Optional[ProgressCallback] = None,
+        max_workers: int = MAX_PROFILE_WORKERS
+) -> Dict[str, ColumnProfile]:
+    """
+    Profiles of top level columns, chunks of all columns are counted in parallel.
+    Columns not finished when `progress_cb` aborts are left out.
+    """
+    tasks = [(column, chunk) for column in columns for chunk in table[column].chunks]
+    parts: Dict[str, List[Tuple[int, Optional[pa.Table]]]] = {column: [] for column in columns}
+    remaining = {column: table[column].num_chunks for column in columns}
+    profiles = {
+        column: get_column_profile(column, table[column].type, table.num_rows, [])
+        for column in columns if not remaining[column]
+    }
+
+    if progress_cb is not None and progress_cb(len(tasks), 0):
+        return profiles
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="profile") as executor:
+        futures = {executor.submit(count_values, chunk): column for column, chunk in tasks}
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                column = futures[future]
+                parts[column].append(future.result())
+                remaining[column] -= 1
+                if not remaining[column]:
+                    profiles[column] = get_column_profile(
+                        column, table[column].type, table.num_rows, parts.pop(column)
+                    )
+
+                if progress_cb is not None and progress_cb(len(tasks), done):
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+    return profiles
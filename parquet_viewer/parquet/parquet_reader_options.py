@@ -0,0 +1,70 @@
+from dataclasses import dataclass, asdict, fields, replace
+from typing import Any, Dict, Optional
+
+from parquet_viewer._config import load_config
+
+MB = 1024 * 1024
+
+DEFAULT_PROFILE = "default"
+
+
+@dataclass(frozen=True)
+class ReaderOptions:
+    # map the file into memory, column data is not copied when the file is not compressed
+    memory_map: bool = False
+    # coalesce and issue reads of a row group in parallel, helps on high latency storages
+    pre_buffer: bool = True
+    # size of read buffer for each column, 0 reads whole column chunks at once
+    buffer_size: int = 0
+    use_threads: bool = True
+
+    def to_read_table_kwargs(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_parquet_file_kwargs(self) -> Dict[str, Any]:
+        return dict(memory_map=self.memory_map, buffer_size=self.buffer_size, pre_buffer=self.pre_buffer)
+
+    def to_fragment_scan_kwargs(self) -> Dict[str, Any]:
+        # used for datasets, memory_map is an option of the file system there
+        kwargs: Dict[str, Any] = dict(pre_buffer=self.pre_buffer, use_buffered_stream=self.buffer_size > 0)
+        if self.buffer_size > 0:
+            kwargs["buffer_size"] = self.buffer_size
+        return kwargs
+
+    @classmethod
+    def from_dict(cls, options: Dict[str, Any], base: Optional["ReaderOptions"] = None) -> "ReaderOptions":
+        known_fields = {f.name for f in fields(cls)}
+        unknown_fields = set(options) - known_fields
+        if unknown_fields:
+            raise ValueError(f"Unknown reader options: {', '.join(sorted(unknown_fields))}")
+        return replace(base or cls(), **options)
+
+
+READER_PROFILES: Dict[str, ReaderOptions] = {
+    DEFAULT_PROFILE: ReaderOptions(),
+    # NVMe / SSD: zero copy reads, no need to coalesce requests
+    "local-ssd": ReaderOptions(memory_map=True, pre_buffer=False),
+    # NFS / SMB mounts: few large reads are better than many small ones
+    "network": ReaderOptions(pre_buffer=True, buffer_size=8 * MB),
+    # keep peak memory low at the cost of speed
+    "low-memory": ReaderOptions(pre_buffer=False, buffer_size=1 * MB, use_threads=False),
+}
+
+
+def get_reader_profiles(custom_profiles: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, ReaderOptions]:
+    profiles = dict(READER_PROFILES)
+    for name, options in (custom_profiles or {}).items():
+        profiles[name] = ReaderOptions.from_dict(options, base=profiles.get(name))
+    return profiles
+
+
+def get_reader_options(profile: str, custom_profiles: Optional[Dict[str, Dict[str, Any]]] = None) -> ReaderOptions:
+    profiles = get_reader_profiles(custom_profiles)
+    if profile not in profiles:
+        raise ValueError(f"Unknown reader profile '{profile}'. Available profiles are: {', '.join(profiles)}")
+    return profiles[profile]
+
+
+def get_configured_reader_options(profile: Optional[str] = None) -> ReaderOptions:
+    config = load_config()
+    return get_reader_options(profile or config["reader_profile"], config["reader_profiles"])
@@ -0,0 +1,118 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from parquet_viewer._perf import PERF
+from parquet_viewer.parquet.parquet_filters import get_value_type, is_string_type
+
+# rows searched by one task, close to a row group of files written with default settings
+SEARCH_BATCH_ROWS = 64 * 1024
+MAX_SEARCH_HITS = 1000
+MAX_SEARCH_WORKERS = min(8, os.cpu_count() or 1)
+
+
+@dataclass
+class SearchHit:
+    # row of the searched table
+    row: int
+    column: str
+    value: Any
+
+
+def is_number_type(data_type: pa.DataType) -> bool:
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_decimal(data_type)
+
+
+def get_search_columns(schema: pa.Schema, include_numbers: bool = False) -> List[str]:
+    """Top level string columns, and number columns compared by their text when `include_numbers` is set."""
+    columns = []
+    for field in schema:
+        value_type = get_value_type(field.type)
+        if is_string_type(value_type) or (include_numbers and is_number_type(value_type)):
+            columns.append(field.name)
+    return columns
+
+
+def match_text(data: pa.Array, text: str, ignore_case: bool) -> pa.Array:
+    if pa.types.is_dictionary(data.type):
+        # distinct values are matched once
+        return pc.take(match_text(data.dictionary, text, ignore_case), data.indices)
+    if not is_string_type(data.type):
+        data = pc.cast(data, pa.string())
+    return pc.match_substring(data, text, ignore_case=ignore_case)
+
+
+def search_batch(
+        batch: pa.RecordBatch, offset: int, columns: List[str], text: str, ignore_case: bool
+) -> List[SearchHit]:
+    rows, positions = [], []
+    with PERF.span("search.batch", rows=batch.num_rows, columns=len(columns)):
+        for position, column in enumerate(columns):
+            found = pc.indices_nonzero(pc.fill_null(match_text(batch.column(column), text, ignore_case), False))
+            rows.append(found.to_numpy())
+            positions.append(np.full(len(found), position))
+
+    rows, positions = np.concatenate(rows), np.concatenate(positions)
+    # hits in table order, columns of a row in schema order
+    order = np.lexsort((positions, rows))
+    return [
+        SearchHit(offset + int(row), columns[position], batch.column(columns[position])[int(row)].as_py())
+        for row, position in zip(rows[order], positions[order])
+    ]
+
+
+def iter_search_hits(
+        table: pa.Table,
+        text: str,
+        include_numbers: bool = False,
+        ignore_case: bool = True,
+        max_hits: int = MAX_SEARCH_HITS,
+        cancelled: Optional[threading.Event] = None,
+        batch_size: int = SEARCH_BATCH_ROWS,
+        max_workers: int = MAX_SEARCH_WORKERS
+) -> Iterator[Tuple[List[SearchHit], int]]:
+    """
+    Hits of `text` in string columns of a table with the number of rows searched so far.
+    Batches are searched in parallel and reported in table order as soon as all preceding batches are done.
+    """
+    columns = get_search_columns(table.schema, include_numbers)
+    if not text or not columns:
+        return
+
+    batches = table.select(columns).to_batches(max_chunksize=batch_size)
+    offsets = np.cumsum([0] + [batch.num_rows for batch in batches]).tolist()
+
+    num_hits = 0
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search") as executor:
+        # a bounded window of tasks, so a cancelled or finished search does not scan the rest of the table
+        pending = deque()
+        next_batch = 0
+        try:
+            while next_batch < len(batches) or pending:
+                while next_batch < len(batches) and len(pending) < 2 * max_workers:
+                    pending.append(executor.submit(
+                        search_batch, batches[next_batch], offsets[next_batch], columns, text, ignore_case
+                    ))
+                    next_batch += 1
+
+                hits = pending.popleft().result()
+                if cancelled is not None and cancelled.is_set():
+                    return
+
+                hits = hits[:max_hits - num_hits]
+                num_hits += len(hits)
+                PERF.count("search.hits", len(hits))
+                yield hits, offsets[next_batch - len(pending)]
+
+                if num_hits >= max_hits:
+                    return
+        finally:
+            for future in pending:
+                future.cancel()
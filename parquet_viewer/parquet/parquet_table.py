@@ -1,38 +1,425 @@
+import math
 import os.path
-from typing import Dict
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 import pyarrow.parquet as pq
 
-from parquet_viewer.parquet.parquet_filters import PyArrowFilterBuilder, filter_parser
+from parquet_viewer._perf import PERF
+from parquet_viewer.parquet.parquet_aggregate import (
+    AGGREGATE_BATCH_ROWS,
+    Aggregation,
+    aggregate_batches,
+    check_aggregation,
+    get_aggregation_columns
+)
+from parquet_viewer.parquet.parquet_cache import LRUCache, estimate_py_nbytes
+from parquet_viewer.parquet.parquet_conversion import ProgressCallback
+from parquet_viewer.parquet.parquet_copy import CopyFormat, CopyResult, copy_table
+from parquet_viewer.parquet.parquet_dataset import (
+    ParquetSourceType,
+    resolve_parquet_source,
+    read_footers,
+    open_dataset,
+    get_partition_columns,
+    with_dictionary_columns
+)
+from parquet_viewer.parquet.parquet_display import truncate_table
+from parquet_viewer.parquet.parquet_disk_cache import DISK_CACHE, VALUE_INDEXES, DiskCache, get_source_identity
+from parquet_viewer.parquet.parquet_filter_planner import ColumnStatistics, get_column_statistics
+from parquet_viewer.parquet.parquet_find import (
+    find_in_table,
+    get_batch_bounds,
+    get_candidate_row_groups,
+    get_row_group_bounds
+)
+from parquet_viewer.parquet.parquet_index import RowSelection, ValueIndex, take_rows
+from parquet_viewer.parquet.parquet_reader_options import ReaderOptions
+from parquet_viewer.parquet.parquet_profile import (
+    ColumnProfile,
+    FooterColumnProfile,
+    compute_column_profiles,
+    get_footer_profile
+)
+from parquet_viewer.parquet.parquet_search import SearchHit, iter_search_hits
+from parquet_viewer.parquet.parquet_filters import (
+    PyArrowFilterBuilder,
+    apply_selection,
+    get_filter_parser,
+    get_filter_columns,
+    build_pushdown_expression,
+    select_with_indexes
+)
+
+# string columns with dictionary pages smaller than this share of the column data are read as dictionary arrays
+DICTIONARY_PAGE_RATIO = 0.25
+
+
+def get_dictionary_columns(metadata: pq.FileMetaData) -> List[str]:
+    """Top level string columns that are dictionary encoded in all row groups and have small dictionaries."""
+    candidates = {}
+    for i in range(metadata.num_columns):
+        column = metadata.schema.column(i)
+        if column.physical_type == "BYTE_ARRAY" and "." not in column.path and column.max_repetition_level == 0:
+            candidates[i] = column.path
+
+    for rg in range(metadata.num_row_groups):
+        row_group = metadata.row_group(rg)
+        for i in list(candidates):
+            chunk = row_group.column(i)
+            if not chunk.has_dictionary_page or not chunk.total_uncompressed_size:
+                candidates.pop(i)
+                continue
+
+            # writers fall back to plain encoding when a dictionary grows too large,
+            # so a big dictionary page means high cardinality
+            dictionary_page_size = chunk.data_page_offset - chunk.dictionary_page_offset
+            if dictionary_page_size > DICTIONARY_PAGE_RATIO * chunk.total_compressed_size:
+                candidates.pop(i)
+
+    return list(candidates.values())
+
+
+# first rows of a sorted table are found with a partial sort, it is enough for the first pages
+TOP_K_ROWS = 10000
+
+SortKeys = List[Tuple[str, str]]
+
+
+@dataclass(frozen=True)
+class TableSnapshot:
+    """
+    Filters and sort keys of a table with its filtered table, taken on the GUI thread,
+    so background jobs are not affected by filters and sort keys changed while they run.
+    """
+    filters: str = ""
+    sort_keys: Tuple[Tuple[str, str], ...] = ()
+    # None if the filtered table is not read yet
+    table: Optional[pa.Table] = None
+
+
+def get_sort_table(table: pa.Table, sort_keys: SortKeys) -> Tuple[pa.Table, SortKeys]:
+    """Table with sort key columns only, dictionary columns are replaced by ranks of their values."""
+    columns = {}
+    table_sort_keys = []
+    for i, (column, order) in enumerate(sort_keys):
+        data = table[column]
+        if pa.types.is_nested(data.type):
+            # pyarrow may crash on nested sort keys instead of raising an error
+            raise ValueError(f"Column '{column}' of type {data.type} cannot be sorted")
+        if pa.types.is_dictionary(data.type):
+            data = pa.table({column: data}).unify_dictionaries()[column]
+            data = pa.chunked_array(
+                [pc.take(pc.rank(chunk.dictionary, sort_keys="ascending"), chunk.indices) for chunk in data.chunks],
+                type=pa.uint64()
+            )
+        columns[f"key_{i}"] = data
+        table_sort_keys.append((f"key_{i}", order))
+
+    return pa.table(columns), table_sort_keys
+
+
+def batch_to_pylist(record_batch: pa.RecordBatch) -> List[Dict[str, Any]]:
+    """Same as `RecordBatch.to_pylist`, but dictionary values are converted once and shared between rows."""
+    columns = []
+    for column in record_batch.columns:
+        if pa.types.is_dictionary(column.type):
+            values = column.dictionary.to_pylist()
+            columns.append([None if i is None else values[i] for i in column.indices.to_pylist()])
+        else:
+            columns.append(column.to_pylist())
+
+    names = record_batch.schema.names
+    if not names:
+        return [{} for _ in range(record_batch.num_rows)]
+    return [dict(zip(names, row)) for row in zip(*columns)]
 
 
 class ParquetTable:
-    def __init__(self, parquet_file: str, batch_size: int):
-        self.parquet_file = os.path.abspath(parquet_file)
+    def __init__(
+            self,
+            parquet_file: ParquetSourceType,
+            batch_size: int,
+            reader_options: Optional[ReaderOptions] = None,
+            dictionary_columns: Optional[List[str]] = None,
+            disk_cache: Optional[DiskCache] = None
+    ):
+        # a single file, or a directory, glob pattern or list of files read as one dataset
+        self.parquet_source = resolve_parquet_source(parquet_file)
+        self.parquet_file = self.parquet_source.display_name
         self._batch_size = batch_size
+        self._reader_options = reader_options or ReaderOptions()
+        # None - detect from the file metadata
+        self._dictionary_columns = dictionary_columns
+        self.read_time: Optional[float] = None
 
         self._table = None
+        # the table is read once, also when background jobs need it first
+        self._table_lock = threading.RLock()
         self._batches = None
+        self._footers = None
+        self._dataset = None
 
         self._filter_builder = None
-        self._pyarrow_filters = None
         self._filters = ""
         self._filtered_table = None
 
+        # results of previously applied filters and pages converted to python objects
+        self._filtered_tables_cache = LRUCache("filtered_tables")
+        self._pages_cache = LRUCache("pages")
+        # row groups of datasets read for pages, the whole dataset is read only when filtered or sorted
+        self._row_groups_cache = LRUCache("row_groups")
+
+        self._sort_keys: SortKeys = []
+        # permutations of filtered tables by (filters, sort keys)
+        self._sort_indices_cache = LRUCache("sort_indices")
+        # positions of rows matching find filters by chunks of the shown table
+        self._found_rows_cache = LRUCache("found_rows")
+
+        # filter selections and sort permutations are kept between sessions
+        self._disk_cache = disk_cache or DISK_CACHE
+        self._identity = None
+
+        # sorted values of columns with row ids, used by filters for point and range lookups
+        self._value_indexes: Dict[str, ValueIndex] = {}
+        self._column_statistics: Dict[str, ColumnStatistics] = {}
+        # profiles of the data of top level columns, they do not depend on reader options
+        self._column_profiles: Dict[str, ColumnProfile] = {}
+
+    @property
+    def is_dataset(self) -> bool:
+        return self.parquet_source.is_dataset
+
+    def _read_table(self, pushdown: Optional[ds.Expression] = None) -> pa.Table:
+        with PERF.span("table.read_table", file=self.parquet_file, pushdown=pushdown):
+            if self.is_dataset:
+                # fragments are read in parallel, partitions not matching pushdown filter are not opened;
+                # pages of unfiltered and unsorted datasets are read by `_read_dataset_rows` instead
+                return self.dataset.to_table(filter=pushdown, use_threads=self._reader_options.use_threads)
+
+            kwargs = {} if pushdown is None else {"filters": pushdown}
+            return pq.read_table(
+                self.parquet_source.paths[0],
+                read_dictionary=self.dictionary_columns,
+                **self._reader_options.to_read_table_kwargs(),
+                **kwargs
+            )
+
+    def _read_rows(self, row_ids: np.ndarray) -> pa.Table:
+        """Rows of a single file by their numbers, only row groups containing them are read."""
+        metadata = self.metadata
+        row_group_starts = np.cumsum([0] + [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)])
+        row_groups = np.searchsorted(row_group_starts, row_ids, side="right") - 1
+        read_row_groups = np.unique(row_groups)
+
+        with PERF.span("table.read_row_groups", row_groups=len(read_row_groups), rows=len(row_ids)):
+            parquet_file = pq.ParquetFile(
+                self.parquet_source.paths[0],
+                read_dictionary=self.dictionary_columns,
+                **self._reader_options.to_parquet_file_kwargs()
+            )
+            table = parquet_file.read_row_groups(read_row_groups.tolist(), use_threads=self._reader_options.use_threads)
+
+        # position of each row group in the read table
+        read_starts = np.cumsum([0] + [metadata.row_group(int(rg)).num_rows for rg in read_row_groups[:-1]])
+        positions = row_ids - row_group_starts[row_groups] + read_starts[np.searchsorted(read_row_groups, row_groups)]
+        return take_rows(table, positions)
+
+    def _read_dataset_rows(self, start: int, stop: int) -> pa.Table:
+        """Rows `start` to `stop` of a dataset in order of files, only row groups containing them are read."""
+        bounds = get_row_group_bounds(self.footers)
+        first = int(np.searchsorted(bounds, start, side="right")) - 1
+        last = int(np.searchsorted(bounds, stop - 1, side="right")) - 1
+
+        # global row group numbers to files and row groups in them
+        file_starts = np.cumsum([0] + [footer.num_row_groups for footer in self.footers])
+        fragments = {fragment.path: fragment for fragment in self.dataset.get_fragments()}
+
+        tables = []
+        for row_group in range(first, last + 1):
+            table = self._row_groups_cache.get(row_group)
+            if table is None:
+                file = int(np.searchsorted(file_starts, row_group, side="right")) - 1
+                fragment = fragments[self.parquet_source.paths[file]]
+                with PERF.span("table.read_row_groups", row_groups=1, file=fragment.path):
+                    # dataset schema, so partition columns are filled from partition values
+                    table = fragment.subset(row_group_ids=[row_group - int(file_starts[file])]).to_table(
+                        schema=self.dataset.schema,
+                        use_threads=self._reader_options.use_threads
+                    )
+                table = self._row_groups_cache.put(row_group, table, table.nbytes)
+            tables.append(table)
+
+        table = pa.concat_tables(tables) if tables else self.arrow_schema.empty_table()
+        return table.slice(start - int(bounds[first]), stop - start)
+
     @property
     def lazy_table(self) -> pa.Table:
-        if self._table is None:
-            self._table = pq.read_table(self.parquet_file)
-        return self._table
+        with self._table_lock:
+            if self._table is None:
+                PERF.count("cache.table.miss")
+                start = time.perf_counter()
+                self._table = self._read_table()
+                self.read_time = time.perf_counter() - start
+            else:
+                PERF.count("cache.table.hit")
+            return self._table
+
+    @property
+    def reader_options(self) -> ReaderOptions:
+        return self._reader_options
+
+    @reader_options.setter
+    def reader_options(self, reader_options: ReaderOptions) -> None:
+        if reader_options != self._reader_options:
+            self._reader_options = reader_options
+            self._reset_table()
+
+    @property
+    def dictionary_columns(self) -> List[str]:
+        if self._dictionary_columns is None:
+            with PERF.span("table.detect_dictionary_columns"):
+                # for datasets the columns have to be dictionary encoded in all files
+                columns = get_dictionary_columns(self.footers[0])
+                for footer in self.footers[1:]:
+                    file_columns = set(get_dictionary_columns(footer))
+                    columns = [c for c in columns if c in file_columns]
+                self._dictionary_columns = columns
+        return self._dictionary_columns
+
+    @dictionary_columns.setter
+    def dictionary_columns(self, dictionary_columns: Optional[List[str]]) -> None:
+        if dictionary_columns is None or dictionary_columns != self._dictionary_columns:
+            self._dictionary_columns = dictionary_columns
+            self._reset_table()
+
+    def _reset_table(self) -> None:
+        with self._table_lock:
+            self._table = None
+        self._dataset = None
+        self._filter_builder = None
+        self._filtered_tables_cache.clear()
+        self._pages_cache.clear()
+        self._row_groups_cache.clear()
+        self._sort_indices_cache.clear()
+        self._found_rows_cache.clear()
+        self.reset_batches()
+
+    @property
+    def footers(self) -> List[pq.FileMetaData]:
+        if self._footers is None:
+            self._footers = read_footers(self.parquet_source.paths)
+        return self._footers
+
+    @property
+    def metadata(self) -> pq.FileMetaData:
+        # metadata of the first file for datasets
+        return self.footers[0]
+
+    @property
+    def identity(self) -> str:
+        if self._identity is None:
+            with PERF.span("table.identity", files=len(self.parquet_source.paths)):
+                self._identity = get_source_identity(self.parquet_source.paths)
+        return self._identity
+
+    def _get_disk_cached(self, key: tuple) -> Optional[pa.ChunkedArray]:
+        if not self._disk_cache.enabled:
+            return None
+        return self._disk_cache.get_array(self.parquet_source.paths, self.identity, key)
+
+    def _put_disk_cached(self, key: tuple, array: Any) -> None:
+        if self._disk_cache.enabled:
+            self._disk_cache.put_array(self.parquet_source.paths, self.identity, key, array)
+
+    def get_value_index(self, column: str) -> Optional[ValueIndex]:
+        index = self._value_indexes.get(column)
+        if index is None and VALUE_INDEXES.enabled:
+            table = VALUE_INDEXES.get(self.parquet_source.paths, self.identity, ("value_index", column))
+            if table is not None:
+                index = self._value_indexes[column] = ValueIndex.from_table(column, table)
+        return index
+
+    def build_value_index(self, column: str) -> ValueIndex:
+        """Index of a column, it is saved with the file identity and used by filters on the column."""
+        if column not in self.column_names:
+            raise ValueError(f"Unknown column '{column}'")
+
+        index = ValueIndex.build(self.lazy_table, column)
+        self._value_indexes[column] = index
+        VALUE_INDEXES.put(self.parquet_source.paths, self.identity, ("value_index", column), index.to_table())
+        return index
+
+    @property
+    def indexed_columns(self) -> List[str]:
+        if not VALUE_INDEXES.enabled:
+            return list(self._value_indexes)
+        return [
+            column for column in self.column_names
+            if column in self._value_indexes or VALUE_INDEXES.contains(
+                self.parquet_source.paths, self.identity, ("value_index", column)
+            )
+        ]
+
+    def _get_filter_indexes(self, filters_tree: Any) -> Dict[str, ValueIndex]:
+        indexes = {}
+        for column in get_filter_columns(filters_tree, self.arrow_schema):
+            index = self.get_value_index(column)
+            if index is not None and index.num_rows == self.num_rows:
+                indexes[column] = index
+        return indexes
+
+    def _get_filter_statistics(self, filters_tree: Any) -> Dict[str, ColumnStatistics]:
+        columns = get_filter_columns(filters_tree)
+        missing = [column for column in columns if column not in self._column_statistics]
+        if missing:
+            self._column_statistics.update(get_column_statistics(self.footers, missing))
+        return {column: self._column_statistics[column] for column in columns if column in self._column_statistics}
+
+    def has_value_indexes(self, filters: str) -> bool:
+        filters = filters.strip()
+        return bool(filters) and bool(self._get_filter_indexes(get_filter_parser().parse(filters)))
+
+    @property
+    def dataset(self) -> ds.Dataset:
+        if self._dataset is None:
+            with PERF.span("dataset.open", files=len(self.parquet_source.paths)):
+                self._dataset = open_dataset(
+                    self.parquet_source, self.footers, self._reader_options, self.dictionary_columns
+                )
+        return self._dataset
+
+    @property
+    def arrow_schema(self) -> pa.Schema:
+        # known without reading the data
+        if self._table is not None:
+            return self._table.schema
+        if self.is_dataset:
+            return self.dataset.schema
+        return with_dictionary_columns(self.metadata.schema.to_arrow_schema(), self.dictionary_columns)
+
+    @property
+    def partition_columns(self) -> List[str]:
+        if not self.is_dataset:
+            return []
+        return get_partition_columns(self.dataset, self.footers)
 
     @property
     def lazy_filtered_table(self) -> pa.Table:
         if self._filtered_table is None:
-            if not self._pyarrow_filters:
+            if not self._filters:
                 self._filtered_table = self.lazy_table
             else:
-                self._filtered_table = self.lazy_table.filter(self._pyarrow_filters)
+                self._filtered_table = self._filtered_tables_cache.get(self._filters)
+                if self._filtered_table is None:
+                    # evicted from cache
+                    self._filtered_table = self._apply_filters(self._filters)
         return self._filtered_table
 
     @property
@@ -45,22 +432,75 @@ class ParquetTable:
     def filters(self) -> str:
         return self._filters
 
+    def _apply_filters(self, filters: str) -> pa.Table:
+        with PERF.span("filter.parse", filters=filters):
+            filters_tree = get_filter_parser().parse(filters)
+
+        # row ids of indexes refer to the whole table
+        value_indexes = self._get_filter_indexes(filters_tree)
+
+        if self._table is None and value_indexes and not self.is_dataset:
+            # point lookups in a large file read only row groups with matching rows
+            with PERF.span("filter.evaluate_indexes", filters=filters):
+                selection = select_with_indexes(filters_tree, value_indexes)
+            if selection is not None:
+                filtered_table = self._read_rows(selection.row_ids)
+                return self._filtered_tables_cache.put(filters, filtered_table, filtered_table.nbytes)
+
+        table = None
+        pushdown = None
+        if self._table is None and not value_indexes:
+            # nothing is read yet, so partitions and row groups that cannot match are skipped
+            pushdown = build_pushdown_expression(filters_tree, self.arrow_schema)
+            if pushdown is not None:
+                table = self._read_table(pushdown)
+                filter_builder = PyArrowFilterBuilder(table)
+
+        if table is None:
+            table = self.lazy_table
+            filter_builder = self.filter_builder
+            filter_builder.value_indexes = value_indexes
+        filter_builder.statistics = self._get_filter_statistics(filters_tree)
+
+        # a mask or row ids of the table read with the pushdown filter
+        selection_key = ("filter_selection", filters, str(pushdown))
+        selection = self._get_disk_cached(selection_key)
+        if selection is None:
+            with PERF.span("filter.evaluate", filters=filters):
+                selection = filter_builder.transform(filters_tree)
+            if isinstance(selection, RowSelection):
+                selection = selection.to_array()
+            self._put_disk_cached(selection_key, selection)
+
+        with PERF.span("filter.apply"):
+            if pa.types.is_integer(selection.type):
+                filtered_table = take_rows(table, selection.to_numpy())
+            else:
+                filtered_table = table.filter(selection)
+
+        return self._filtered_tables_cache.put(filters, filtered_table, filtered_table.nbytes)
+
     @filters.setter
     def filters(self, filters: str) -> None:
         filters = filters.strip()
-        if not filters:
-            self._pyarrow_filters = None
-        else:
-            filters_tree = filter_parser.parse(filters)
-            self._pyarrow_filters = self.filter_builder.transform(filters_tree)
+        filtered_table = None
+        if filters:
+            filtered_table = self._filtered_tables_cache.get(filters)
+            if filtered_table is None:
+                filtered_table = self._apply_filters(filters)
 
         self.reset_batches()
+        self._filtered_table = filtered_table
         self._filters = filters
 
     @property
     def lazy_batches(self) -> list:
         if self._batches is None:
-            self._batches = self.lazy_filtered_table.to_batches(self._batch_size)
+            PERF.count("cache.batches.miss")
+            with PERF.span("table.to_batches", batch_size=self._batch_size):
+                self._batches = self.lazy_filtered_table.to_batches(self._batch_size)
+        else:
+            PERF.count("cache.batches.hit")
         return self._batches
 
     def reset_batches(self) -> None:
@@ -76,52 +516,431 @@ class ParquetTable:
         self._batch_size = batch_size
         self._batches = None
 
+    @property
+    def _has_uniform_pages(self) -> bool:
+        # pages of a sorted table are taken by indices, pages of an unfiltered dataset are read from its row groups,
+        # so all of them have the same size
+        return bool(self._sort_keys) or self._pages_from_row_groups
+
+    @property
+    def _pages_from_row_groups(self) -> bool:
+        return self.is_dataset and not self._filters and not self._sort_keys
+
     @property
     def num_batches(self) -> int:
+        if self._has_uniform_pages:
+            return math.ceil(self.num_filtered_rows / self._batch_size)
         return len(self.lazy_batches)
 
+    @property
+    def sort_keys(self) -> SortKeys:
+        return self._sort_keys
+
+    @sort_keys.setter
+    def sort_keys(self, sort_keys: SortKeys) -> None:
+        self._sort_keys = [(column, order) for column, order in sort_keys]
+
+    def snapshot(self, read: bool = True) -> TableSnapshot:
+        """Current filters and sort keys with the filtered table, left out if it is not read yet and `read` is False."""
+        if read:
+            table = self.lazy_filtered_table
+        else:
+            table = self._filtered_table if self._filters else self._table
+        return TableSnapshot(self._filters, tuple(self._sort_keys), table)
+
+    def _get_sort_indices(self, num_rows: int, snapshot: Optional[TableSnapshot] = None) -> pa.Array:
+        """Indices of the filtered table in sort order, at least `num_rows` first of them."""
+        snapshot = snapshot or self.snapshot()
+        key = (snapshot.filters, snapshot.sort_keys)
+        indices = self._sort_indices_cache.get(key)
+        if indices is not None:
+            return indices
+
+        disk_key = ("sort_indices",) + key
+        indices = self._get_disk_cached(disk_key)
+        if indices is not None:
+            # a single chunk stays memory mapped
+            indices = indices.chunk(0) if indices.num_chunks == 1 else indices.combine_chunks()
+            return self._sort_indices_cache.put(key, indices, indices.nbytes)
+
+        table = snapshot.table
+        if num_rows <= TOP_K_ROWS < table.num_rows:
+            key += ("top_k",)
+            indices = self._sort_indices_cache.get(key)
+            if indices is not None:
+                return indices
+
+        sort_table, sort_keys = get_sort_table(table, list(snapshot.sort_keys))
+        if num_rows <= TOP_K_ROWS < table.num_rows:
+            # rows with equal keys are in the order of the table as with the stable full sort,
+            # so pages do not change when the full permutation replaces the first rows
+            sort_table = sort_table.append_column("row_index", pa.array(np.arange(table.num_rows)))
+            sort_keys = sort_keys + [("row_index", "ascending")]
+            with PERF.span("table.select_k", k=TOP_K_ROWS, sort_keys=snapshot.sort_keys):
+                indices = pc.select_k_unstable(sort_table, TOP_K_ROWS, sort_keys)
+        else:
+            with PERF.span("table.sort_indices", sort_keys=snapshot.sort_keys):
+                indices = pc.sort_indices(sort_table, sort_keys=sort_keys)
+            self._put_disk_cached(disk_key, indices)
+
+        return self._sort_indices_cache.put(key, indices, indices.nbytes)
+
+    @property
+    def sort_indices(self) -> Optional[pa.Array]:
+        """Permutation of the filtered table in sort order, None if the table is not sorted."""
+        if not self._sort_keys:
+            return None
+        return self._get_sort_indices(self.num_filtered_rows)
+
+    def get_row_indices(self, batch: int, rows: List[int]) -> List[int]:
+        """Indices in the filtered table of rows on a page."""
+        positions = [self.get_batch_first_row_number(batch) + row for row in rows]
+        if not self._sort_keys or not positions:
+            return positions
+
+        indices = self._get_sort_indices(max(positions) + 1)
+        return [indices[position].as_py() for position in positions]
+
+    def take_sorted(self, start: int, stop: int) -> pa.Table:
+        indices = self._get_sort_indices(stop)
+        return self.lazy_filtered_table.take(indices[start:stop])
+
     @property
     def num_columns(self) -> int:
-        return self.lazy_table.num_columns
+        return len(self.arrow_schema)
 
     @property
     def column_names(self) -> list:
-        return self.lazy_table.column_names
+        return self.arrow_schema.names
 
     @property
     def num_rows(self) -> int:
-        return self.lazy_table.num_rows
+        # summed from footers, the data is not read
+        return sum(footer.num_rows for footer in self.footers)
 
     @property
     def num_filtered_rows(self) -> int:
+        if not self._filters:
+            return self.num_rows
         return self.lazy_filtered_table.num_rows
 
     @property
     def schema(self) -> str:
-        return self.lazy_table.schema.to_string()
+        return self.arrow_schema.to_string()
 
     def get_data(self, batch: int) -> list:
         if batch < 0 or batch >= self.num_batches:
             return []
 
-        return self.lazy_batches[batch].to_pylist()
+        key = (self._filters, tuple(self._sort_keys), self._batch_size, batch)
+        data = self._pages_cache.get(key)
+        if data is None:
+            with PERF.span("table.get_data", batch=batch):
+                # long strings and lists are cut in arrow, full values are read by `get_value`
+                table = truncate_table(self.get_page(batch))
+                data = [row for record_batch in table.to_batches() for row in batch_to_pylist(record_batch)]
+                data = self._pages_cache.put(key, data, estimate_py_nbytes(table))
+        return data
+
+    def get_page(self, batch: int) -> pa.Table:
+        """Rows of a page in arrow format."""
+        if self._sort_keys:
+            start = batch * self._batch_size
+            return self.take_sorted(start, start + self._batch_size)
+        if self._pages_from_row_groups:
+            start = batch * self._batch_size
+            stop = min(start + self._batch_size, self.num_rows)
+            if self._table is not None:
+                return self._table.slice(start, stop - start)
+            return self._read_dataset_rows(start, stop)
+        return pa.Table.from_batches([self.lazy_batches[batch]])
+
+    def get_value(self, batch: int, row: int, column: str) -> pa.Scalar:
+        """Full value of a cell of a page, nested values are converted to python objects only when needed."""
+        if self._sort_keys:
+            position = batch * self._batch_size + row
+            return self.take_sorted(position, position + 1)[column][0]
+        if self._pages_from_row_groups:
+            return self.get_page(batch)[column][row]
+        return self.lazy_batches[batch].column(column)[row]
 
     def get_batch_first_row_number(self, batch: int) -> int:
         if batch <= 0 or batch >= self.num_batches:
             return 0
 
+        if self._has_uniform_pages:
+            return batch * self._batch_size
+
         return sum(self.lazy_batches[b].num_rows for b in range(0, batch))
 
+    def get_position_location(self, position: int) -> Tuple[int, int]:
+        """Page and position on the page of a row of the shown table, filtered and sorted."""
+        if self._has_uniform_pages:
+            return divmod(position, self._batch_size)
+
+        starts = np.cumsum([0] + [batch.num_rows for batch in self.lazy_batches])
+        batch = int(np.searchsorted(starts, position, side="right")) - 1
+        return batch, position - int(starts[batch])
+
+    def get_row_location(self, row: int) -> Tuple[int, int]:
+        """Page and position on the page of a row of the filtered table."""
+        if self._sort_keys:
+            return self.get_position_location(pc.index(self.sort_indices, row).as_py())
+        return self.get_position_location(row)
+
+    def _get_find_chunks(self, filters_tree: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """Bounds of chunks of the shown table checked one at a time, and chunks that may have matching rows."""
+        num_rows = self.num_filtered_rows
+        if not self._filters and not self._sort_keys:
+            bounds = get_row_group_bounds(self.footers)
+            if bounds[-1] == num_rows:
+                # rows are in order of files, so chunks are row groups skipped by their statistics
+                pushdown = build_pushdown_expression(filters_tree, self.arrow_schema)
+                if pushdown is None:
+                    return bounds, np.ones(len(bounds) - 1, dtype=bool)
+                return bounds, get_candidate_row_groups(self.dataset, self.parquet_source.paths, pushdown)
+
+        bounds = get_batch_bounds(num_rows)
+        return bounds, np.ones(len(bounds) - 1, dtype=bool)
+
+    def _find_in_chunk(self, filters_tree: Any, start: int, stop: int) -> np.ndarray:
+        table = self.lazy_filtered_table.select(get_filter_columns(filters_tree, self.arrow_schema))
+        if self._sort_keys:
+            table = table.take(self.sort_indices[start:stop])
+        else:
+            table = table.slice(start, stop - start)
+        return find_in_table(table, filters_tree, start, self._get_filter_statistics(filters_tree))
+
+    def find_match(self, filters: str, position: int, backward: bool = False) -> Optional[int]:
+        """
+        Position in the shown table of the first row after `position` (before it if `backward`) matching filters.
+        Rows are checked chunk by chunk from `position`, so the cost depends on the distance to the match.
+        Matches of checked chunks are cached.
+        """
+        filters = filters.strip()
+        filters_tree = get_filter_parser().parse(filters)
+
+        key = (self._filters, tuple(self._sort_keys), filters)
+        chunks = self._found_rows_cache.get(key + ("chunks",))
+        if chunks is None:
+            chunks = self._get_find_chunks(filters_tree)
+            self._found_rows_cache.put(key + ("chunks",), chunks, chunks[0].nbytes + chunks[1].nbytes)
+        bounds, candidates = chunks
+
+        num_chunks = len(bounds) - 1
+        chunk = min(max(int(np.searchsorted(bounds, position, side="right")) - 1, 0), num_chunks - 1)
+        step = -1 if backward else 1
+
+        with PERF.span("find.match", filters=filters, backward=backward):
+            while 0 <= chunk < num_chunks:
+                if not candidates[chunk]:
+                    PERF.count("find.skipped_chunks")
+                    chunk += step
+                    continue
+
+                matches = self._found_rows_cache.get(key + (chunk,))
+                if matches is None:
+                    matches = self._find_in_chunk(filters_tree, int(bounds[chunk]), int(bounds[chunk + 1]))
+                    self._found_rows_cache.put(key + (chunk,), matches, matches.nbytes)
+
+                if backward:
+                    found = matches[matches < position]
+                    if len(found):
+                        return int(found[-1])
+                else:
+                    found = matches[matches > position]
+                    if len(found):
+                        return int(found[0])
+                chunk += step
+        return None
+
+    def search(
+            self,
+            text: str,
+            include_numbers: bool = False,
+            cancelled: Optional[threading.Event] = None
+    ) -> Iterator[Tuple[List[SearchHit], int]]:
+        """Hits of `text` in string columns of the filtered table, rows are found with `get_row_location`."""
+        return iter_search_hits(self.lazy_filtered_table, text, include_numbers=include_numbers, cancelled=cancelled)
+
+    def aggregate(
+            self,
+            group_keys: List[str],
+            aggregations: List[Aggregation],
+            progress_cb: Optional[ProgressCallback] = None,
+            snapshot: Optional[TableSnapshot] = None
+    ) -> Optional[pa.Table]:
+        """
+        Aggregates of groups of rows of the filtered table of `snapshot`, the current one if None,
+        sorted by group keys. None if aborted.
+        """
+        check_aggregation(self.arrow_schema, group_keys, aggregations)
+        columns = get_aggregation_columns(group_keys, aggregations)
+        snapshot = snapshot or self.snapshot(read=False)
+
+        with PERF.span("table.aggregate", keys=len(group_keys), aggregations=len(aggregations)):
+            if snapshot.table is not None:
+                table = snapshot.table.select(columns)
+                batches = table.to_batches(max_chunksize=AGGREGATE_BATCH_ROWS)
+                schema, num_rows = table.schema, table.num_rows
+            else:
+                # streamed batch by batch from files, filtered in each batch, so only partial aggregates are kept
+                batches = self.iter_batches(batch_size=AGGREGATE_BATCH_ROWS, columns=columns, filters=snapshot.filters)
+                # the number of matching rows is not known in advance, progress is counted against all rows
+                schema, num_rows = pa.schema([self.arrow_schema.field(c) for c in columns]), self.num_rows
+            return aggregate_batches(batches, schema, group_keys, aggregations, num_rows, progress_cb)
+
+    def copy_rows(
+            self,
+            positions: Optional[np.ndarray],
+            columns: List[str],
+            copy_format: CopyFormat = CopyFormat.TSV,
+            progress_cb: Optional[ProgressCallback] = None,
+            snapshot: Optional[TableSnapshot] = None
+    ) -> Optional[CopyResult]:
+        """
+        Columns of rows at `positions` of the shown table, filtered and sorted as in `snapshot`, the current one
+        if None, in clipboard formats; all rows if `positions` is None. None if aborted.
+        """
+        snapshot = snapshot or self.snapshot()
+        table = snapshot.table.select(columns)
+        num_rows = table.num_rows if positions is None else len(positions)
+
+        with PERF.span("table.copy_rows", rows=num_rows, columns=len(columns)):
+            if positions is not None and not len(positions):
+                table, indices = table.slice(0, 0), None
+            elif snapshot.sort_keys:
+                # positions are in ascending order
+                num_sorted = snapshot.table.num_rows if positions is None else int(positions[-1]) + 1
+                indices = self._get_sort_indices(num_sorted, snapshot)
+                if positions is not None:
+                    indices = indices.take(pa.array(positions))
+            elif positions is None:
+                indices = None
+            elif positions[-1] - positions[0] + 1 == len(positions):
+                # a range of rows is sliced without copying
+                table, indices = table.slice(int(positions[0]), len(positions)), None
+            else:
+                indices = pa.array(positions)
+            return copy_table(table, indices, copy_format, progress_cb)
+
+    @property
+    def footer_profile(self) -> List[FooterColumnProfile]:
+        # statistics of row groups, the data is not read
+        return get_footer_profile(self.footers)
+
+    @property
+    def column_profiles(self) -> Dict[str, ColumnProfile]:
+        # computed so far, in the order of columns
+        profiles = self._column_profiles
+        return {column: profiles[column] for column in self.column_names if column in profiles}
+
+    def get_column_profiles(
+            self,
+            columns: Optional[List[str]] = None,
+            progress_cb: Optional[ProgressCallback] = None
+    ) -> Dict[str, ColumnProfile]:
+        """Profiles of top level columns of the whole table, computed once; columns of an aborted run are left out."""
+        columns = self.column_names if columns is None else columns
+        missing = [column for column in columns if column not in self._column_profiles]
+        if missing:
+            with PERF.span("table.profile", columns=len(missing)):
+                self._column_profiles.update(compute_column_profiles(self.lazy_table, missing, progress_cb))
+        return {column: self._column_profiles[column] for column in columns if column in self._column_profiles}
+
+    def iter_batches(
+            self,
+            batch_size: Optional[int] = None,
+            columns: Optional[List[str]] = None,
+            filters: str = ""
+    ) -> Iterator[pa.RecordBatch]:
+        filters = filters.strip()
+        filters_tree = get_filter_parser().parse(filters) if filters else None
+
+        read_columns = None
+        if columns is not None and filters_tree is not None:
+            read_columns = list(columns)
+            read_columns += [c for c in get_filter_columns(filters_tree, self.arrow_schema) if c not in read_columns]
+        elif columns is not None:
+            read_columns = list(columns)
+
+        pushdown = build_pushdown_expression(filters_tree, self.arrow_schema) if filters_tree is not None else None
+        if self.is_dataset:
+            # streamed fragment by fragment, partitions not matching filters are skipped
+            batches = self.dataset.to_batches(
+                columns=read_columns,
+                filter=pushdown,
+                batch_size=batch_size or self._batch_size,
+                use_threads=self._reader_options.use_threads
+            )
+        else:
+            row_groups = None
+            if pushdown is not None:
+                # row groups whose statistics exclude matches are not read
+                candidates = get_candidate_row_groups(self.dataset, self.parquet_source.paths, pushdown)
+                row_groups = np.flatnonzero(candidates).tolist()
+                if not row_groups:
+                    return
+
+            parquet_file = pq.ParquetFile(
+                self.parquet_source.paths[0],
+                read_dictionary=self.dictionary_columns,
+                **self._reader_options.to_parquet_file_kwargs()
+            )
+            batches = parquet_file.iter_batches(
+                batch_size=batch_size or self._batch_size,
+                row_groups=row_groups,
+                columns=read_columns,
+                use_threads=self._reader_options.use_threads
+            )
+
+        statistics = self._get_filter_statistics(filters_tree) if filters_tree is not None else None
+        for batch in batches:
+            table = pa.Table.from_batches([batch])
+
+            if filters_tree is not None:
+                filter_builder = PyArrowFilterBuilder(table, statistics=statistics)
+                table = apply_selection(table, filter_builder.transform(filters_tree))
+            if columns is not None:
+                table = table.select(columns)
+
+            yield from table.to_batches()
+
+    @property
+    def footer_info(self) -> Dict[str, str]:
+        info = {
+            "File": str(self.parquet_file),
+            "File Size": f"{sum(os.path.getsize(p) for p in self.parquet_source.paths)} Bytes",
+            "Columns": str(self.num_columns),
+            "Total Rows": str(self.num_rows),
+            "Row Groups": str(sum(footer.num_row_groups for footer in self.footers)),
+            "Format Version": str(self.metadata.format_version),
+            "Created By": str(self.metadata.created_by),
+            "Dictionary Columns": ", ".join(self.dictionary_columns),
+        }
+        if self.is_dataset:
+            info["Files"] = str(len(self.parquet_source.paths))
+            info["Partition Columns"] = ", ".join(self.partition_columns)
+        return info
+
     @property
     def info(self) -> Dict[str, str]:
+        # sizes of datasets paged by row groups are not known until the whole dataset is read
+        filtered_table = self.snapshot(read=not self._pages_from_row_groups).table
         return {
             "File": str(self.parquet_file),
-            "Columns": str(self.lazy_table.num_columns),
+            "Files": str(len(self.parquet_source.paths)),
+            "Columns": str(self.num_columns),
             "Total Rows": str(self.num_rows),
-            "Total Size": f"{self.lazy_table.nbytes} Bytes",
+            "Total Size": f"{self._table.nbytes} Bytes" if self._table is not None else "",
             "Filters": str(self.filters),
             "Filtered Rows": str(self.num_filtered_rows),
-            "Filtered Size": f"{self.lazy_filtered_table.nbytes} Bytes"
+            "Filtered Size": f"{filtered_table.nbytes} Bytes" if filtered_table is not None else "",
+            "Sorted By": ", ".join(f"{column} {order}" for column, order in self._sort_keys),
+            "Dictionary Columns": ", ".join(self.dictionary_columns),
+            "Indexed Columns": ", ".join(self.indexed_columns),
+            "Reader Options": ", ".join(f"{k}={v}" for k, v in self._reader_options.to_read_table_kwargs().items()),
+            "Read Time": f"{self.read_time:.3f} s" if self.read_time is not None else "",
         }
 
     def __str__(self) -> str:
@@ -1,5 +1,5 @@
 import os
-from typing import Any, Optional
+from typing import Any, List, Optional
 
 from PyQt5 import uic
 from PyQt5.QtCore import QObject, pyqtSignal, QThread, QMutex, QMutexLocker
@@ -9,10 +9,11 @@ from parquet_viewer._logger import LOGGER
 from parquet_viewer.parquet.parquet_conversion import (
     OutputFormat,
     CsvDialect,
-    ConversionProcess,
     ProgressData,
-    ConversionStatus
+    ConversionStatus,
+    ExportCheckpoint
 )
+from parquet_viewer.parquet.parquet_conversion_pool import get_conversion_pool
 from parquet_viewer.parquet.parquet_table import ParquetTable
 
 from parquet_viewer.qt.qt_utils import qt_ask_confirmation, qt_show_error
@@ -37,33 +38,43 @@ class BackgroundExportController(QObject):
             output_format: OutputFormat,
             output_file: str,
             csv_dialect: CsvDialect,
-            apply_filters: bool
+            apply_filters: bool,
+            resume: bool = False,
+            row_indices: Optional[List[int]] = None
     ):
         super().__init__(parent=parent)
 
         self.output_format = output_format
         self.kwargs = dict(
-            table=parquet_table.lazy_filtered_table if apply_filters else parquet_table.lazy_table,
+            parquet_file=parquet_table.parquet_source.location,
+            filters=parquet_table.filters if apply_filters else "",
+            reader_options=parquet_table.reader_options,
+            dictionary_columns=parquet_table.dictionary_columns,
+            # rows are gathered in the sort order by the worker
+            sort_keys=parquet_table.sort_keys,
+            indices=row_indices,
             output_file=output_file,
             batch_size=parquet_table.batch_size,
-            csv_dialect=csv_dialect
+            csv_dialect=csv_dialect,
+            resume=resume
         )
-        self.process = ConversionProcess(self.output_format, **self.kwargs)
+        self.job = None
 
     def updateProgress(self):
-        for progress_data in self.process.get_progress(self.POLLING_TIMEOUT):
+        for progress_data in self.job.get_progress(self.POLLING_TIMEOUT):
             self.updated.emit(progress_data)
 
     def start(self) -> None:
-        with self.process:
-            while self.process.is_running():
-                self.updateProgress()
+        self.job = get_conversion_pool().submit(self.output_format, **self.kwargs)
+        while self.job.is_running():
+            self.updateProgress()
 
         self.updateProgress()
         self.finished.emit()
 
     def abort(self) -> None:
-        self.process.abort()
+        if self.job is not None:
+            self.job.abort()
 
 
 class ParquetExportDialog(QDialog):
@@ -72,13 +83,21 @@ class ParquetExportDialog(QDialog):
     OUTPUT_FORMATS = list(OutputFormat)
     CSV_DIALECTS = list(CsvDialect)
 
-    def __init__(self, parent: Any, parquet_table: ParquetTable, output_format: Optional[OutputFormat] = None) -> None:
+    def __init__(
+            self,
+            parent: Any,
+            parquet_table: ParquetTable,
+            output_format: Optional[OutputFormat] = None,
+            row_indices: Optional[List[int]] = None
+    ) -> None:
         super().__init__(parent=parent)
         uic.loadUi(self.UI_FILE, self)
 
         self.mutex = QMutex()
 
         self.parquet_table = parquet_table
+        # selected rows of the filtered table, None to export all rows
+        self.row_indices = row_indices
         self.export_controller: Optional[BackgroundExportController] = None
         self.export_thread: Optional[QThread] = None
 
@@ -96,7 +115,13 @@ class ParquetExportDialog(QDialog):
             self.formatComboBox.setCurrentIndex(self.OUTPUT_FORMATS.index(output_format))
 
         self.inputLocationEdit.setText(self.parquet_table.parquet_file)
-        self.outputLocationEdit.setText(self.parquet_table.parquet_file)
+        self.outputLocationEdit.setText(self.parquet_table.parquet_source.output_base_path)
+
+        if self.row_indices is not None:
+            # indices refer to rows of the filtered table
+            self.setWindowTitle(f"Export {len(self.row_indices)} Selected Rows")
+            self.applyFilterBox.setChecked(True)
+            self.applyFilterBox.setEnabled(False)
 
     def setupSignals(self) -> None:
         self.formatComboBox.currentIndexChanged.connect(self.formatChanged)
@@ -138,7 +163,10 @@ class ParquetExportDialog(QDialog):
         with QMutexLocker(self.mutex):
 
             output_location = self.getCurrentOutputLocation()
-            if os.path.exists(
+            resume = ExportCheckpoint.exists(output_location) and qt_ask_confirmation(
+                self, f"Export to\n'{output_location}'\nwas interrupted. Resume it?"
+            )
+            if not resume and os.path.exists(
                     output_location
             ) and not qt_ask_confirmation(
                 self, f"Overwrite existing file\n'{output_location}' ?"
@@ -156,7 +184,9 @@ class ParquetExportDialog(QDialog):
                     output_format=self.getCurrentFormat(),
                     output_file=output_location,
                     csv_dialect=self.getCurrentCsvDialect(),
-                    apply_filters=self.getCurrentApplyFilters()
+                    apply_filters=self.getCurrentApplyFilters(),
+                    resume=resume,
+                    row_indices=self.row_indices
                 )
 
                 self.export_thread = QThread()
@@ -1,17 +1,23 @@
-from collections import defaultdict
-from typing import Any, Optional, List
-from PyQt5.QtCore import QAbstractTableModel, Qt, QVariant, QModelIndex
+from typing import Any, Optional, List, Tuple
 
+import numpy as np
+import pyarrow as pa
+from PyQt5.QtCore import QAbstractTableModel, Qt, QVariant, QModelIndex, QItemSelection
+
+from parquet_viewer._perf import PERF
 from parquet_viewer.parquet.parquet_table import ParquetTable
-from parquet_viewer.parquet.parquet_conversion import ExtendedJSONEncoder
+from parquet_viewer.parquet.parquet_display import MAX_DISPLAY_LEN
 
 
 class ParquetTableModel(QAbstractTableModel):
-    MAX_STR_LEN = 256
+    MAX_STR_LEN = MAX_DISPLAY_LEN
 
     CONVERT_TO_STR = (bool,)
     NOT_CONVERT_TO_STR = (str, int, float)
 
+    SORT_ASCENDING = "\u25b2"
+    SORT_DESCENDING = "\u25bc"
+
     def __init__(self, parquet_table: ParquetTable) -> None:
         super().__init__()
 
@@ -19,8 +25,13 @@ class ParquetTableModel(QAbstractTableModel):
         self.column_headers = self.parquet_table.column_names
 
         self.parquet_data = []
+        self.page = 0
         self.start_row_header = 1
 
+        # formatted values of dictionary columns, each distinct value is formatted once per page
+        self.dictionary_columns = set(self.parquet_table.dictionary_columns)
+        self.formatted_values = {}
+
     def columnCount(self, index=QModelIndex()) -> int:
         return len(self.column_headers)
 
@@ -32,38 +43,84 @@ class ParquetTableModel(QAbstractTableModel):
             return QVariant()
 
         if orientation == Qt.Horizontal:
-            return QVariant(self.column_headers[section])
+            return QVariant(self.getColumnHeader(section))
 
         return QVariant(int(section + self.start_row_header))
 
+    def getColumnHeader(self, col: int) -> str:
+        column = self.column_headers[col]
+        sort_keys = self.parquet_table.sort_keys
+        for position, (sort_column, order) in enumerate(sort_keys, start=1):
+            if sort_column == column:
+                arrow = self.SORT_ASCENDING if order == "ascending" else self.SORT_DESCENDING
+                return f"{column} {arrow}{position if len(sort_keys) > 1 else ''}"
+        return column
+
+    def sortByColumn(self, col: int, append: bool = False) -> None:
+        """Each click on a column sorts it ascending, descending and then removes it from the sort keys."""
+        column = self.column_headers[col]
+        sort_keys = list(self.parquet_table.sort_keys)
+        orders = dict(sort_keys)
+
+        if column not in orders:
+            new_key = [(column, "ascending")]
+        elif orders[column] == "ascending":
+            new_key = [(column, "descending")]
+        else:
+            new_key = []
+
+        if append:
+            if column in orders:
+                position = [c for c, _ in sort_keys].index(column)
+                sort_keys[position:position + 1] = new_key
+            else:
+                sort_keys += new_key
+        else:
+            sort_keys = new_key
+
+        self.parquet_table.sort_keys = sort_keys
+        self.headerDataChanged.emit(Qt.Horizontal, 0, self.columnCount() - 1)
+
     def data(self, index: QModelIndex, role: int = ...) -> Any:
         if index.isValid():
-            if role == Qt.DisplayRole or role == Qt.EditRole:
-                return self.getCellData(
-                    index.row(),
-                    index.column(),
-                    shorten=(role == Qt.DisplayRole)
-                )
+            if role == Qt.DisplayRole:
+                PERF.count("model.data")
+                return self.getCellData(index.row(), index.column(), shorten=True)
 
     def flags(self, index) -> Any:
-        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+        # values of the page are cut, full values are shown by the value viewer
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
 
     def setPage(self, page: int) -> int:
-        self.beginResetModel()
+        with PERF.span("model.set_page", page=page):
+            self.beginResetModel()
 
-        self.parquet_data = self.parquet_table.get_data(page)
-        self.start_row_header = self.parquet_table.get_batch_first_row_number(page) + 1
+            self.parquet_data = self.parquet_table.get_data(page)
+            self.page = page
+            self.formatted_values = {}
+            self.start_row_header = self.parquet_table.get_batch_first_row_number(page) + 1
 
-        self.endResetModel()
+            self.endResetModel()
 
         return page
 
     def getCellData(self, row: int, col: int, shorten: bool) -> Optional[str]:
-        value = self.parquet_data[row].get(self.column_headers[col])
+        column = self.column_headers[col]
+        value = self.parquet_data[row].get(column)
 
         if value is None:
             return None
 
+        if column in self.dictionary_columns:
+            key = (column, value, shorten)
+            formatted_value = self.formatted_values.get(key)
+            if formatted_value is None:
+                formatted_value = self.formatted_values[key] = self.formatValue(value, shorten)
+            return formatted_value
+
+        return self.formatValue(value, shorten)
+
+    def formatValue(self, value: Any, shorten: bool) -> str:
         value = str(value)
 
         if shorten and (len(value) > self.MAX_STR_LEN):
@@ -71,24 +128,20 @@ class ParquetTableModel(QAbstractTableModel):
 
         return value
 
-    def getSelectionData(self, indices: List[QModelIndex]) -> Optional[str]:
-        if not indices:
-            return None
-
-        json_encoder = ExtendedJSONEncoder(indent=2)
-
-        # if len(indices) == 1:
-        #     value = self.parquet_data[indices[0].row()].get(self.column_headers[indices[0].column()])
-        #     return json_encoder.encode(value)
-
-        data = defaultdict(dict)
-        for index in sorted(indices, key=lambda i: (i.row(), i.column())):
-            row = index.row()
-            col = index.column()
-
-            row_name = self.start_row_header + row
-            col_name = self.column_headers[col]
-
-            data[row_name][col_name] = self.parquet_data[row].get(col_name)
-
-        return json_encoder.encode(data)
+    def getCellValue(self, row: int, col: int) -> pa.Scalar:
+        """Full value of a cell, values of the page may be cut."""
+        return self.parquet_table.get_value(self.page, row, self.column_headers[col])
+
+    def getSelectionRows(self, selection: QItemSelection) -> Tuple[np.ndarray, List[str]]:
+        """
+        Positions in the shown table of selected rows and names of selected columns,
+        found from selected ranges, not from each selected cell.
+        """
+        rows, cols = [], set()
+        for selection_range in selection:
+            rows.append(np.arange(selection_range.top(), selection_range.bottom() + 1))
+            cols.update(range(selection_range.left(), selection_range.right() + 1))
+
+        positions = np.unique(np.concatenate(rows)) if rows else np.array([], dtype=np.int64)
+        PERF.count("model.copied_cells", len(positions) * len(cols))
+        return positions + (self.start_row_header - 1), [self.column_headers[col] for col in sorted(cols)]
@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from PyQt5.QtWidgets import QMessageBox
 
@@ -46,6 +46,16 @@ def create_html_table(data: Dict, border: int = 0, cell_spacing: int = 1, width:
     return table
 
 
+def create_html_grid(header: List[str], rows: List[List[Any]], border: int = 1, cell_spacing: int = 4) -> str:
+    table = f"<table border='{border}' cellspacing='{cell_spacing}' width='100%'>\n"
+    table += "<tr>" + "".join(f"<th>{h}</th>" for h in header) + "</tr>\n"
+    for row in rows:
+        table += "<tr>" + "".join(f"<td>{val}</td>" for val in row) + "</tr>\n"
+
+    table += "</table>\n"
+    return table
+
+
 def get_about_table() -> str:
     from parquet_viewer._version import (
         APP_NAME,
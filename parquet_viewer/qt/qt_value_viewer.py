@@ -0,0 +1,143 @@
+from typing import Any, Callable, Optional, Tuple
+
+import pyarrow as pa
+from PyQt5 import uic
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QDialog, QTreeWidgetItem
+
+from parquet_viewer._perf import PERF
+from parquet_viewer.parquet.parquet_conversion import ExtendedJSONEncoder
+from parquet_viewer.parquet.parquet_display import MAX_DISPLAY_LEN, truncate_array
+from parquet_viewer.qt.ui import PARQUET_VALUE_UI
+
+# (number of children, function returning the key and the value of a child)
+Children = Tuple[int, Callable[[int], Tuple[str, pa.Scalar]]]
+
+# children of a nested value added at once, the rest are added by activating the last item
+CHILDREN_PAGE = 1000
+# nested values are shown as json in the text box up to this size in arrow format
+MAX_TEXT_BYTES = 1024 * 1024
+
+VALUE_ROLE = Qt.UserRole
+# children added to the item
+LOADED_ROLE = Qt.UserRole + 1
+
+
+def _unwrap(value: pa.Scalar) -> pa.Scalar:
+    if isinstance(value, pa.DictionaryScalar):
+        return value.value if value.is_valid else pa.scalar(None, type=value.type.value_type)
+    return value
+
+
+def get_children(value: pa.Scalar) -> Optional[Children]:
+    """Elements of lists, fields of structs and entries of maps, None for other and null values."""
+    value = _unwrap(value)
+    if not value.is_valid:
+        return None
+
+    # maps are lists of key-value structs
+    if isinstance(value, pa.MapScalar):
+        keys, items = value.values.field(0), value.values.field(1)
+        return len(keys), lambda i: (format_display_value(keys[i]), items[i])
+    if isinstance(value, (pa.ListScalar, pa.LargeListScalar, pa.FixedSizeListScalar)):
+        values = value.values
+        return len(values), lambda i: (f"[{i}]", values[i])
+    if isinstance(value, pa.StructScalar):
+        names = [field.name for field in value.type]
+        return len(names), lambda i: (names[i], value[i])
+    return None
+
+
+def format_display_value(value: pa.Scalar, max_len: int = MAX_DISPLAY_LEN) -> str:
+    """Short text of a value, long strings and binaries are cut in arrow before they are converted."""
+    value = _unwrap(value)
+    if not value.is_valid:
+        return "null"
+
+    children = get_children(value)
+    if children is not None:
+        kind = "fields" if isinstance(value, pa.StructScalar) else "items"
+        return f"{children[0]} {kind}"
+
+    text = str(truncate_array(pa.repeat(value, 1), max_len)[0].as_py())
+    if len(text) > max_len:
+        text = text[:max_len - 3] + "..."
+    return text
+
+
+def format_full_value(value: pa.Scalar) -> str:
+    value = _unwrap(value)
+    if not value.is_valid:
+        return "null"
+    if get_children(value) is None:
+        return str(value.as_py())
+
+    array = pa.repeat(value, 1)
+    if array.nbytes > MAX_TEXT_BYTES:
+        return f"The value takes {array.nbytes} bytes, expand it to see its elements"
+    return ExtendedJSONEncoder(indent=2).encode(value.as_py())
+
+
+class ParquetValueDialog(QDialog):
+    """Full value of a cell, nested values are expanded level by level."""
+    UI_FILE = PARQUET_VALUE_UI
+
+    def __init__(self, parent: Any, title: str, value: pa.Scalar) -> None:
+        super().__init__(parent=parent)
+        uic.loadUi(self.UI_FILE, self)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setWindowTitle(title)
+
+        self.valueTree.itemExpanded.connect(self.loadChildren)
+        self.valueTree.itemActivated.connect(self.loadMoreChildren)
+        self.valueTree.currentItemChanged.connect(self.showItemValue)
+        self.buttonBox.rejected.connect(self.close)
+
+        root = self.createItem(title, value)
+        self.valueTree.addTopLevelItem(root)
+        self.valueTree.setCurrentItem(root)
+        root.setExpanded(True)
+
+    def createItem(self, key: str, value: pa.Scalar) -> QTreeWidgetItem:
+        item = QTreeWidgetItem([key, format_display_value(value), str(value.type)])
+        item.setData(0, VALUE_ROLE, value)
+        item.setData(0, LOADED_ROLE, 0)
+        if get_children(value) is not None:
+            # children are added when the item is expanded
+            item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+        return item
+
+    def loadChildren(self, item: QTreeWidgetItem) -> None:
+        value = item.data(0, VALUE_ROLE)
+        if value is None or item.data(0, LOADED_ROLE) or get_children(value) is None:
+            return
+        self.addChildren(item)
+
+    def addChildren(self, item: QTreeWidgetItem) -> None:
+        num_children, get_child = get_children(item.data(0, VALUE_ROLE))
+        start = item.data(0, LOADED_ROLE)
+        end = min(num_children, start + CHILDREN_PAGE)
+
+        with PERF.span("value_viewer.add_children", children=end - start):
+            item.addChildren([self.createItem(*get_child(i)) for i in range(start, end)])
+            item.setData(0, LOADED_ROLE, end)
+
+            if end < num_children:
+                # the item without a value adds the next children of its parent
+                more = QTreeWidgetItem([f"{num_children - end} more...", "", ""])
+                more.setToolTip(0, "Double click to show more")
+                item.addChild(more)
+
+    def loadMoreChildren(self, item: QTreeWidgetItem) -> None:
+        parent = item.parent()
+        if item.data(0, VALUE_ROLE) is not None or parent is None:
+            return
+        parent.removeChild(item)
+        self.addChildren(parent)
+
+    def showItemValue(self, item: Optional[QTreeWidgetItem]) -> None:
+        self.valueEdit.clear()
+        value = item.data(0, VALUE_ROLE) if item is not None else None
+        if value is not None:
+            with PERF.span("value_viewer.format"):
+                self.valueEdit.setPlainText(format_full_value(value))
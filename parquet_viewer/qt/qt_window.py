@@ -1,42 +1,273 @@
 import functools
+import html
+import os
 import sys
-from typing import Optional, List, Any
-
-import lark
-import pyarrow as pa
+import threading
+import time
+from typing import Optional, List, Any, Union, TYPE_CHECKING
 
 from PyQt5 import uic
-from PyQt5.QtCore import QEvent
+from PyQt5.QtCore import Qt, QByteArray, QEvent, QMimeData, QObject, QThread, QTimer, pyqtSignal
 from PyQt5.QtGui import QKeySequence
 
-from PyQt5.QtWidgets import QMainWindow, QApplication, QFileDialog, QShortcut, QHeaderView
+from PyQt5.QtWidgets import (
+    QMainWindow, QApplication, QFileDialog, QShortcut, QHeaderView, QInputDialog, QActionGroup, QListWidgetItem,
+    QProgressBar, QPushButton
+)
 
-from parquet_viewer.parquet.parquet_conversion import OutputFormat
-from parquet_viewer.parquet.parquet_table import ParquetTable
-from parquet_viewer._logger import log_error
-from parquet_viewer.qt.qt_utils import qt_show_error, qt_show_about, create_html_table
-from parquet_viewer.qt.qt_export import ParquetExportDialog
-from parquet_viewer.qt.qt_table_model import ParquetTableModel
+from parquet_viewer._config import get_config_value, set_config_value, load_config
+from parquet_viewer._logger import LOGGER, log_error
+from parquet_viewer._perf import PERF
+from parquet_viewer.qt.qt_utils import qt_show_error, qt_show_about, create_html_table, create_html_grid
 from parquet_viewer.qt.ui import PARQUET_VIEWER_UI
 
+# pyarrow, lark and the dialogs are imported lazily to show the main window as soon as possible
+if TYPE_CHECKING:
+    from parquet_viewer.parquet.parquet_table import ParquetTable
+    from parquet_viewer.qt.qt_table_model import ParquetTableModel
+
+STARTUP_BENCHMARK_ENV = "PARQUET_VIEWER_STARTUP_BENCHMARK"
+
+MB = 1024 * 1024
+
+BACKGROUND_IMPORTS = (
+    "pyarrow",
+    "pyarrow.compute",
+    "pyarrow.parquet",
+    "parquet_viewer.parquet.parquet_table",
+    "parquet_viewer.qt.qt_table_model",
+    "parquet_viewer.qt.qt_export",
+)
+
+
+def preload_modules() -> None:
+    import importlib
+
+    start = time.perf_counter()
+    try:
+        for module in BACKGROUND_IMPORTS:
+            importlib.import_module(module)
+
+        from parquet_viewer.parquet.parquet_filters import get_filter_parser
+        get_filter_parser()
+    except Exception as e:
+        log_error(e)
+
+    LOGGER.debug("Modules preloaded in %.3f s", time.perf_counter() - start)
+
+
+class BackgroundIndexController(QObject):
+    # column, error message
+    finished = pyqtSignal(str, str)
+
+    def __init__(self, parquet_table: "ParquetTable", column: str) -> None:
+        super().__init__(parent=None)
+        self.parquet_table = parquet_table
+        self.column = column
+
+    def start(self) -> None:
+        error = ""
+        try:
+            self.parquet_table.build_value_index(self.column)
+        except Exception as e:
+            log_error(e)
+            error = str(e)
+        self.finished.emit(self.column, error)
+
+
+class BackgroundSearchController(QObject):
+    # hits, rows searched so far
+    hitsFound = pyqtSignal(list, int)
+    # error message
+    finished = pyqtSignal(str)
+
+    def __init__(self, parquet_table: "ParquetTable", text: str, include_numbers: bool) -> None:
+        super().__init__(parent=None)
+        self.text = text
+        self.cancelled = threading.Event()
+        # the filtered table is taken on the GUI thread, filters applied during the search do not change it
+        self.hits = parquet_table.search(text, include_numbers=include_numbers, cancelled=self.cancelled)
+
+    def start(self) -> None:
+        error = ""
+        try:
+            for hits, num_searched_rows in self.hits:
+                self.hitsFound.emit(hits, num_searched_rows)
+        except Exception as e:
+            log_error(e)
+            error = str(e)
+        self.finished.emit(error)
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+
+class BackgroundProfileController(QObject):
+    # column chunks in total, column chunks profiled
+    progress = pyqtSignal(int, int)
+    # error message
+    finished = pyqtSignal(str)
+
+    def __init__(self, parquet_table: "ParquetTable") -> None:
+        super().__init__(parent=None)
+        self.parquet_table = parquet_table
+        self.cancelled = threading.Event()
+
+    def start(self) -> None:
+        error = ""
+        try:
+            self.parquet_table.get_column_profiles(progress_cb=self.reportProgress)
+        except Exception as e:
+            log_error(e)
+            error = str(e)
+        self.finished.emit(error)
+
+    def reportProgress(self, num_chunks: int, chunk: int) -> bool:
+        self.progress.emit(num_chunks, chunk)
+        return self.cancelled.is_set()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+
+class BackgroundAggregateController(QObject):
+    # rows in total, rows aggregated
+    progress = pyqtSignal(int, int)
+    # file with the result, empty if cancelled; error message
+    finished = pyqtSignal(str, str)
+
+    def __init__(self, parquet_table: "ParquetTable", group_keys: List[str], aggregations: list, output_file: str):
+        super().__init__(parent=None)
+        self.parquet_table = parquet_table
+        # filters and the filtered table, if it is read, are taken on the GUI thread
+        self.snapshot = parquet_table.snapshot(read=False)
+        self.group_keys = group_keys
+        self.aggregations = aggregations
+        self.output_file = output_file
+        self.cancelled = threading.Event()
+
+    def start(self) -> None:
+        output_file, error = "", ""
+        try:
+            import pyarrow.parquet as pq
+
+            result = self.parquet_table.aggregate(
+                self.group_keys, self.aggregations, progress_cb=self.reportProgress, snapshot=self.snapshot
+            )
+            if result is not None:
+                # a file, so the result is paged, sorted and exported as any other table
+                pq.write_table(result, self.output_file)
+                output_file = self.output_file
+        except Exception as e:
+            log_error(e)
+            error = str(e)
+        self.finished.emit(output_file, error)
+
+    def reportProgress(self, num_rows: int, row: int) -> bool:
+        self.progress.emit(num_rows, row)
+        return self.cancelled.is_set()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+
+class BackgroundCopyController(QObject):
+    # rows in total, rows copied
+    progress = pyqtSignal(int, int)
+    # CopyResult, None if cancelled; error message
+    finished = pyqtSignal(object, str)
+
+    def __init__(self, parquet_table: "ParquetTable", positions: Any, columns: List[str], copy_format: str) -> None:
+        super().__init__(parent=None)
+        self.parquet_table = parquet_table
+        # positions refer to the filtered and sorted table shown when the copy starts
+        self.snapshot = parquet_table.snapshot()
+        self.positions = positions
+        self.columns = columns
+        self.copy_format = copy_format
+        self.cancelled = threading.Event()
+
+    def start(self) -> None:
+        result, error = None, ""
+        try:
+            result = self.parquet_table.copy_rows(
+                self.positions, self.columns, self.copy_format, progress_cb=self.reportProgress, snapshot=self.snapshot
+            )
+        except Exception as e:
+            log_error(e)
+            error = str(e)
+        self.finished.emit(result, error)
+
+    def reportProgress(self, num_rows: int, row: int) -> bool:
+        self.progress.emit(num_rows, row)
+        return self.cancelled.is_set()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+
+def format_profile_value(value: Any, max_len: int = 100) -> str:
+    text = "" if value is None else str(value)
+    if len(text) > max_len:
+        text = text[:max_len - 3] + "..."
+    return html.escape(text)
+
+
+def create_histogram_grid(header: str, histogram: list, bar_width: int = 40) -> str:
+    max_count = max((count for _, _, count in histogram), default=0) or 1
+    rows = [
+        [format_profile_value(low), format_profile_value(high), count, "&#9608;" * round(count / max_count * bar_width)]
+        for low, high, count in histogram
+    ]
+    return create_html_grid([header, "To", "Count", ""], rows)
+
 
 class ParquetViewerGUI(QMainWindow):
     UI_FILE = PARQUET_VIEWER_UI
     PAGE_SIZES = [20, 40, 80]
 
     PARQUET_EXTENSION = ".parquet"
+    MAX_HIT_TEXT_LEN = 200
+    # larger copies run in background
+    MAX_FOREGROUND_COPY_CELLS = 100_000
+
+    firstPainted = pyqtSignal()
 
     def __init__(self):
         super().__init__()
         uic.loadUi(self.UI_FILE, self)
 
-        self.parquet_table: Optional[ParquetTable] = None
-        self.parquet_model: Optional[ParquetTableModel] = None
+        self.parquet_table: Optional["ParquetTable"] = None
+        self.parquet_model: Optional["ParquetTableModel"] = None
+        self.painted = False
+
+        self.index_controller: Optional[BackgroundIndexController] = None
+        self.index_thread: Optional[QThread] = None
+
+        self.search_controller: Optional[BackgroundSearchController] = None
+        # cancelled searches are kept until their threads stop
+        self.search_controllers: List[BackgroundSearchController] = []
+
+        self.profile_controller: Optional[BackgroundProfileController] = None
+        # cancelled profiles are kept until their threads stop
+        self.profile_controllers: List[BackgroundProfileController] = []
+
+        self.group_by_controller: Optional[BackgroundAggregateController] = None
+        # windows of aggregation results
+        self.result_windows: List["ParquetViewerGUI"] = []
+
+        self.copy_controller: Optional[BackgroundCopyController] = None
 
         self.setupPageBox()
         self.setupSignals()
         self.setupShortCuts()
         self.setupExport()
+        self.setupPerformance()
+        self.setupReaderProfiles()
+        self.setupSearch()
+        self.setupProfile()
+        self.setupGroupBy()
+        self.setupCopy()
 
         self.setAcceptDrops(True)
 
@@ -44,20 +275,50 @@ class ParquetViewerGUI(QMainWindow):
     def setupShortCuts(self):
         filters_shortcut = QShortcut(QKeySequence("Ctrl+F"), self)
         filters_shortcut.activated.connect(self.filtersEdit.setFocus)
+        search_shortcut = QShortcut(QKeySequence("Ctrl+Shift+F"), self)
+        search_shortcut.activated.connect(self.focusSearch)
+        find_next_shortcut = QShortcut(QKeySequence("F3"), self)
+        find_next_shortcut.activated.connect(self.findNext)
+        find_previous_shortcut = QShortcut(QKeySequence("Shift+F3"), self)
+        find_previous_shortcut.activated.connect(self.findPrevious)
 
     def setupSignals(self) -> None:
         self.actionOpen.triggered.connect(self.openFile)
+        self.actionOpenDirectory.triggered.connect(self.openDirectory)
         self.actionQuit.triggered.connect(self.close)
         self.actionAbout.triggered.connect(self.showAbout)
+        self.actionMemoryBudget.triggered.connect(self.changeMemoryBudget)
+        self.actionDiskCache.triggered.connect(self.changeDiskCache)
+        self.actionClearDiskCache.triggered.connect(self.clearDiskCache)
+        self.actionDictionaryColumns.triggered.connect(self.changeDictionaryColumns)
+        self.tabWidget.currentChanged.connect(self.updateInfo)
 
         self.filtersApplyButton.clicked.connect(self.applyFilters)
         self.filtersEdit.returnPressed.connect(self.applyFilters)
 
+        self.findNextButton.clicked.connect(self.findNext)
+        self.findPreviousButton.clicked.connect(self.findPrevious)
+        self.findEdit.returnPressed.connect(self.findNext)
+
         # allow copying cells
         self.tableView.installEventFilter(self)
+        # click sorts by a column, with Shift adds the column to sort keys
+        self.tableView.horizontalHeader().sectionClicked.connect(self.sortByColumn)
+        # cells show cut values, double click shows the full value
+        self.tableView.doubleClicked.connect(self.showCellValue)
         # table context menu
+        self.tableView.addAction(self.actionShowValue)
+        self.actionShowValue.triggered.connect(self.showCellValue)
         self.tableView.addAction(self.actionCopyCell)
         self.actionCopyCell.triggered.connect(self.copySelection)
+        self.tableView.addAction(self.actionCopyJSON)
+        self.actionCopyJSON.triggered.connect(self.copySelectionAsJSON)
+        self.tableView.addAction(self.actionCopyColumns)
+        self.actionCopyColumns.triggered.connect(self.copyColumns)
+        self.tableView.addAction(self.actionExportSelection)
+        self.actionExportSelection.triggered.connect(self.exportSelection)
+        self.tableView.addAction(self.actionBuildIndex)
+        self.actionBuildIndex.triggered.connect(self.buildIndex)
 
     def setupPageBox(self) -> None:
         self.pageSizeBox.addItems(str(s) for s in self.PAGE_SIZES)
@@ -69,18 +330,31 @@ class ParquetViewerGUI(QMainWindow):
     # Update Window
     def updateTabs(self) -> None:
         if self.parquet_table is not None:
+            # hits refer to rows of the previous filtered table
+            self.resetSearch()
             self.schemaEdit.clear()
             self.schemaEdit.appendPlainText(self.parquet_table.schema)
 
-            self.infoEdit.clear()
-            self.infoEdit.setHtml(create_html_table(self.parquet_table.info, border=1, cell_spacing=4))
-
+            self.updateInfo()
+            self.updateProfile()
+            self.updateGroupBy()
             self.updatePagesBox()
 
             # fix issue with horizontal headers width
             self.tableView.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
             # self.tableView.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
+    def updateInfo(self) -> None:
+        if self.parquet_table is not None and self.tabWidget.currentWidget() == self.tab_info:
+            from parquet_viewer.parquet.parquet_cache import MEMORY_BUDGET
+            from parquet_viewer.parquet.parquet_disk_cache import DISK_CACHE
+
+            self.infoEdit.clear()
+            self.infoEdit.setHtml(
+                create_html_table(self.parquet_table.info, border=1, cell_spacing=4) + "<br/>" +
+                create_html_table({**MEMORY_BUDGET.info, **DISK_CACHE.info}, border=1, cell_spacing=4)
+            )
+
     def updatePagesBox(self) -> None:
         if self.parquet_table is not None:
             self.totalPages.setText(str(max(1, self.parquet_table.num_batches)))
@@ -103,14 +377,45 @@ class ParquetViewerGUI(QMainWindow):
         page = self.pageBox.value()
         self.parquet_model.setPage(page - 1)
 
+    def showCell(self, page: int, row: int, column: int) -> None:
+        self.tabWidget.setCurrentWidget(self.tab_data)
+        # pages are loaded through the page box, as if the page was chosen by the user
+        self.pageBox.setValue(page + 1)
+
+        index = self.parquet_model.index(row, column)
+        self.tableView.setCurrentIndex(index)
+        self.tableView.scrollTo(index)
+
     def openFile(self) -> None:
-        file_path = QFileDialog.getOpenFileName(self, "Open file", "", f"Parquet files (*{self.PARQUET_EXTENSION})")[0]
-        if file_path:
-            self.loadData(file_path)
+        file_paths = QFileDialog.getOpenFileNames(
+            self, "Open files", "", f"Parquet files (*{self.PARQUET_EXTENSION})"
+        )[0]
+        if file_paths:
+            self.loadData(file_paths[0] if len(file_paths) == 1 else file_paths)
 
-    def loadData(self, parquet_file: str) -> None:
+    def openDirectory(self) -> None:
+        directory = QFileDialog.getExistingDirectory(self, "Open directory")
+        if directory:
+            self.loadData(directory)
+
+    def loadData(self, parquet_file: Union[str, List[str]]) -> None:
+        import pyarrow as pa
+        from parquet_viewer.parquet.parquet_cache import MEMORY_BUDGET
+        from parquet_viewer.parquet.parquet_disk_cache import DISK_CACHE, VALUE_INDEXES
+        from parquet_viewer.parquet.parquet_table import ParquetTable
+        from parquet_viewer.qt.qt_table_model import ParquetTableModel
+
+        location = parquet_file if isinstance(parquet_file, str) else "\n".join(parquet_file)
         try:
-            self.parquet_table = ParquetTable(parquet_file, self.getPageSize())
+            from parquet_viewer.parquet.parquet_reader_options import get_configured_reader_options
+
+            MEMORY_BUDGET.set_budget(get_config_value("memory_budget_mb") * MB)
+            DISK_CACHE.set_max_bytes(get_config_value("disk_cache_mb") * MB)
+            VALUE_INDEXES.set_max_bytes(get_config_value("value_indexes_mb") * MB)
+            parquet_table = ParquetTable(parquet_file, self.getPageSize(), get_configured_reader_options())
+            # profiles of the previous table are not needed anymore
+            self.resetProfile()
+            self.parquet_table = parquet_table
             self.parquet_model = ParquetTableModel(self.parquet_table)
             self.tableView.setModel(self.parquet_model)
 
@@ -120,16 +425,18 @@ class ParquetViewerGUI(QMainWindow):
 
         except FileNotFoundError as e:
             log_error(e)
-            qt_show_error(self, f"File not found: \n{parquet_file}")
+            qt_show_error(self, f"File not found: \n{location}")
         except pa.lib.ArrowInvalid as e:
             log_error(e)
-            qt_show_error(self, f"Not a valid parquet file: \n{parquet_file}")
+            qt_show_error(self, f"Not a valid parquet file: \n{location}", e)
         except Exception as e:
             log_error(e)
-            qt_show_error(self, f"Cannot load file \n{parquet_file}\n", e)
+            qt_show_error(self, f"Cannot load file \n{location}\n", e)
 
     # Filters
     def applyFilters(self) -> None:
+        import lark
+
         filters = self.filtersEdit.text().strip()
         try:
             self.parquet_table.filters = filters
@@ -141,37 +448,612 @@ class ParquetViewerGUI(QMainWindow):
             log_error(e)
             qt_show_error(self, "Unexpected Error", detail=e)
 
+    # Search
+    def setupSearch(self) -> None:
+        self.searchButton.clicked.connect(self.startSearch)
+        self.searchEdit.returnPressed.connect(self.startSearch)
+        self.searchResultsList.itemActivated.connect(self.showSearchHit)
+
+    def focusSearch(self) -> None:
+        self.tabWidget.setCurrentWidget(self.tab_search)
+        self.searchEdit.setFocus()
+        self.searchEdit.selectAll()
+
+    def startSearch(self) -> None:
+        self.resetSearch()
+        text = self.searchEdit.text()
+        if self.parquet_table is None or not text:
+            return
+
+        # the filtered table is already read, its string columns are searched in background
+        self.search_controller = BackgroundSearchController(
+            self.parquet_table, text, self.searchNumbersBox.isChecked()
+        )
+        self.search_controllers.append(self.search_controller)
+        search_thread = QThread(self)
+        self.search_controller.moveToThread(search_thread)
+
+        search_thread.started.connect(self.search_controller.start)
+        search_thread.finished.connect(search_thread.deleteLater)
+        self.search_controller.hitsFound.connect(self.addSearchHits)
+        self.search_controller.finished.connect(search_thread.quit)
+        self.search_controller.finished.connect(self.searchFinished)
+
+        self.searchStatusLabel.setText("Searching...")
+        search_thread.start()
+
+    def resetSearch(self) -> None:
+        if self.search_controller is not None:
+            self.search_controller.cancel()
+            self.search_controller = None
+        self.searchResultsList.clear()
+        self.searchStatusLabel.clear()
+
+    def addSearchHits(self, hits: list, num_searched_rows: int) -> None:
+        if self.sender() is not self.search_controller:
+            return
+
+        for hit in hits:
+            value = str(hit.value)
+            if len(value) > self.MAX_HIT_TEXT_LEN:
+                value = value[:self.MAX_HIT_TEXT_LEN - 3] + "..."
+            item = QListWidgetItem(f"Row {hit.row + 1}, {hit.column}: {value}")
+            item.setData(Qt.UserRole, (hit.row, hit.column))
+            self.searchResultsList.addItem(item)
+
+        self.searchStatusLabel.setText(
+            f"Searching... {self.searchResultsList.count()} hits in {num_searched_rows} "
+            f"of {self.parquet_table.num_filtered_rows} rows"
+        )
+
+    def searchFinished(self, error: str) -> None:
+        controller = self.sender()
+        self.search_controllers.remove(controller)
+        controller.deleteLater()
+        if controller is not self.search_controller:
+            return
+
+        self.search_controller = None
+        if error:
+            self.searchStatusLabel.clear()
+            qt_show_error(self, "Search failed", error)
+            return
+
+        from parquet_viewer.parquet.parquet_search import MAX_SEARCH_HITS
+
+        num_hits = self.searchResultsList.count()
+        self.searchStatusLabel.setText(
+            f"First {num_hits} hits" if num_hits >= MAX_SEARCH_HITS else f"{num_hits} hits"
+        )
+
+    def showSearchHit(self, item: QListWidgetItem) -> None:
+        if self.parquet_table is None:
+            return
+
+        row, column = item.data(Qt.UserRole)
+        page, position = self.parquet_table.get_row_location(row)
+        self.showCell(page, position, self.parquet_model.column_headers.index(column))
+
+    # Profile
+    def setupProfile(self) -> None:
+        self.profileComputeButton.clicked.connect(self.computeProfile)
+        self.profileCancelButton.clicked.connect(self.resetProfile)
+        self.tabWidget.currentChanged.connect(self.updateProfile)
+        self.profileProgressBar.setVisible(False)
+
+    def updateProfile(self) -> None:
+        if self.parquet_table is None or self.tabWidget.currentWidget() != self.tab_profile:
+            return
+
+        footer_rows = []
+        for column in self.parquet_table.footer_profile:
+            statistics = column.statistics
+            footer_rows.append([
+                html.escape(column.column),
+                column.logical_type if column.logical_type != "NONE" else column.physical_type,
+                "" if statistics is None or statistics.null_count is None else statistics.null_count,
+                format_profile_value(statistics.min if statistics is not None else None),
+                format_profile_value(statistics.max if statistics is not None else None),
+                column.compressed_size,
+                column.uncompressed_size,
+            ])
+        # statistics of row groups, the data is not read
+        html_text = "<h4>Footer Statistics</h4>" + create_html_grid(
+            ["Column", "Type", "Nulls", "Min", "Max", "Compressed, Bytes", "Uncompressed, Bytes"], footer_rows
+        )
+
+        profiles = self.parquet_table.column_profiles
+        if not profiles:
+            html_text += "<p>Press <i>Compute Details</i> to read all rows and count distinct values, " \
+                         "top values and histograms. Filters are not applied.</p>"
+        else:
+            html_text += "<h4>Data Profile</h4>" + create_html_grid(
+                ["Column", "Rows", "Nulls", "Distinct", "Min", "Max"],
+                [
+                    [
+                        html.escape(profile.column), profile.num_rows, profile.null_count,
+                        "" if profile.distinct_count is None else profile.distinct_count,
+                        format_profile_value(profile.min), format_profile_value(profile.max)
+                    ]
+                    for profile in profiles.values()
+                ]
+            )
+
+        for profile in profiles.values():
+            if not (profile.top_values or profile.histogram or profile.length_histogram):
+                continue
+
+            html_text += f"<h4>{html.escape(profile.column)}</h4>"
+            if profile.top_values:
+                html_text += create_html_grid(
+                    ["Top Value", "Count"],
+                    [[format_profile_value(value), count] for value, count in profile.top_values]
+                ) + "<br/>"
+            if profile.histogram:
+                html_text += create_histogram_grid("Value From", profile.histogram) + "<br/>"
+            if profile.length_histogram:
+                html_text += create_histogram_grid("Length From", profile.length_histogram) + "<br/>"
+
+        self.profileEdit.clear()
+        self.profileEdit.setHtml(html_text)
+
+    def computeProfile(self) -> None:
+        if self.parquet_table is None or self.profile_controller is not None:
+            return
+
+        # chunks of all columns are counted in parallel in background, profiles are kept by the table
+        self.profile_controller = BackgroundProfileController(self.parquet_table)
+        self.profile_controllers.append(self.profile_controller)
+        profile_thread = QThread(self)
+        self.profile_controller.moveToThread(profile_thread)
+
+        profile_thread.started.connect(self.profile_controller.start)
+        profile_thread.finished.connect(profile_thread.deleteLater)
+        self.profile_controller.progress.connect(self.profileProgress)
+        self.profile_controller.finished.connect(profile_thread.quit)
+        self.profile_controller.finished.connect(self.profileFinished)
+
+        self.profileComputeButton.setEnabled(False)
+        self.profileCancelButton.setEnabled(True)
+        self.profileProgressBar.setValue(0)
+        self.profileProgressBar.setVisible(True)
+        profile_thread.start()
+
+    def resetProfile(self) -> None:
+        if self.profile_controller is not None:
+            self.profile_controller.cancel()
+            self.profile_controller = None
+        self.profileComputeButton.setEnabled(True)
+        self.profileCancelButton.setEnabled(False)
+        self.profileProgressBar.setVisible(False)
+
+    def profileProgress(self, num_chunks: int, chunk: int) -> None:
+        if self.sender() is not self.profile_controller:
+            return
+
+        self.profileProgressBar.setMaximum(max(1, num_chunks))
+        self.profileProgressBar.setValue(chunk)
+
+    def profileFinished(self, error: str) -> None:
+        controller = self.sender()
+        self.profile_controllers.remove(controller)
+        controller.deleteLater()
+        if controller is not self.profile_controller:
+            # finished columns of a cancelled run are kept by its table
+            self.updateProfile()
+            return
+
+        self.resetProfile()
+        if error:
+            qt_show_error(self, "Cannot compute column profiles", error)
+        self.updateProfile()
+
+    # Group by
+    def setupGroupBy(self) -> None:
+        self.groupKeysAddButton.clicked.connect(self.addGroupKey)
+        self.aggregationsAddButton.clicked.connect(self.addAggregation)
+        self.groupByButton.clicked.connect(self.runGroupBy)
+        self.groupByCancelButton.clicked.connect(self.cancelGroupBy)
+        self.groupByProgressBar.setVisible(False)
+
+    def updateGroupBy(self) -> None:
+        from parquet_viewer.parquet.parquet_aggregate import AGGREGATE_FUNCTIONS, COUNT_ROWS
+
+        if not self.aggregationsFunctionBox.count():
+            self.aggregationsFunctionBox.addItems(AGGREGATE_FUNCTIONS)
+        self.groupKeysColumnBox.clear()
+        self.groupKeysColumnBox.addItems(self.parquet_table.column_names)
+        self.aggregationsColumnBox.clear()
+        self.aggregationsColumnBox.addItems([COUNT_ROWS] + self.parquet_table.column_names)
+
+    @staticmethod
+    def appendToEdit(edit: Any, text: str) -> None:
+        current = edit.text().strip().rstrip(",")
+        edit.setText(f"{current}, {text}" if current else text)
+
+    def addGroupKey(self) -> None:
+        if self.groupKeysColumnBox.currentText():
+            self.appendToEdit(self.groupKeysEdit, self.groupKeysColumnBox.currentText())
+
+    def addAggregation(self) -> None:
+        from parquet_viewer.parquet.parquet_aggregate import Aggregation
+
+        function, column = self.aggregationsFunctionBox.currentText(), self.aggregationsColumnBox.currentText()
+        if column:
+            self.appendToEdit(self.aggregationsEdit, str(Aggregation(function, column)))
+
+    def runGroupBy(self) -> None:
+        if self.parquet_table is None or self.group_by_controller is not None:
+            return
+
+        import re
+        from parquet_viewer._paths import get_temp_dir
+        from parquet_viewer.parquet.parquet_aggregate import check_aggregation, parse_aggregations
+
+        group_keys = [key.strip() for key in self.groupKeysEdit.text().split(",") if key.strip()]
+        try:
+            aggregations = parse_aggregations(self.aggregationsEdit.text())
+            check_aggregation(self.parquet_table.arrow_schema, group_keys, aggregations)
+        except ValueError as e:
+            qt_show_error(self, e)
+            return
+
+        file_name = re.sub(r"\W+", "_", "_".join(group_keys))
+        output_file = os.path.join(get_temp_dir(), f"group_by_{file_name}_{len(self.result_windows) + 1}.parquet")
+
+        # the filtered table is aggregated in background, the result is written to a temporary file
+        self.group_by_controller = BackgroundAggregateController(
+            self.parquet_table, group_keys, aggregations, output_file
+        )
+        group_by_thread = QThread(self)
+        self.group_by_controller.moveToThread(group_by_thread)
+
+        group_by_thread.started.connect(self.group_by_controller.start)
+        group_by_thread.finished.connect(group_by_thread.deleteLater)
+        self.group_by_controller.progress.connect(self.groupByProgress)
+        self.group_by_controller.finished.connect(group_by_thread.quit)
+        self.group_by_controller.finished.connect(self.groupByFinished)
+
+        self.groupByButton.setEnabled(False)
+        self.groupByCancelButton.setEnabled(True)
+        self.groupByProgressBar.setValue(0)
+        self.groupByProgressBar.setVisible(True)
+        self.groupByStatusLabel.setText("Aggregating...")
+        group_by_thread.start()
+
+    def cancelGroupBy(self) -> None:
+        if self.group_by_controller is not None:
+            self.group_by_controller.cancel()
+
+    def groupByProgress(self, num_rows: int, row: int) -> None:
+        # progress in thousands of rows, QProgressBar is limited to int32
+        self.groupByProgressBar.setMaximum(max(1, num_rows // 1000))
+        self.groupByProgressBar.setValue(row // 1000)
+
+    def groupByFinished(self, output_file: str, error: str) -> None:
+        controller = self.group_by_controller
+        self.group_by_controller = None
+        controller.deleteLater()
+
+        self.groupByButton.setEnabled(True)
+        self.groupByCancelButton.setEnabled(False)
+        self.groupByProgressBar.setVisible(False)
+        self.groupByStatusLabel.clear()
+
+        if error:
+            qt_show_error(self, "Cannot aggregate rows", error)
+        elif not output_file:
+            self.groupByStatusLabel.setText("Cancelled")
+        else:
+            description = ", ".join(str(aggregation) for aggregation in controller.aggregations)
+            window = ParquetViewerGUI()
+            window.setWindowTitle(f"{self.windowTitle()} - {description} by {', '.join(controller.group_keys)}")
+            self.result_windows.append(window)
+            window.show()
+            window.loadData(output_file)
+
+    # Find
+    def findNext(self) -> None:
+        self.findMatch(backward=False)
+
+    def findPrevious(self) -> None:
+        self.findMatch(backward=True)
+
+    def findMatch(self, backward: bool) -> None:
+        import lark
+
+        filters = self.findEdit.text().strip()
+        if self.parquet_table is None or not filters:
+            return
+
+        # search starts from the current cell, or before the first row of the page
+        first_row = self.parquet_table.get_batch_first_row_number(self.pageBox.value() - 1)
+        index = self.tableView.currentIndex()
+        if index.isValid():
+            position = first_row + index.row()
+        else:
+            position = first_row if backward else first_row - 1
+
+        try:
+            position = self.parquet_table.find_match(filters, position, backward=backward)
+        except (lark.exceptions.UnexpectedInput, lark.exceptions.VisitError) as e:
+            log_error(e)
+            qt_show_error(self, e)
+            return
+        except Exception as e:
+            log_error(e)
+            qt_show_error(self, "Unexpected Error", detail=e)
+            return
+
+        if position is None:
+            self.statusbar.showMessage("No more matches", 5000)
+            return
+
+        page, row = self.parquet_table.get_position_location(position)
+        self.showCell(page, row, index.column() if index.isValid() else 0)
+
+    # Sorting
+    def sortByColumn(self, col: int) -> None:
+        if self.parquet_model is None:
+            return
+
+        append = bool(QApplication.keyboardModifiers() & Qt.ShiftModifier)
+        sort_keys = self.parquet_table.sort_keys
+        try:
+            self.parquet_model.sortByColumn(col, append)
+            # sort errors are raised before the model is reset
+            self.parquet_table.get_data(0)
+            self.updatePagesBox()
+            self.updateInfo()
+        except Exception as e:
+            log_error(e)
+            self.parquet_table.sort_keys = sort_keys
+            self.updatePagesBox()
+            qt_show_error(self, f"Cannot sort by column '{self.parquet_model.column_headers[col]}'", e)
+
+    # Value indexes
+    def buildIndex(self) -> None:
+        if self.parquet_model is None or self.index_controller is not None:
+            return
+
+        index = self.tableView.currentIndex()
+        if not index.isValid():
+            return
+
+        column = self.parquet_model.column_headers[index.column()]
+        self.statusbar.showMessage(f"Building index on '{column}'...")
+
+        # the table is already read, the index is sorted in background
+        self.index_controller = BackgroundIndexController(self.parquet_table, column)
+        self.index_thread = QThread()
+        self.index_controller.moveToThread(self.index_thread)
+
+        self.index_thread.started.connect(self.index_controller.start)
+        self.index_thread.finished.connect(self.index_thread.deleteLater)
+        self.index_controller.finished.connect(self.index_thread.quit)
+        self.index_controller.finished.connect(self.indexBuilt)
+
+        self.index_thread.start()
+
+    def indexBuilt(self, column: str, error: str) -> None:
+        self.index_controller.deleteLater()
+        self.index_controller = None
+
+        if error:
+            self.statusbar.clearMessage()
+            qt_show_error(self, f"Cannot build index on '{column}'", error)
+        else:
+            self.statusbar.showMessage(f"Index on '{column}' is built", 5000)
+            self.updateInfo()
+
+    # Cell values
+    def showCellValue(self) -> None:
+        if self.parquet_model is None:
+            return
+
+        index = self.tableView.currentIndex()
+        if not index.isValid():
+            return
+
+        try:
+            from parquet_viewer.qt.qt_value_viewer import ParquetValueDialog
+
+            column = self.parquet_model.column_headers[index.column()]
+            value = self.parquet_model.getCellValue(index.row(), index.column())
+            title = f"{column}, row {self.parquet_model.start_row_header + index.row()}"
+            ParquetValueDialog(self, title, value).show()
+        except Exception as e:
+            log_error(e)
+            qt_show_error(self, "Unexpected error", e)
+
     # Copy data
     def eventFilter(self, source, event) -> bool:
-        if (source == self.tableView) and (event.type() == QEvent.KeyPress) and event.matches(QKeySequence.Copy):
+        if (source == self.tableView.viewport()) and (event.type() == QEvent.Paint):
+            PERF.count("view.repaint")
+        elif (source == self.tableView) and (event.type() == QEvent.KeyPress) and event.matches(QKeySequence.Copy):
             self.copySelection()
             return True
         return super().eventFilter(source, event)
 
+    def setupCopy(self) -> None:
+        self.copyProgressBar = QProgressBar(self.statusbar)
+        self.copyProgressBar.setMaximumWidth(200)
+        self.copyProgressBar.setVisible(False)
+        self.copyCancelButton = QPushButton("Cancel Copy", self.statusbar)
+        self.copyCancelButton.setVisible(False)
+        self.copyCancelButton.clicked.connect(self.cancelCopy)
+
+        self.statusbar.addPermanentWidget(self.copyProgressBar)
+        self.statusbar.addPermanentWidget(self.copyCancelButton)
+
     def copySelection(self) -> None:
-        selection = self.tableView.selectedIndexes()
-        selected_data = self.parquet_model.getSelectionData(selection)
-        QApplication.clipboard().setText(selected_data)
+        self.copyData("tsv")
+
+    def copySelectionAsJSON(self) -> None:
+        self.copyData("json")
+
+    def copyColumns(self) -> None:
+        # all rows of the filtered table, not only of the page
+        self.copyData("tsv", entire_columns=True)
+
+    def copyData(self, copy_format: str, entire_columns: bool = False) -> None:
+        if self.parquet_model is None:
+            return
+        if self.copy_controller is not None:
+            self.statusbar.showMessage("Previous copy is still running", 5000)
+            return
+
+        from parquet_viewer.parquet.parquet_copy import CopyFormat
+
+        copy_format = CopyFormat(copy_format)
+        positions, columns = self.parquet_model.getSelectionRows(self.tableView.selectionModel().selection())
+        if not columns:
+            return
+        if entire_columns:
+            positions = None
+
+        num_rows = self.parquet_table.num_filtered_rows if positions is None else len(positions)
+        if num_rows * len(columns) <= self.MAX_FOREGROUND_COPY_CELLS:
+            try:
+                self.setClipboard(self.parquet_table.copy_rows(positions, columns, copy_format))
+            except Exception as e:
+                log_error(e)
+                qt_show_error(self, "Cannot copy selection", e)
+            return
+
+        # rows are gathered and formatted in background, the clipboard is set when all of them are done
+        self.copy_controller = BackgroundCopyController(self.parquet_table, positions, columns, copy_format)
+        copy_thread = QThread(self)
+        self.copy_controller.moveToThread(copy_thread)
+
+        copy_thread.started.connect(self.copy_controller.start)
+        copy_thread.finished.connect(copy_thread.deleteLater)
+        self.copy_controller.progress.connect(self.copyProgress)
+        self.copy_controller.finished.connect(copy_thread.quit)
+        self.copy_controller.finished.connect(self.copyFinished)
+
+        self.copyProgressBar.setValue(0)
+        self.copyProgressBar.setVisible(True)
+        self.copyCancelButton.setVisible(True)
+        self.statusbar.showMessage(f"Copying {num_rows} rows...")
+        copy_thread.start()
+
+    def cancelCopy(self) -> None:
+        if self.copy_controller is not None:
+            self.copy_controller.cancel()
+
+    def copyProgress(self, num_rows: int, row: int) -> None:
+        # progress in thousands of rows, QProgressBar is limited to int32
+        self.copyProgressBar.setMaximum(max(1, num_rows // 1000))
+        self.copyProgressBar.setValue(row // 1000)
+
+    def copyFinished(self, result: Any, error: str) -> None:
+        controller = self.copy_controller
+        self.copy_controller = None
+        controller.deleteLater()
+
+        self.copyProgressBar.setVisible(False)
+        self.copyCancelButton.setVisible(False)
+        self.statusbar.clearMessage()
+
+        if error:
+            qt_show_error(self, "Cannot copy selection", error)
+        elif result is None:
+            self.statusbar.showMessage("Copy cancelled", 5000)
+        else:
+            self.setClipboard(result)
+
+    def setClipboard(self, result: Any) -> None:
+        from parquet_viewer.parquet.parquet_copy import ARROW_STREAM_MIME_TYPE
+
+        # text for other applications, arrow stream keeps types of values
+        mime_data = QMimeData()
+        mime_data.setText(result.text)
+        mime_data.setData(ARROW_STREAM_MIME_TYPE, QByteArray(result.arrow_stream))
+        QApplication.clipboard().setMimeData(mime_data)
+        self.statusbar.showMessage(f"Copied {result.num_rows} rows, {result.num_columns} columns", 5000)
 
     # Export
     def setupExport(self) -> None:
         self.menuExport.setEnabled(False)
 
-        self.actionExportJSON.triggered.connect(functools.partial(self.exportParquet, OutputFormat.JSON))
-        self.actionExportCSV.triggered.connect(functools.partial(self.exportParquet, OutputFormat.CSV))
+        self.actionExportJSON.triggered.connect(functools.partial(self.exportParquet, "json"))
+        self.actionExportCSV.triggered.connect(functools.partial(self.exportParquet, "csv"))
 
     def enableExport(self) -> None:
         self.menuExport.setEnabled(True)
 
-    def exportParquet(self, output_format: Optional[OutputFormat] = None) -> None:
+    def exportParquet(self, output_format: Optional[str] = None, row_indices: Optional[List[int]] = None) -> None:
         if self.parquet_table is not None:
             try:
-                export_dialog = ParquetExportDialog(self, output_format=output_format, parquet_table=self.parquet_table)
+                from parquet_viewer.parquet.parquet_conversion import OutputFormat
+                from parquet_viewer.qt.qt_export import ParquetExportDialog
+
+                output_format = OutputFormat(output_format) if output_format else None
+                export_dialog = ParquetExportDialog(
+                    self, output_format=output_format, parquet_table=self.parquet_table, row_indices=row_indices
+                )
                 export_dialog.show()
             except Exception as e:
                 log_error(e)
                 qt_show_error(self, "Unexpected error", e)
 
+    def exportSelection(self) -> None:
+        if self.parquet_table is None:
+            return
+
+        rows = sorted({index.row() for index in self.tableView.selectedIndexes()})
+        if rows:
+            row_indices = self.parquet_table.get_row_indices(self.pageBox.value() - 1, rows)
+            self.exportParquet(row_indices=row_indices)
+
+    # Performance
+    def setupPerformance(self) -> None:
+        self.perfEnabledBox.setChecked(PERF.enabled)
+        self.perfEnabledBox.toggled.connect(PERF.enable)
+
+        self.perfRefreshButton.clicked.connect(self.updatePerformance)
+        self.perfResetButton.clicked.connect(self.resetPerformance)
+        self.perfSaveButton.clicked.connect(self.savePerformanceTrace)
+        self.tabWidget.currentChanged.connect(self.updatePerformance)
+
+        self.tableView.viewport().installEventFilter(self)
+
+    def updatePerformance(self) -> None:
+        if self.tabWidget.currentWidget() != self.tab_performance:
+            return
+
+        counters = PERF.counters
+        repaints = counters.get("view.repaint", 0)
+        if repaints:
+            counters["model.data per repaint"] = round(counters.get("model.data", 0) / repaints, 1)
+
+        timers = [
+            [name, t["count"], f"{t['total_ms']:.2f}", f"{t['mean_ms']:.3f}", f"{t['max_ms']:.3f}"]
+            for name, t in PERF.timers.items()
+        ]
+
+        html = "" if PERF.enabled else "<p>Recording is disabled. " \
+                                       "Start the application with <code>--trace</code> or check the box above.</p>"
+        html += "<h4>Timings</h4>" + create_html_grid(["Span", "Count", "Total, ms", "Mean, ms", "Max, ms"], timers)
+        html += "<h4>Counters</h4>" + create_html_table(counters, border=1, cell_spacing=4)
+
+        self.perfEdit.clear()
+        self.perfEdit.setHtml(html)
+
+    def resetPerformance(self) -> None:
+        PERF.reset()
+        self.updatePerformance()
+
+    def savePerformanceTrace(self) -> None:
+        file_path = QFileDialog.getSaveFileName(self, "Save trace", "trace.json", "Chrome trace files (*.json)")[0]
+        if file_path:
+            try:
+                PERF.save_chrome_trace(file_path)
+            except Exception as e:
+                log_error(e)
+                qt_show_error(self, f"Cannot save trace \n{file_path}\n", e)
+
     # Drag and Drop
     def getFilesFromDropEvent(self, event: Any) -> List[str]:
         return [str(url.toLocalFile()) for url in event.mimeData().urls()]
@@ -179,7 +1061,8 @@ class ParquetViewerGUI(QMainWindow):
     def dragEnterEvent(self, event: Any) -> Any:
         if event.mimeData().hasUrls():
             paths = self.getFilesFromDropEvent(event)
-            if len(paths) == 1 and paths[0].endswith(self.PARQUET_EXTENSION):
+            # files are read as one dataset, directories with partitioned datasets are accepted as well
+            if paths and all(p.endswith(self.PARQUET_EXTENSION) or os.path.isdir(p) for p in paths):
                 return event.accept()
 
         return event.ignore()
@@ -187,9 +1070,108 @@ class ParquetViewerGUI(QMainWindow):
     def dropEvent(self, event: Any) -> None:
         paths = self.getFilesFromDropEvent(event)
         if paths:
-            self.loadData(paths[0])
+            self.loadData(paths[0] if len(paths) == 1 else paths)
 
     # Other
+    def paintEvent(self, event: Any) -> None:
+        super().paintEvent(event)
+
+        if not self.painted:
+            self.painted = True
+            self.firstPainted.emit()
+
+    def setupReaderProfiles(self) -> None:
+        from parquet_viewer.parquet.parquet_reader_options import get_reader_profiles, READER_PROFILES
+
+        config = load_config()
+        try:
+            profiles = get_reader_profiles(config["reader_profiles"])
+        except ValueError as e:
+            log_error(e)
+            profiles = READER_PROFILES
+
+        group = QActionGroup(self)
+        for profile in profiles:
+            action = self.menuReaderProfile.addAction(profile)
+            action.setCheckable(True)
+            action.setChecked(profile == config["reader_profile"])
+            action.triggered.connect(functools.partial(self.changeReaderProfile, profile))
+            group.addAction(action)
+
+    def changeReaderProfile(self, profile: str) -> None:
+        set_config_value("reader_profile", profile)
+
+        if self.parquet_table is not None:
+            try:
+                from parquet_viewer.parquet.parquet_reader_options import get_configured_reader_options
+
+                self.parquet_table.reader_options = get_configured_reader_options(profile)
+                self.updateTabs()
+            except Exception as e:
+                log_error(e)
+                qt_show_error(self, f"Cannot use reader profile '{profile}'", e)
+
+    def changeDictionaryColumns(self) -> None:
+        if self.parquet_table is None:
+            return
+
+        columns, ok = QInputDialog.getText(
+            self,
+            "Dictionary Columns",
+            "String columns read as dictionaries, each distinct value is stored and filtered once.\n"
+            "Comma separated columns (empty to detect low cardinality columns):",
+            text=", ".join(self.parquet_table.dictionary_columns)
+        )
+        if ok:
+            dictionary_columns = [c.strip() for c in columns.split(",") if c.strip()] or None
+            try:
+                self.parquet_table.dictionary_columns = dictionary_columns
+                self.parquet_model.dictionary_columns = set(self.parquet_table.dictionary_columns)
+                self.updateTabs()
+            except Exception as e:
+                log_error(e)
+                qt_show_error(self, "Cannot read dictionary columns", e)
+
+    def changeMemoryBudget(self) -> None:
+        budget_mb, ok = QInputDialog.getInt(
+            self,
+            "Memory Budget",
+            "Cached filter results and pages are evicted when memory usage exceeds the budget.\n"
+            "Memory budget, MB (0 for unlimited):",
+            get_config_value("memory_budget_mb"),
+            0,
+            2 ** 31 - 1
+        )
+        if ok:
+            from parquet_viewer.parquet.parquet_cache import MEMORY_BUDGET
+
+            set_config_value("memory_budget_mb", budget_mb)
+            MEMORY_BUDGET.set_budget(budget_mb * MB)
+            self.updateInfo()
+
+    def changeDiskCache(self) -> None:
+        size_mb, ok = QInputDialog.getInt(
+            self,
+            "Disk Cache",
+            "Filter selections and sort orders are saved on disk and reused when a file is opened again.\n"
+            "Disk cache size, MB (0 to disable):",
+            get_config_value("disk_cache_mb"),
+            0,
+            2 ** 31 - 1
+        )
+        if ok:
+            from parquet_viewer.parquet.parquet_disk_cache import DISK_CACHE
+
+            set_config_value("disk_cache_mb", size_mb)
+            DISK_CACHE.set_max_bytes(size_mb * MB)
+            self.updateInfo()
+
+    def clearDiskCache(self) -> None:
+        from parquet_viewer.parquet.parquet_disk_cache import DISK_CACHE
+
+        DISK_CACHE.clear()
+        self.updateInfo()
+
     def showAbout(self) -> None:
         qt_show_about(self)
 
@@ -197,12 +1179,33 @@ class ParquetViewerGUI(QMainWindow):
         return self.PAGE_SIZES[self.pageSizeBox.currentIndex()]
 
 
+def shutdown_conversion_pool() -> None:
+    # the pool exists only if an export has been started
+    if "parquet_viewer.parquet.parquet_conversion_pool" in sys.modules:
+        from parquet_viewer.parquet.parquet_conversion_pool import shutdown_conversion_pool
+        shutdown_conversion_pool()
+
+
+def report_first_paint(app: QApplication) -> None:
+    print("first-paint", flush=True)
+    app.quit()
+
+
 def run_app(qt_args: List[str], parquet_file: Optional[str] = None) -> None:
     app = QApplication(qt_args)
+    app.aboutToQuit.connect(shutdown_conversion_pool)
     window = ParquetViewerGUI()
-    window.show()
+
+    if os.environ.get(STARTUP_BENCHMARK_ENV):
+        window.firstPainted.connect(functools.partial(report_first_paint, app))
 
     if parquet_file:
-        window.loadData(parquet_file)
+        # load data after the window is painted
+        window.firstPainted.connect(
+            functools.partial(QTimer.singleShot, 0, functools.partial(window.loadData, parquet_file))
+        )
+
+    window.show()
+    threading.Thread(target=preload_modules, name="preload-modules", daemon=True).start()
 
     sys.exit(app.exec_())
@@ -5,3 +5,4 @@ SCRIPT_DIR = os.path.abspath(os.path.dirname(__file__))
 
 PARQUET_VIEWER_UI = os.path.join(SCRIPT_DIR, "parquet_viewer.ui")
 PARQUET_EXPORT_UI = os.path.join(SCRIPT_DIR, "parquet_export.ui")
+PARQUET_VALUE_UI = os.path.join(SCRIPT_DIR, "parquet_value.ui")
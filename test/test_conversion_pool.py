@@ -0,0 +1,153 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from parquet_viewer.parquet.parquet_conversion import (
+    ConversionStatus,
+    CsvDialect,
+    ExportCheckpoint,
+    OutputFormat,
+    convert_parquet_to_csv
+)
+from parquet_viewer.parquet.parquet_conversion_pool import ConversionWorkerPool
+from parquet_viewer.parquet.parquet_table import ParquetTable
+
+BATCH_SIZE = 100
+NUM_ROWS = 5000
+
+
+@pytest.fixture(scope="module")
+def parquet_file(tmp_path_factory) -> str:
+    rng = np.random.default_rng(0)
+    path = str(tmp_path_factory.mktemp("pool") / "table.parquet")
+    pq.write_table(
+        pa.table({"x": np.arange(NUM_ROWS), "s": rng.choice(["a", "b", "c"], NUM_ROWS)}),
+        path,
+        row_group_size=1200
+    )
+    return path
+
+
+@pytest.fixture
+def pool():
+    pool = ConversionWorkerPool(max_workers=1)
+    yield pool
+    pool.shutdown()
+
+
+def submit(pool, parquet_file, output_file, **kwargs):
+    options = dict(
+        parquet_file=parquet_file,
+        reader_options=None,
+        dictionary_columns=None,
+        filters="",
+        sort_keys=[],
+        indices=None,
+        output_file=output_file,
+        batch_size=BATCH_SIZE,
+        csv_dialect=CsvDialect.EXCEL,
+        resume=False,
+    )
+    options.update(kwargs)
+    return pool.submit(OutputFormat.CSV, **options)
+
+
+def run(job, abort_at=None) -> ConversionStatus:
+    while job.is_running():
+        for progress in job.get_progress(0.05):
+            if abort_at is not None and progress.batch >= abort_at:
+                job.abort()
+                abort_at = None
+    assert job.wait(10)
+    return job.status
+
+
+def export_in_memory(parquet_file, output_file, filters="", sort_keys=()) -> bytes:
+    parquet_table = ParquetTable(parquet_file, BATCH_SIZE)
+    parquet_table.filters = filters
+    parquet_table.sort_keys = list(sort_keys)
+    assert convert_parquet_to_csv(
+        parquet_table.lazy_filtered_table, output_file, BATCH_SIZE, CsvDialect.EXCEL, lambda *p: False,
+        indices=parquet_table.sort_indices
+    )
+    with open(output_file, "rb") as f:
+        return f.read()
+
+
+EXPORTS = [
+    ("", []),
+    ("s = 'a'", []),
+    ("s in ('b', 'c')", [("x", "descending")]),
+]
+
+
+@pytest.mark.parametrize("filters, sort_keys", EXPORTS)
+def test_export_matches_in_memory_export(tmp_path, pool, parquet_file, filters, sort_keys):
+    expected = export_in_memory(parquet_file, str(tmp_path / "expected.csv"), filters, sort_keys)
+    output_file = str(tmp_path / "output.csv")
+
+    job = submit(pool, parquet_file, output_file, filters=filters, sort_keys=sort_keys)
+    assert run(job) == ConversionStatus.DONE
+    with open(output_file, "rb") as f:
+        assert f.read() == expected
+
+
+@pytest.mark.parametrize("filters, sort_keys", EXPORTS)
+def test_aborted_export_is_resumed(tmp_path, pool, parquet_file, filters, sort_keys):
+    expected = export_in_memory(parquet_file, str(tmp_path / "expected.csv"), filters, sort_keys)
+    output_file = str(tmp_path / "output.csv")
+
+    job = submit(pool, parquet_file, output_file, filters=filters, sort_keys=sort_keys)
+    assert run(job, abort_at=3) == ConversionStatus.ABORTED
+    assert ExportCheckpoint.exists(output_file)
+
+    job = submit(pool, parquet_file, output_file, filters=filters, sort_keys=sort_keys, resume=True)
+    assert run(job) == ConversionStatus.DONE
+    with open(output_file, "rb") as f:
+        assert f.read() == expected
+
+
+def test_selected_rows_are_exported_in_order(tmp_path, pool, parquet_file):
+    output_file = str(tmp_path / "output.csv")
+    indices = [10, 3, 4999, 0]
+
+    job = submit(pool, parquet_file, output_file, indices=indices)
+    assert run(job) == ConversionStatus.DONE
+    with open(output_file, "r", encoding="utf-8") as f:
+        rows = f.read().splitlines()[1:]
+    assert [int(row.split(",")[0]) for row in rows] == indices
+
+
+def test_pending_job_is_cancelled(tmp_path, pool, parquet_file):
+    running = submit(pool, parquet_file, str(tmp_path / "first.csv"))
+    # a single worker, so the second job waits in the queue
+    pending = submit(pool, parquet_file, str(tmp_path / "second.csv"))
+    assert pool.num_pending == 1
+
+    pending.abort()
+    assert pending.wait(10)
+    assert pending.status == ConversionStatus.ABORTED
+    assert pool.num_pending == 0
+
+    assert run(running) == ConversionStatus.DONE
+
+
+def test_jobs_are_queued_for_free_workers(tmp_path, pool, parquet_file):
+    jobs = [submit(pool, parquet_file, str(tmp_path / f"output_{i}.csv")) for i in range(3)]
+
+    assert [run(job) for job in jobs] == [ConversionStatus.DONE] * 3
+    assert len(pool._workers) == 1
+
+
+def test_missing_file_fails_the_job(tmp_path, pool):
+    job = submit(pool, str(tmp_path / "missing.parquet"), str(tmp_path / "output.csv"))
+
+    assert run(job) == ConversionStatus.FAILED
+
+
+def test_shut_down_pool_rejects_jobs(tmp_path, pool, parquet_file):
+    pool.shutdown()
+
+    with pytest.raises(RuntimeError):
+        submit(pool, parquet_file, str(tmp_path / "output.csv"))
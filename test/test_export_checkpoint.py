@@ -0,0 +1,120 @@
+import json
+import os
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from parquet_viewer.parquet.parquet_conversion import (
+    CsvDialect,
+    ExportCheckpoint,
+    convert_parquet_to_csv,
+    convert_parquet_to_json
+)
+
+BATCH_SIZE = 10
+
+
+@pytest.fixture
+def table() -> pa.Table:
+    num_rows = 95
+    return pa.table({
+        "a": np.arange(num_rows),
+        "b": [f"value {i}" if i % 7 else None for i in range(num_rows)],
+        "c": [[i, i + 1] for i in range(num_rows)],
+    })
+
+
+def abort_at(batch: int):
+    def progress_cb(num_batches: int, current: int) -> bool:
+        return current >= batch
+
+    return progress_cb
+
+
+def never_abort(num_batches: int, current: int) -> bool:
+    return False
+
+
+def read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("indices", [None, pa.array(np.arange(95)[::-1])])
+def test_resumed_json_export_is_identical(tmp_path, table, indices):
+    expected_file = str(tmp_path / "expected.json")
+    output_file = str(tmp_path / "output.json")
+
+    assert convert_parquet_to_json(table, expected_file, BATCH_SIZE, never_abort, indices=indices)
+
+    assert not convert_parquet_to_json(table, output_file, BATCH_SIZE, abort_at(4), indices=indices)
+    assert ExportCheckpoint.exists(output_file)
+    # rows written after the checkpoint are truncated on resume
+    with open(output_file, "a", encoding="utf-8") as f:
+        f.write('{"a":')
+
+    progress = []
+    assert convert_parquet_to_json(table, output_file, BATCH_SIZE, lambda *p: progress.append(p), resume=True,
+                                   indices=indices)
+    assert progress[0] == (10, 4)
+    assert read_bytes(output_file) == read_bytes(expected_file)
+    assert not os.path.exists(ExportCheckpoint.get_path(output_file))
+
+
+def test_resumed_csv_export_has_one_header(tmp_path, table):
+    expected_file = str(tmp_path / "expected.csv")
+    output_file = str(tmp_path / "output.csv")
+
+    assert convert_parquet_to_csv(table, expected_file, BATCH_SIZE, CsvDialect.EXCEL, never_abort)
+    assert not convert_parquet_to_csv(table, output_file, BATCH_SIZE, CsvDialect.EXCEL, abort_at(3))
+    assert convert_parquet_to_csv(table, output_file, BATCH_SIZE, CsvDialect.EXCEL, never_abort, resume=True)
+
+    assert read_bytes(output_file) == read_bytes(expected_file)
+
+
+def test_resumed_streamed_export_is_identical(tmp_path, table):
+    expected_file = str(tmp_path / "expected.json")
+    output_file = str(tmp_path / "output.json")
+    empty_table = table.schema.empty_table()
+
+    def convert(progress_cb, resume=False) -> bool:
+        # batches of a generator are read and skipped up to the checkpoint
+        batches = (batch for batch in table.to_batches(BATCH_SIZE))
+        return convert_parquet_to_json(empty_table, output_file, BATCH_SIZE, progress_cb, resume=resume,
+                                       batches=batches, num_batches=10)
+
+    assert convert_parquet_to_json(table, expected_file, BATCH_SIZE, never_abort)
+    assert not convert(abort_at(5))
+    assert convert(never_abort, resume=True)
+
+    assert read_bytes(output_file) == read_bytes(expected_file)
+
+
+def test_checkpoint_of_another_job_is_not_resumed(tmp_path, table):
+    output_file = str(tmp_path / "output.json")
+
+    assert not convert_parquet_to_json(table, output_file, BATCH_SIZE, abort_at(2), filters="a > 0")
+    # a different filter is a different job, so the export starts over
+    assert convert_parquet_to_json(table, output_file, BATCH_SIZE, never_abort, resume=True)
+
+    with open(output_file, "r", encoding="utf-8") as f:
+        assert len(f.readlines()) == table.num_rows
+
+
+def test_checkpoint_of_truncated_file_is_not_used(tmp_path, table):
+    expected_file = str(tmp_path / "expected.json")
+    output_file = str(tmp_path / "output.json")
+
+    assert convert_parquet_to_json(table, expected_file, BATCH_SIZE, never_abort)
+    assert not convert_parquet_to_json(table, output_file, BATCH_SIZE, abort_at(2))
+    with open(ExportCheckpoint.get_path(output_file), "r", encoding="utf-8") as f:
+        checkpoint = ExportCheckpoint(**json.load(f))
+    assert checkpoint.batch == 2
+    assert ExportCheckpoint.load(output_file, checkpoint.job_signature) == checkpoint
+
+    os.truncate(output_file, checkpoint.offset - 1)
+    assert ExportCheckpoint.load(output_file, checkpoint.job_signature) is None
+
+    assert convert_parquet_to_json(table, output_file, BATCH_SIZE, never_abort, resume=True)
+    assert read_bytes(output_file) == read_bytes(expected_file)
@@ -0,0 +1,123 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from parquet_viewer.parquet.parquet_filter_planner import (
+    ColumnStatistics,
+    ConditionPlanner,
+    flatten_conditions,
+    get_column_statistics
+)
+from parquet_viewer.parquet.parquet_filters import PyArrowFilterBuilder, get_filter_parser, to_numpy_mask
+from parquet_viewer.parquet.parquet_index import ValueIndex
+
+NUM_ROWS = 2000
+
+
+@pytest.fixture(scope="module")
+def table() -> pa.Table:
+    rng = np.random.default_rng(2)
+    text = [" ".join(rng.choice(["lorem", "ipsum", "dolor", "sit", "amet"], 20)) for _ in range(NUM_ROWS)]
+    return pa.table({
+        "x": pa.array(np.arange(NUM_ROWS)),
+        "flag": pa.array(rng.random(NUM_ROWS) < 0.5),
+        "cat": pa.array(rng.choice(["a", "b", "c", "d"], NUM_ROWS)).dictionary_encode(),
+        "text": pa.array(text),
+        "payload": pa.array([{"id": int(v)} for v in rng.integers(0, 50, NUM_ROWS)]),
+        "tags": pa.array([[f"t{v}" for v in rng.integers(0, 9, 3)] for _ in range(NUM_ROWS)]),
+    })
+
+
+def plan(table: pa.Table, filters: str, op: str, **kwargs) -> list:
+    tree = get_filter_parser().parse(filters)
+    conditions = ConditionPlanner(table, **kwargs).plan(tree, op)
+    return [get_condition_columns(condition.tree) for condition in conditions]
+
+
+def get_condition_columns(tree) -> str:
+    return ",".join(column.children[-1].value for column in tree.find_data("column"))
+
+
+def test_nested_groups_of_the_same_operator_are_flattened():
+    tree = get_filter_parser().parse("a = 1 and (b = 2 and c = 3) and (d = 4 or e = 5)")
+
+    conditions = flatten_conditions(tree, "AND")
+    assert [get_condition_columns(condition) for condition in conditions] == ["a", "b", "c", "d,e"]
+
+
+def test_cheap_selective_conditions_go_first_for_and(table):
+    order = plan(table, "text ~ '%amet sit%' and any(tags) = 't1' and cat = 'a' and x < 100", "AND")
+
+    # dictionary equality and a comparison rejecting most rows are cheaper than patterns over long strings
+    assert order.index("cat") < order.index("text")
+    assert order.index("x") < order.index("text")
+    assert order[-1] in ("tags", "text")
+
+
+def test_conditions_accepting_most_rows_go_first_for_or(table):
+    statistics = {"x": ColumnStatistics(NUM_ROWS, 0, 0, NUM_ROWS - 1, None)}
+    order = plan(table, "text regex 'sit' or x >= 0 or flag = true", "OR", statistics=statistics)
+
+    # statistics show that the range covers all rows, without them it is a guess
+    assert order[0] == "x"
+    assert plan(table, "text regex 'sit' or x >= 0 or flag = true", "OR")[0] == "flag"
+
+
+def test_indexed_columns_go_first(table):
+    order = plan(table, "cat = 'a' and payload.id = 3", "AND", indexed_columns=["x"])
+    assert order[0] == "cat"
+
+    order = plan(table, "cat = 'a' and x = 3", "AND", indexed_columns=["x"])
+    assert order[0] == "x"
+
+
+def test_range_selectivity_from_statistics(table):
+    statistics = {"x": ColumnStatistics(NUM_ROWS, 0, 0, NUM_ROWS - 1, None)}
+    planner = ConditionPlanner(table, statistics)
+
+    tree = get_filter_parser().parse("x < 500")
+    assert planner.estimate_selectivity(tree) == pytest.approx(500 / (NUM_ROWS - 1))
+    tree = get_filter_parser().parse("x between 100 and 300")
+    assert planner.estimate_selectivity(tree) == pytest.approx(200 / (NUM_ROWS - 1))
+
+
+def test_statistics_are_merged_over_files(tmp_path):
+    paths = [str(tmp_path / "first.parquet"), str(tmp_path / "second.parquet")]
+    pq.write_table(pa.table({"x": [5, 1, None]}), paths[0], row_group_size=2)
+    pq.write_table(pa.table({"x": [7, 3]}), paths[1])
+
+    statistics = get_column_statistics([pq.read_metadata(path) for path in paths], ["x", "missing"])
+
+    assert list(statistics) == ["x"]
+    assert (statistics["x"].num_rows, statistics["x"].null_count) == (5, 1)
+    assert (statistics["x"].min, statistics["x"].max) == (1, 7)
+
+
+def evaluate_in_written_order(table: pa.Table, tree) -> np.ndarray:
+    """Conditions of the filters evaluated separately on all rows and combined as written."""
+    if tree.data in ("expression", "grouped_expression"):
+        return evaluate_in_written_order(table, tree.children[0])
+    if tree.data == "and_or_expression":
+        left = evaluate_in_written_order(table, tree.children[0])
+        right = evaluate_in_written_order(table, tree.children[2])
+        return left & right if tree.children[1].children[0].type == "AND" else left | right
+    return to_numpy_mask(PyArrowFilterBuilder(table).transform(tree), table.num_rows)
+
+
+@pytest.mark.parametrize("filters", [
+    "text ~ '%amet sit%' and cat = 'a' and x < 1500",
+    "cat in ('a', 'b') and payload.id between 10 and 20 and any(tags) = 't3'",
+    "flag = true or x < 10 or text regex '^sit'",
+    "(cat = 'a' or x > 1900) and len(tags) = 3 and text !~ '%lorem%'",
+    "x > 10 and (payload.id = 4 or flag = false) and cat != 'd'",
+])
+@pytest.mark.parametrize("indexed", [False, True])
+def test_planned_evaluation_matches_evaluation_in_written_order(table, filters, indexed):
+    tree = get_filter_parser().parse(filters)
+    value_indexes = {"x": ValueIndex.build(table, "x")} if indexed else None
+    statistics = {"x": ColumnStatistics(NUM_ROWS, 0, 0, NUM_ROWS - 1, None)}
+
+    selection = PyArrowFilterBuilder(table, value_indexes=value_indexes, statistics=statistics).transform(tree)
+
+    assert to_numpy_mask(selection, NUM_ROWS).tolist() == evaluate_in_written_order(table, tree).tolist()
@@ -0,0 +1,169 @@
+import datetime
+import decimal
+
+import lark
+import pyarrow as pa
+import pyarrow.compute as pc
+import pytest
+
+from parquet_viewer.parquet.parquet_filter_planner import ColumnStatistics
+from parquet_viewer.parquet.parquet_filters import (
+    PyArrowFilterBuilder,
+    apply_selection,
+    build_pa_filter,
+    get_filter_parser
+)
+
+NUM_ROWS = 200
+
+
+@pytest.fixture(scope="module")
+def table() -> pa.Table:
+    rows = range(NUM_ROWS)
+    return pa.table({
+        "i": pa.array([i if i % 11 else None for i in rows], pa.int64()),
+        "f": pa.array([i / 4 for i in rows], pa.float64()),
+        "s": pa.array([f"name {i % 13}" if i % 17 else None for i in rows], pa.string()),
+        "cat": pa.array([["red", "green", "blue"][i % 3] for i in rows]).dictionary_encode(),
+        "day": pa.array([datetime.date(2024, 1, 1) + datetime.timedelta(days=i) for i in rows], pa.date32()),
+        "ts": pa.array(
+            [datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=i) for i in rows], pa.timestamp("ms")
+        ),
+        "price": pa.array([decimal.Decimal(i) / 8 for i in rows], pa.decimal128(10, 3)),
+        "payload": pa.array(
+            [{"user": {"id": i % 20, "name": f"user {i % 5}"}, "flag": i % 2 == 0} for i in rows]
+        ),
+        "tags": pa.array([[f"t{i % 4}", f"t{i % 6}"] for i in rows]),
+    })
+
+
+def filter_table(table: pa.Table, filters: str) -> pa.Table:
+    return apply_selection(table, build_pa_filter(table, filters))
+
+
+def assert_same_rows(table: pa.Table, filters: str, mask) -> None:
+    expected = table.filter(mask)
+    assert filter_table(table, filters).equals(expected), filters
+
+
+def struct_field(table: pa.Table, column: str, *path: str) -> pa.Array:
+    data = table[column].combine_chunks()
+    for name in path:
+        data = pc.struct_field(data, [data.type.get_field_index(name)])
+    return data
+
+
+def test_in_and_not_in(table):
+    values = pa.array([1, 5, 12, 500])
+    assert_same_rows(table, "i in (1, 5, 12, 500)", pc.is_in(table["i"], value_set=values))
+    # comparisons never match nulls
+    assert_same_rows(
+        table, "i not in (1, 5, 12, 500)",
+        pc.and_(pc.is_valid(table["i"]), pc.invert(pc.is_in(table["i"], value_set=values)))
+    )
+    names = pa.array(["name 3", "name 4"])
+    assert_same_rows(table, "s in ('name 3', 'name 4')", pc.is_in(table["s"], value_set=names))
+    assert_same_rows(
+        table, "cat not in ('red', 'blue')",
+        pc.invert(pc.is_in(table["cat"].cast(pa.string()), value_set=pa.array(["red", "blue"])))
+    )
+
+
+def test_between(table):
+    assert_same_rows(
+        table, "i between 10 and 40",
+        pc.and_(pc.greater_equal(table["i"], 10), pc.less_equal(table["i"], 40))
+    )
+    assert_same_rows(
+        table, "f between 2.5 and 3",
+        pc.and_(pc.greater_equal(table["f"], 2.5), pc.less_equal(table["f"], 3.0))
+    )
+    assert_same_rows(
+        table, "s between 'name 1' and 'name 2'",
+        pc.and_(pc.greater_equal(table["s"], "name 1"), pc.less_equal(table["s"], "name 2"))
+    )
+
+
+@pytest.mark.parametrize("filters, column, op, value", [
+    ("day = date '2024-02-01'", "day", pc.equal, pa.scalar(datetime.date(2024, 2, 1), pa.date32())),
+    ("day >= date '2024-03-15'", "day", pc.greater_equal, pa.scalar(datetime.date(2024, 3, 15), pa.date32())),
+    (
+        "ts < timestamp '2024-01-03 12:00:00'", "ts", pc.less,
+        pa.scalar(datetime.datetime(2024, 1, 3, 12), pa.timestamp("ms"))
+    ),
+    ("price > decimal '20.125'", "price", pc.greater, pa.scalar(decimal.Decimal("20.125"), pa.decimal128(10, 3))),
+    ("price = decimal '1.5'", "price", pc.equal, pa.scalar(decimal.Decimal("1.5"), pa.decimal128(10, 3))),
+])
+def test_typed_literals(table, filters, column, op, value):
+    assert_same_rows(table, filters, op(table[column], value))
+
+
+def test_typed_literals_in_lists_and_ranges(table):
+    days = pa.array([datetime.date(2024, 1, 5), datetime.date(2024, 5, 1)], pa.date32())
+    assert_same_rows(
+        table, "day in (date '2024-01-05', date '2024-05-01')", pc.is_in(table["day"], value_set=days)
+    )
+    low = pa.scalar(datetime.datetime(2024, 1, 2), pa.timestamp("ms"))
+    high = pa.scalar(datetime.datetime(2024, 1, 4), pa.timestamp("ms"))
+    assert_same_rows(
+        table, "ts between timestamp '2024-01-02' and timestamp '2024-01-04'",
+        pc.and_(pc.greater_equal(table["ts"], low), pc.less_equal(table["ts"], high))
+    )
+
+
+def test_struct_paths(table):
+    user_id = struct_field(table, "payload", "user", "id")
+    assert_same_rows(table, "payload.user.id = 7", pc.equal(user_id, 7))
+    assert_same_rows(table, "payload.user.id between 3 and 5",
+                     pc.and_(pc.greater_equal(user_id, 3), pc.less_equal(user_id, 5)))
+    assert_same_rows(table, "payload.user.id in (1, 2)", pc.is_in(user_id, value_set=pa.array([1, 2])))
+    assert_same_rows(table, "payload.flag = true", struct_field(table, "payload", "flag"))
+    assert_same_rows(
+        table, "payload.user.name starts_with 'user 3'",
+        pc.starts_with(struct_field(table, "payload", "user", "name"), "user 3")
+    )
+
+
+def test_list_functions(table):
+    lengths = pc.list_value_length(table["tags"])
+    assert_same_rows(table, "len(tags) = 2", pc.equal(lengths, 2))
+
+    has_t5 = [any(tag == "t5" for tag in tags) for tags in table["tags"].to_pylist()]
+    assert_same_rows(table, "any(tags) = 't5'", pa.array(has_t5))
+
+
+def test_combined_conditions(table):
+    user_id = struct_field(table, "payload", "user", "id")
+    assert_same_rows(
+        table, "(i between 10 and 150 and cat = 'red') or payload.user.id in (1, 2)",
+        pc.or_kleene(
+            pc.and_kleene(
+                pc.and_(pc.greater_equal(table["i"], 10), pc.less_equal(table["i"], 150)),
+                pc.equal(table["cat"].cast(pa.string()), "red")
+            ),
+            pc.is_in(user_id, value_set=pa.array([1, 2]))
+        ).fill_null(False)
+    )
+
+
+@pytest.mark.parametrize("filters", [
+    "missing = 1",
+    "i = 'text'",
+    "day = date 'not a date'",
+    "i ~ 'pattern'",
+])
+def test_invalid_filters_are_rejected(table, filters):
+    with pytest.raises(lark.exceptions.LarkError):
+        filter_table(table, filters)
+
+
+def test_statistics_do_not_change_results(table):
+    filters = "i > 20 and s = 'name 3' and day < date '2024-06-01'"
+    tree = get_filter_parser().parse(filters)
+    selection = PyArrowFilterBuilder(table).transform(tree)
+
+    # footer statistics only change the order of evaluation
+    statistics = {"i": ColumnStatistics(NUM_ROWS, 19, 1, 199, None)}
+    planned = PyArrowFilterBuilder(table, statistics=statistics).transform(tree)
+
+    assert apply_selection(table, planned).equals(apply_selection(table, selection))
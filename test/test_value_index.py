@@ -0,0 +1,129 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pytest
+
+from parquet_viewer.parquet.parquet_disk_cache import VALUE_INDEXES
+from parquet_viewer.parquet.parquet_filters import PyArrowFilterBuilder, get_filter_parser, to_numpy_mask
+from parquet_viewer.parquet.parquet_index import RowSelection, ValueIndex
+from parquet_viewer.parquet.parquet_table import ParquetTable
+
+NUM_ROWS = 1000
+
+
+@pytest.fixture(scope="module")
+def table() -> pa.Table:
+    rng = np.random.default_rng(1)
+    x = rng.integers(0, 100, NUM_ROWS)
+    f = rng.random(NUM_ROWS) * 10
+    f[::37] = np.nan
+    return pa.table({
+        "x": pa.array(x, mask=x % 23 == 0),
+        "f": pa.array(f),
+        "s": pa.array([f"key {v:03d}" for v in rng.integers(0, 300, NUM_ROWS)]),
+        "y": pa.array(rng.integers(0, 10, NUM_ROWS)),
+    })
+
+
+def scan(data: pa.ChunkedArray, op: str, value) -> np.ndarray:
+    if op == "EQUAL":
+        mask = pc.equal(data, value)
+    elif op == "LESS_THAN":
+        mask = pc.less(data, value)
+    elif op == "LESS_THAN_OR_EQUAL":
+        mask = pc.less_equal(data, value)
+    elif op == "GREATER_THAN":
+        mask = pc.greater(data, value)
+    elif op == "GREATER_THAN_OR_EQUAL":
+        mask = pc.greater_equal(data, value)
+    elif op == "BETWEEN":
+        mask = pc.and_(pc.greater_equal(data, value[0]), pc.less_equal(data, value[1]))
+    elif op == "IN":
+        mask = pc.is_in(data, value_set=pa.array(value, data.type))
+    else:
+        mask = pc.starts_with(data, value)
+    return np.flatnonzero(mask.fill_null(False).to_numpy(zero_copy_only=False))
+
+
+def assert_equal_tables(table: pa.Table, expected: pa.Table) -> None:
+    # NaN values are not equal to themselves in `pa.Table.equals`
+    assert table.drop(["f"]).equals(expected.drop(["f"]))
+    np.testing.assert_array_equal(table["f"].to_numpy(), expected["f"].to_numpy())
+
+
+@pytest.mark.parametrize("column, op, value", [
+    ("x", "EQUAL", 42),
+    ("x", "EQUAL", 1000),
+    ("x", "LESS_THAN", 10),
+    ("x", "LESS_THAN_OR_EQUAL", 10),
+    ("x", "GREATER_THAN", 90),
+    ("x", "GREATER_THAN_OR_EQUAL", 90),
+    ("x", "BETWEEN", (20, 30)),
+    ("x", "IN", [1, 2, 3, 46, 1000]),
+    ("f", "BETWEEN", (2.5, 3.5)),
+    ("f", "GREATER_THAN", 9.5),
+    ("s", "EQUAL", "key 007"),
+    ("s", "LESS_THAN", "key 010"),
+    ("s", "IN", ["key 100", "key 200", "missing"]),
+    ("s", "STARTS_WITH", "key 01"),
+])
+def test_lookup_matches_full_scan(table, column, op, value):
+    index = ValueIndex.build(table, column)
+    selection = index.lookup(op, value)
+
+    assert isinstance(selection, RowSelection)
+    assert selection.row_ids.tolist() == scan(table[column], op, value).tolist()
+
+
+def test_index_survives_round_trip(table):
+    index = ValueIndex.build(table, "s")
+    loaded = ValueIndex.from_table("s", index.to_table())
+
+    assert loaded.num_rows == NUM_ROWS
+    selection = index.lookup("STARTS_WITH", "key 2")
+    assert loaded.lookup("STARTS_WITH", "key 2").row_ids.tolist() == selection.row_ids.tolist()
+
+
+@pytest.mark.parametrize("filters", [
+    "x = 42",
+    "x between 20 and 30 and s < 'key 150'",
+    "x in (1, 2, 3) or s starts_with 'key 29'",
+    # conditions on columns without index are checked on rows selected by indexes
+    "x > 50 and y = 3",
+    "x < 5 or y = 9",
+])
+def test_filters_with_indexes_match_full_scan(table, filters):
+    tree = get_filter_parser().parse(filters)
+    value_indexes = {column: ValueIndex.build(table, column) for column in ("x", "s")}
+
+    expected = PyArrowFilterBuilder(table).transform(tree)
+    selected = PyArrowFilterBuilder(table, value_indexes=value_indexes).transform(tree)
+    assert to_numpy_mask(selected, NUM_ROWS).tolist() == to_numpy_mask(expected, NUM_ROWS).tolist()
+
+
+@pytest.fixture
+def value_indexes_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(VALUE_INDEXES, "_directory", str(tmp_path / "value_indexes"))
+    monkeypatch.setattr(VALUE_INDEXES, "max_bytes", 100 * 1024 * 1024)
+    return VALUE_INDEXES.directory
+
+
+@pytest.mark.parametrize("filters", ["x = 42", "x between 20 and 22", "x in (5, 77) and s >= 'key 100'"])
+def test_saved_index_reads_matching_row_groups(tmp_path, table, value_indexes_dir, filters):
+    parquet_file = str(tmp_path / "table.parquet")
+    pq.write_table(table, parquet_file, row_group_size=128)
+
+    expected = ParquetTable(parquet_file, 100)
+    expected.filters = filters
+
+    ParquetTable(parquet_file, 100).build_value_index("x")
+    ParquetTable(parquet_file, 100).build_value_index("s")
+
+    # a new table finds saved indexes, rows are read from row groups containing them
+    parquet_table = ParquetTable(parquet_file, 100)
+    assert parquet_table.indexed_columns == ["x", "s"]
+    parquet_table.filters = filters
+
+    assert_equal_tables(parquet_table.lazy_filtered_table, expected.lazy_filtered_table)
+    assert parquet_table._table is None